@@ -2,18 +2,150 @@ from __future__ import print_function
 
 from .utils import *
 from .types import *
+from .float_unpack import FloatArrayUnpacker
 
 import msgpackrpc #install as admin: pip install msgpack-rpc-python
+import asyncio
 import numpy as np #pip install numpy
 import msgpack
 import time
 import math
 import logging
+import socket
+
+class RpcFuture(object):
+    """
+    Pending result of a pipelined RPC call
+
+    The request has already been written to the socket when the future is created; `result()` waits for the
+    reply and decodes it. Results are cached, so `result()` can be called more than once.
+    """
+    def __init__(self, future, decode = None):
+        self._future = future
+        self._decode = decode
+        self._done = False
+        self._value = None
+
+    def join(self):
+        """
+        Wait until the reply for this call has arrived
+        """
+        self._future.join()
+
+    def result(self):
+        """
+        Wait for the reply and return the decoded value
+
+        Raises:
+            msgpackrpc.error.RPCError: If the server reported an error or the call timed out
+        """
+        if not self._done:
+            value = self._future.get()
+            self._value = self._decode(value) if self._decode is not None else value
+            self._done = True
+        return self._value
+
+class RpcBatch(object):
+    """
+    Issue several RPC calls back to back and wait on all of them together
+
+    Every call returns an `RpcFuture` immediately, so the round trips overlap instead of being paid one after the
+    other. Leaving the `with` block waits for all outstanding replies. A batch is tied to the client that created it
+    and, like the client itself, must not be shared between threads.
+
+    The msgpack-rpc connection leaves Nagle's algorithm on, so a small request written right after another may wait
+    for the first one's ACK. Where that matters, `AsyncMultirotorClient` (whose asyncio socket has TCP_NODELAY set)
+    overlaps calls without the delay.
+
+    Example:
+        with client.batch() as batch:
+            state = batch.getMultirotorState()
+            collision = batch.simGetCollisionInfo()
+        print(state.result().kinematics_estimated.position, collision.result().has_collided)
+    """
+    def __init__(self, rpc_client, compact_types = False):
+        self._rpc = rpc_client
+        self._compact = compact_types
+        self._futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.join()
+        except Exception:
+            # Do not mask the exception raised inside the block; otherwise let errors propagate
+            if exc_type is None:
+                raise
+        return False
+
+    def _submit(self, decode, method, *args):
+        future = RpcFuture(self._rpc.call_async(method, *args), decode)
+        self._futures.append(future)
+        return future
+
+    def call(self, method, *args):
+        """
+        Send a raw RPC call without waiting for the reply
+
+        Args:
+            method (str): Server method name
+            *args: Arguments forwarded to the server
+
+        Returns:
+            RpcFuture: Undecoded reply
+        """
+        return self._submit(None, method, *args)
+
+    def join(self):
+        """
+        Wait for every call issued so far
+
+        Returns:
+            list: Results in the order the calls were issued
+        """
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.join()
+        return [future.result() for future in futures]
+
+    def simGetImages(self, requests, vehicle_name = '', external = False):
+        """
+        Returns:
+            RpcFuture: Resolves to a list of `ImageResponse`
+        """
+        decode = msgpack_decoder(ImageResponse, self._compact)
+        return self._submit(lambda raw: [decode(r) for r in raw],
+            'simGetImages', requests, vehicle_name, external)
+
+    def simGetCollisionInfo(self, vehicle_name = ''):
+        """
+        Returns:
+            RpcFuture: Resolves to `CollisionInfo`
+        """
+        return self._submit(msgpack_decoder(CollisionInfo, self._compact), 'simGetCollisionInfo', vehicle_name)
+
+    def simGetVehiclePose(self, vehicle_name = ''):
+        """
+        Returns:
+            RpcFuture: Resolves to `Pose`
+        """
+        return self._submit(msgpack_decoder(Pose, self._compact), 'simGetVehiclePose', vehicle_name)
 
 class VehicleClient:
-    def __init__(self, ip = "", port = 41451, timeout_value = 3600):
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, compact_types = False):
+        """
+        Args:
+            ip (str, optional): Simulator address, defaults to localhost
+            port (int, optional): RPC port
+            timeout_value (int, optional): RPC timeout in seconds
+            compact_types (bool, optional): Decode state, collision, pose and image replies into compact `__slots__`
+                objects (see `compact_decoder`) instead of dict-backed ones
+        """
         if (ip == ""):
             ip = "127.0.0.1"
+        self.compact_types = compact_types
         self.client = msgpackrpc.Client(msgpackrpc.Address(ip, port), timeout = timeout_value, pack_encoding = 'utf-8', unpack_encoding = 'utf-8')
 
 #----------------------------------- Common vehicle APIs ---------------------------------------------
@@ -307,7 +439,8 @@ class VehicleClient:
             list[ImageResponse]:
         """
         responses_raw = self.client.call('simGetImages', requests, vehicle_name, external)
-        return [ImageResponse.from_msgpack(response_raw) for response_raw in responses_raw]
+        decode = msgpack_decoder(ImageResponse, self.compact_types)
+        return [decode(response_raw) for response_raw in responses_raw]
 
 
 
@@ -444,7 +577,7 @@ class VehicleClient:
         Returns:
             CollisionInfo:
         """
-        return CollisionInfo.from_msgpack(self.client.call('simGetCollisionInfo', vehicle_name))
+        return msgpack_decoder(CollisionInfo, self.compact_types)(self.client.call('simGetCollisionInfo', vehicle_name))
 
     def simSetVehiclePose(self, pose, ignore_collision, vehicle_name = ''):
         """
@@ -470,7 +603,7 @@ class VehicleClient:
             Pose:
         """
         pose = self.client.call('simGetVehiclePose', vehicle_name)
-        return Pose.from_msgpack(pose)
+        return msgpack_decoder(Pose, self.compact_types)(pose)
 
     def simSetTraceLine(self, color_rgba, thickness=1.0, vehicle_name = ''):
         """
@@ -1113,10 +1246,53 @@ class VehicleClient:
         """
         return self.client.call('getSettingsString')
 
+    def batch(self):
+        """
+        Start a batch of pipelined calls
+
+        Returns:
+            RpcBatch: Context manager issuing calls without waiting for each reply
+        """
+        return RpcBatch(self.client, self.compact_types)
+
 #----------------------------------- Multirotor APIs ---------------------------------------------
+class MultirotorBatch(RpcBatch):
+    """
+    `RpcBatch` with the multirotor state and velocity commands
+    """
+    def getMultirotorState(self, vehicle_name = ''):
+        """
+        Returns:
+            RpcFuture: Resolves to `MultirotorState`
+        """
+        return self._submit(msgpack_decoder(MultirotorState, self._compact), 'getMultirotorState', vehicle_name)
+
+    def moveByVelocityAsync(self, vx, vy, vz, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        """
+        Returns:
+            RpcFuture: Resolves when the server has accepted the command
+        """
+        return self._submit(None, 'moveByVelocity', vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name)
+
+    def moveByVelocityBodyFrameAsync(self, vx, vy, vz, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        """
+        Returns:
+            RpcFuture: Resolves when the server has accepted the command
+        """
+        return self._submit(None, 'moveByVelocityBodyFrame', vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name)
+
 class MultirotorClient(VehicleClient, object):
-    def __init__(self, ip = "", port = 41451, timeout_value = 3600):
-        super(MultirotorClient, self).__init__(ip, port, timeout_value)
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, compact_types = False):
+        super(MultirotorClient, self).__init__(ip, port, timeout_value, compact_types)
+
+    def batch(self):
+        """
+        Start a batch of pipelined calls, e.g. state, collision info and a velocity command in one round trip
+
+        Returns:
+            MultirotorBatch: Context manager issuing calls without waiting for each reply
+        """
+        return MultirotorBatch(self.client, self.compact_types)
 
     def takeoffAsync(self, timeout_sec = 20, vehicle_name = ''):
         """
@@ -1564,7 +1740,7 @@ class MultirotorClient(VehicleClient, object):
         Returns:
             MultirotorState:
         """
-        return MultirotorState.from_msgpack(self.client.call('getMultirotorState', vehicle_name))
+        return msgpack_decoder(MultirotorState, self.compact_types)(self.client.call('getMultirotorState', vehicle_name))
     getMultirotorState.__annotations__ = {'return': MultirotorState}
 #query rotor states
     def getRotorStates(self, vehicle_name = ''):
@@ -1581,6 +1757,315 @@ class MultirotorClient(VehicleClient, object):
         return RotorStates.from_msgpack(self.client.call('getRotorStates', vehicle_name))
     getRotorStates.__annotations__ = {'return': RotorStates}
 
+#----------------------------------- Asyncio Multirotor APIs ---------------------------------------------
+class AsyncMultirotorClient(object):
+    """
+    Multirotor client for asyncio programs
+
+    Speaks the same msgpack-rpc protocol as `MultirotorClient` over one asyncio connection. Any number of requests
+    can be in flight at once, so a single event loop can overlap image capture, state queries and commands without a
+    thread or connection per concern.
+
+    Queries (`simGetImages`, `getMultirotorState`, ...) are coroutines returning decoded values. Like their
+    `MultirotorClient` counterparts, `move*Async`, `takeoffAsync`, `landAsync` and `hoverAsync` send the command
+    right away and return a future that completes when the simulator finishes it; await it to wait, like `.join()`.
+    Those methods must be called from the event loop thread once connected.
+
+    `unpacker_factory` creates the reply decoder of the connection; it defaults to the stock `msgpack.Unpacker`.
+    Passing `FloatArrayUnpacker` makes float images (depth) arrive as `np.float32` arrays decoded straight from the
+    reply bytes, at the cost of a pure-Python decoder for every reply, so only do that on a client dedicated to
+    image requests.
+
+    Example:
+        client = AsyncMultirotorClient()
+        await client.connect()
+        state, images = await asyncio.gather(client.getMultirotorState(), client.simGetImages(requests))
+        client.moveByVelocityAsync(2, 0, 0, 1)
+    """
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, compact_types = False, unpacker_factory = None):
+        if (ip == ""):
+            ip = "127.0.0.1"
+        self.compact_types = compact_types
+        self.unpacker_factory = unpacker_factory
+        self.ip = ip
+        self.port = port
+        self.timeout_value = timeout_value
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._pending = {}
+        self._next_msgid = 0
+        self._packer = msgpack.Packer(use_bin_type = False, default = lambda x: x.to_msgpack())
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    @property
+    def connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        """
+        Open the connection and start reading replies
+        """
+        if self.connected:
+            return
+        # asyncio enables TCP_NODELAY, so pipelined requests are not held back by Nagle
+        self._reader, self._writer = await asyncio.open_connection(self.ip, self.port)
+        self._read_task = asyncio.ensure_future(self._read_replies())
+
+    async def close(self):
+        """
+        Close the connection; calls still waiting for a reply fail with `ConnectionError`
+        """
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._writer = self._reader = self._read_task = None
+        self._fail_pending(ConnectionError("AirSim connection closed"))
+
+    async def _read_replies(self):
+        unpacker = self.unpacker_factory() if self.unpacker_factory is not None else msgpack.Unpacker(raw = False)
+        try:
+            while True:
+                data = await self._reader.read(65536)
+                if not data:
+                    break
+                unpacker.feed(data)
+                for message in unpacker:
+                    if len(message) != 4 or message[0] != 1:
+                        continue
+                    _, msgid, error, result = message
+                    future = self._pending.pop(msgid, None)
+                    if future is None or future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(msgpackrpc.error.RPCError(error))
+                    else:
+                        future.set_result(result)
+        finally:
+            self._fail_pending(ConnectionError("AirSim connection lost"))
+
+    def _fail_pending(self, exc):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    @staticmethod
+    def _retrieve(future):
+        # Commands are often fired and forgotten; mark their errors as seen
+        if not future.cancelled():
+            future.exception()
+
+    def call_async(self, method, *args):
+        """
+        Send a request without waiting for the reply
+
+        Args:
+            method (str): Server method name
+            *args: Arguments forwarded to the server
+
+        Returns:
+            asyncio.Future: Raw reply
+        """
+        if not self.connected:
+            raise ConnectionError("AsyncMultirotorClient is not connected")
+        msgid = self._next_msgid
+        self._next_msgid = (msgid + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self._retrieve)
+        self._pending[msgid] = future
+        self._writer.write(self._packer.pack([0, msgid, method, list(args)]))
+        return future
+
+    async def call(self, method, *args):
+        """
+        Send a request and wait for its reply
+
+        Raises:
+            msgpackrpc.error.RPCError: If the server reported an error
+            asyncio.TimeoutError: If no reply arrived within `timeout_value` seconds
+        """
+        if not self.connected:
+            await self.connect()
+        return await asyncio.wait_for(self.call_async(method, *args), self.timeout_value)
+
+    async def ping(self):
+        return await self.call('ping')
+
+    async def enableApiControl(self, is_enabled, vehicle_name = ''):
+        return await self.call('enableApiControl', is_enabled, vehicle_name)
+
+    async def armDisarm(self, arm, vehicle_name = ''):
+        return await self.call('armDisarm', arm, vehicle_name)
+
+    async def simGetImages(self, requests, vehicle_name = '', external = False):
+        """
+        Returns:
+            list[ImageResponse]:
+        """
+        responses_raw = await self.call('simGetImages', requests, vehicle_name, external)
+        decode = msgpack_decoder(ImageResponse, self.compact_types)
+        return [decode(response_raw) for response_raw in responses_raw]
+
+    async def getMultirotorState(self, vehicle_name = ''):
+        """
+        Returns:
+            MultirotorState:
+        """
+        return msgpack_decoder(MultirotorState, self.compact_types)(await self.call('getMultirotorState', vehicle_name))
+
+    async def simGetCollisionInfo(self, vehicle_name = ''):
+        """
+        Returns:
+            CollisionInfo:
+        """
+        return msgpack_decoder(CollisionInfo, self.compact_types)(await self.call('simGetCollisionInfo', vehicle_name))
+
+    def takeoffAsync(self, timeout_sec = 20, vehicle_name = ''):
+        return self.call_async('takeoff', timeout_sec, vehicle_name)
+
+    def landAsync(self, timeout_sec = 60, vehicle_name = ''):
+        return self.call_async('land', timeout_sec, vehicle_name)
+
+    def hoverAsync(self, vehicle_name = ''):
+        return self.call_async('hover', vehicle_name)
+
+    def moveByVelocityAsync(self, vx, vy, vz, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        return self.call_async('moveByVelocity', vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name)
+
+    def moveByVelocityBodyFrameAsync(self, vx, vy, vz, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        return self.call_async('moveByVelocityBodyFrame', vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name)
+
+    def moveByVelocityZAsync(self, vx, vy, z, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        return self.call_async('moveByVelocityZ', vx, vy, z, duration, drivetrain, yaw_mode, vehicle_name)
+
+    def moveToPositionAsync(self, x, y, z, velocity, timeout_sec = 3e+38, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(),
+        lookahead = -1, adaptive_lookahead = 1, vehicle_name = ''):
+        return self.call_async('moveToPosition', x, y, z, velocity, timeout_sec, drivetrain, yaw_mode, lookahead, adaptive_lookahead, vehicle_name)
+
+#----------------------------------- Image connection ---------------------------------------------
+class ImageClient(object):
+    """
+    Dedicated blocking connection for image requests
+
+    Opens its own socket to the simulator, separate from the `VehicleClient` connection used for state and commands,
+    and decodes replies with an unpacker made by `unpacker_factory`. The default `FloatArrayUnpacker` turns float
+    images (depth) into `np.float32` arrays straight from the reply bytes instead of lists of Python floats; because
+    it is a pure-Python decoder, keeping it on this connection leaves every other reply on the C unpacker.
+
+    Calls are synchronous and not thread-safe; use one `ImageClient` per thread.
+
+    Example:
+        images = ImageClient()
+        responses = images.simGetImages([ImageRequest("0", ImageType.DepthPerspective, True)])
+    """
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, compact_types = False, unpacker_factory = FloatArrayUnpacker):
+        """
+        Args:
+            ip (str, optional): Simulator address, defaults to localhost
+            port (int, optional): RPC port
+            timeout_value (int, optional): Socket timeout in seconds
+            compact_types (bool, optional): Decode image replies into compact `__slots__` objects
+            unpacker_factory (callable, optional): Returns a fresh unpacker with `feed()` and iteration, like
+                `msgpack.Unpacker`; called once per connection
+        """
+        if (ip == ""):
+            ip = "127.0.0.1"
+        self.ip = ip
+        self.port = port
+        self.timeout_value = timeout_value
+        self.compact_types = compact_types
+        self.unpacker_factory = unpacker_factory
+        self._sock = None
+        self._unpacker = None
+        self._next_msgid = 0
+        self._packer = msgpack.Packer(use_bin_type = False, default = lambda x: x.to_msgpack())
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def connect(self):
+        """
+        Open the connection; calls connect on first use
+        """
+        if self._sock is not None:
+            return
+        sock = socket.create_connection((self.ip, self.port), timeout = self.timeout_value)
+        # Requests are small writes; don't let Nagle hold them back waiting for an ACK
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._unpacker = self.unpacker_factory()
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._unpacker = None
+
+    def call(self, method, *args):
+        """
+        Send a request and wait for its reply
+
+        Raises:
+            msgpackrpc.error.RPCError: If the server reported an error
+            ConnectionError: If the simulator closed the connection
+        """
+        self.connect()
+        msgid = self._next_msgid
+        self._next_msgid = (msgid + 1) & 0xFFFFFFFF
+        try:
+            self._sock.sendall(self._packer.pack([0, msgid, method, list(args)]))
+            while True:
+                for message in self._unpacker:
+                    if len(message) != 4 or message[0] != 1 or message[1] != msgid:
+                        continue
+                    _, _, error, result = message
+                    if error is not None:
+                        raise msgpackrpc.error.RPCError(error)
+                    return result
+                data = self._sock.recv(65536)
+                if not data:
+                    raise ConnectionError("AirSim connection closed")
+                self._unpacker.feed(data)
+        except (OSError, ValueError):
+            # A timed out or broken connection may hold a partial reply; start over on the next call
+            self.close()
+            raise
+
+    def ping(self):
+        return self.call('ping')
+
+    def simGetImages(self, requests, vehicle_name = '', external = False):
+        """
+        Get multiple images, see `VehicleClient.simGetImages`
+
+        Returns:
+            list[ImageResponse]:
+        """
+        responses_raw = self.call('simGetImages', requests, vehicle_name, external)
+        decode = msgpack_decoder(ImageResponse, self.compact_types)
+        return [decode(response_raw) for response_raw in responses_raw]
+
 #----------------------------------- Car APIs ---------------------------------------------
 class CarClient(VehicleClient, object):
     def __init__(self, ip = "", port = 41451, timeout_value = 3600):
@@ -0,0 +1,161 @@
+"""
+msgpack decoding with a fast path for float32 arrays
+
+AirSim sends float images (depth, disparity) as a msgpack array of float32 values, so a generic unpacker creates one
+Python float per pixel (about 900k for a 720p frame) before `get_pfm_array` can turn them into NumPy. This module
+decodes msgpack directly and, when an array consists only of float32 items, views its bytes through a structured
+dtype `(tag, big-endian float32)` and converts them in one vectorised step, without per-element Python objects.
+
+Everything else decodes like `msgpack.Unpacker(raw=False)`: str becomes `str` and bin becomes `bytes`.
+"""
+import struct
+
+import numpy as np
+
+FLOAT32_TAG = 0xca
+FLOAT32_ITEM = np.dtype([('tag', 'u1'), ('value', '>f4')])
+
+class _Incomplete(Exception):
+    pass
+
+_FIXED = {
+    0xcc: (1, struct.Struct('>B')), 0xcd: (2, struct.Struct('>H')), 0xce: (4, struct.Struct('>I')), 0xcf: (8, struct.Struct('>Q')),
+    0xd0: (1, struct.Struct('>b')), 0xd1: (2, struct.Struct('>h')), 0xd2: (4, struct.Struct('>i')), 0xd3: (8, struct.Struct('>q')),
+    0xca: (4, struct.Struct('>f')), 0xcb: (8, struct.Struct('>d')),
+}
+_LENGTH = {
+    # type byte -> (size of length field, kind)
+    0xc4: (1, 'bin'), 0xc5: (2, 'bin'), 0xc6: (4, 'bin'),
+    0xd9: (1, 'str'), 0xda: (2, 'str'), 0xdb: (4, 'str'),
+    0xdc: (2, 'array'), 0xdd: (4, 'array'),
+    0xde: (2, 'map'), 0xdf: (4, 'map'),
+}
+_UINT = {1: struct.Struct('>B'), 2: struct.Struct('>H'), 4: struct.Struct('>I')}
+
+def _need(buf, end):
+    if end > len(buf):
+        raise _Incomplete()
+
+def _unpack(buf, i, min_length, verified = None):
+    _need(buf, i + 1)
+    b = buf[i]
+    i += 1
+    if b <= 0x7f:
+        return b, i
+    if b >= 0xe0:
+        return b - 0x100, i
+    if 0xa0 <= b <= 0xbf:
+        return _sized(buf, i, b & 0x1f, 'str', min_length, verified)
+    if 0x90 <= b <= 0x9f:
+        return _sized(buf, i, b & 0x0f, 'array', min_length, verified)
+    if 0x80 <= b <= 0x8f:
+        return _sized(buf, i, b & 0x0f, 'map', min_length, verified)
+    if b == 0xc0:
+        return None, i
+    if b == 0xc2:
+        return False, i
+    if b == 0xc3:
+        return True, i
+    fixed = _FIXED.get(b)
+    if fixed is not None:
+        size, fmt = fixed
+        _need(buf, i + size)
+        return fmt.unpack_from(buf, i)[0], i + size
+    sized = _LENGTH.get(b)
+    if sized is not None:
+        size, kind = sized
+        _need(buf, i + size)
+        return _sized(buf, i + size, _UINT[size].unpack_from(buf, i)[0], kind, min_length, verified)
+    raise ValueError("unsupported msgpack type 0x%02x" % b)
+
+def _sized(buf, i, length, kind, min_length, verified):
+    if kind == 'str' or kind == 'bin':
+        end = i + length
+        _need(buf, end)
+        data = bytes(buf[i:end])
+        return (data.decode('utf-8') if kind == 'str' else data), end
+    if kind == 'map':
+        result = {}
+        for _ in range(length):
+            key, i = _unpack(buf, i, min_length, verified)
+            result[key], i = _unpack(buf, i, min_length, verified)
+        return result, i
+    if length >= min_length:
+        _need(buf, i + 1)
+        if buf[i] == FLOAT32_TAG:
+            available = min(length, (len(buf) - i) // FLOAT32_ITEM.itemsize)
+            # Items already checked by an earlier attempt on the same partial message
+            start = verified.get(i, 0) if verified is not None else 0
+            items = np.frombuffer(buf, FLOAT32_ITEM, available, i)
+            floats = bool((items['tag'][start:] == FLOAT32_TAG).all())
+            if floats and available == length:
+                values = items['value'].astype(np.float32)
+                del items
+                return values, i + FLOAT32_ITEM.itemsize * length
+            del items
+            tail = i + FLOAT32_ITEM.itemsize * available
+            if floats and tail < len(buf) and buf[tail] != FLOAT32_TAG:
+                # A shorter item ends the float run before the buffer does
+                floats = False
+            if floats:
+                if verified is not None:
+                    verified[i] = available
+                raise _Incomplete()
+            # Mixed item types: decode item by item below
+    result = []
+    for _ in range(length):
+        item, i = _unpack(buf, i, min_length, verified)
+        result.append(item)
+    return result, i
+
+def unpackb(data, min_length = 16):
+    """
+    Decode one msgpack object, turning float32 arrays of at least `min_length` items into `np.float32` arrays
+
+    Args:
+        data (bytes): Complete msgpack message
+        min_length (int): Shorter arrays stay Python lists
+
+    Raises:
+        ValueError: If `data` is truncated or uses an unsupported type (ext)
+    """
+    with memoryview(data) as view:
+        try:
+            obj, _ = _unpack(view, 0, min_length)
+        except _Incomplete:
+            obj = _Incomplete
+    if obj is _Incomplete:
+        raise ValueError("truncated msgpack data")
+    return obj
+
+class FloatArrayUnpacker(object):
+    """
+    Streaming counterpart of `unpackb` with the `feed()`/iteration interface of `msgpack.Unpacker`
+    """
+    def __init__(self, min_length = 16):
+        self.min_length = min_length
+        self._buffer = bytearray()
+        self._verified = {}
+
+    def feed(self, data):
+        self._buffer += data
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        end = None
+        if self._buffer:
+            with memoryview(self._buffer) as view:
+                try:
+                    obj, end = _unpack(view, 0, self.min_length, self._verified)
+                except _Incomplete:
+                    # Wait for more data; nothing may keep a view on the buffer past this point
+                    pass
+        if end is None:
+            raise StopIteration
+        del self._buffer[:end]
+        self._verified.clear()
+        return obj
+
+    next = __next__
@@ -122,13 +122,13 @@ class Vector3r(MsgpackMixin):
             raise TypeError('unsupported operand type(s) for *: %s and %s' % ( str(type(self)), str(type(other))) )
 
     def dot(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Vector3r):
             return self.x_val*other.x_val + self.y_val*other.y_val + self.z_val*other.z_val
         else:
             raise TypeError('unsupported operand type(s) for \'dot\': %s and %s' % ( str(type(self)), str(type(other))) )
 
     def cross(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Vector3r):
             cross_product = np.cross(self.to_numpy_array(), other.to_numpy_array())
             return Vector3r(cross_product[0], cross_product[1], cross_product[2])
         else:
@@ -169,13 +169,13 @@ class Quaternionr(MsgpackMixin):
         return (math.isnan(self.w_val) or math.isnan(self.x_val) or math.isnan(self.y_val) or math.isnan(self.z_val))
 
     def __add__(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Quaternionr):
             return Quaternionr( self.x_val+other.x_val, self.y_val+other.y_val, self.z_val+other.z_val, self.w_val+other.w_val )
         else:
             raise TypeError('unsupported operand type(s) for +: %s and %s' % ( str(type(self)), str(type(other))) )
 
     def __mul__(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Quaternionr):
             t, x, y, z = self.w_val, self.x_val, self.y_val, self.z_val
             a, b, c, d = other.w_val, other.x_val, other.y_val, other.z_val
             return Quaternionr( w_val = a*t - b*x - c*y - d*z,
@@ -186,7 +186,7 @@ class Quaternionr(MsgpackMixin):
             raise TypeError('unsupported operand type(s) for *: %s and %s' % ( str(type(self)), str(type(other))) )
 
     def __truediv__(self, other):
-        if type(other) == type(self):
+        if isinstance(other, Quaternionr):
             return self * other.inverse()
         elif type(other) in [int, float] + np.sctypes['int'] + np.sctypes['uint'] + np.sctypes['float']:
             return Quaternionr( self.x_val / other, self.y_val / other, self.z_val / other, self.w_val / other)
@@ -194,25 +194,25 @@ class Quaternionr(MsgpackMixin):
             raise TypeError('unsupported operand type(s) for /: %s and %s' % ( str(type(self)), str(type(other))) )
 
     def dot(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Quaternionr):
             return self.x_val*other.x_val + self.y_val*other.y_val + self.z_val*other.z_val + self.w_val*other.w_val
         else:
             raise TypeError('unsupported operand type(s) for \'dot\': %s and %s' % ( str(type(self)), str(type(other))) )
 
     def cross(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Quaternionr):
             return (self * other - other * self) / 2
         else:
             raise TypeError('unsupported operand type(s) for \'cross\': %s and %s' % ( str(type(self)), str(type(other))) )
 
     def outer_product(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Quaternionr):
             return ( self.inverse()*other - other.inverse()*self ) / 2
         else:
             raise TypeError('unsupported operand type(s) for \'outer_product\': %s and %s' % ( str(type(self)), str(type(other))) )
 
     def rotate(self, other):
-        if type(self) == type(other):
+        if isinstance(other, Quaternionr):
             if other.get_length() == 1:
                 return other * self * other.inverse()
             else:
@@ -335,6 +335,42 @@ class ImageResponse(MsgpackMixin):
     height = 0
     image_type = ImageType.Scene
 
+    def as_array(self):
+        """
+        Return the image payload as a NumPy array without copying the received bytes
+
+        Uncompressed images are shaped `(height, width, channels)` as uint8, with channels inferred from the buffer
+        size (1, 3 or 4). Float images (`pixels_as_float`) are shaped `(height, width)` as float32. Compressed
+        responses return the flat encoded bytes, ready for `cv2.imdecode`.
+
+        uint8 payloads and binary float payloads are read-only views over the reply buffer; copy before writing.
+        A float payload that arrives as a list is converted in a single pass; `ImageClient` delivers it as a
+        `np.float32` array, which is used as is.
+
+        Raises:
+            ValueError: If the payload size does not match `width` and `height`
+        """
+        pixels = self.width * self.height
+        if self.pixels_as_float:
+            data = self.image_data_float
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                values = np.frombuffer(data, np.float32)
+            elif isinstance(data, np.ndarray):
+                values = data.astype(np.float32, copy=False).ravel()
+            else:
+                values = np.fromiter(data, np.float32, count=len(data))
+            if values.size != pixels:
+                raise ValueError("float image has %d values, expected %dx%d" % (values.size, self.width, self.height))
+            return values.reshape(self.height, self.width)
+
+        buf = np.frombuffer(self.image_data_uint8, np.uint8)
+        if self.compress:
+            return buf
+        channels = buf.size // pixels if pixels else 0
+        if channels not in (1, 3, 4) or channels * pixels != buf.size:
+            raise ValueError("image has %d bytes, expected %dx%d with 1, 3 or 4 channels" % (buf.size, self.width, self.height))
+        return buf.reshape(self.height, self.width, channels)
+
 class CarControls(MsgpackMixin):
     throttle = 0.0
     steering = 0.0
@@ -578,3 +614,125 @@ class MeshPositionVertexBuffersResponse(MsgpackMixin):
     vertices = 0.0
     indices = 0.0
     name = ''
+
+#----------------------------------- Compact decoding ---------------------------------------------
+# `MsgpackMixin.from_msgpack` builds a dict per object and looks up the nested
+# class of every field at runtime. The compact path instead decodes into
+# `__slots__` subclasses with a decoder built once per class, which knows the
+# fields and nested decoders up front. Compact objects are instances of the
+# original classes, so attribute access, methods and isinstance checks are
+# unchanged; that also means they still carry the `__dict__` of those classes
+# (used for unknown fields), so the gain is decode time, not memory.
+
+_compact_classes = {}
+_compact_decoders = {}
+
+def _msgpack_fields(cls):
+    """Return `(name, default)` for the data attributes of a `MsgpackMixin` class, base classes first"""
+    fields = {}
+    for klass in reversed(cls.__mro__):
+        if klass in (object, MsgpackMixin):
+            continue
+        for name, value in vars(klass).items():
+            if name.startswith('_') or callable(value) or isinstance(value, (staticmethod, classmethod, property)):
+                continue
+            fields[name] = value
+    return list(fields.items())
+
+def _compact_to_msgpack(self, *args, **kwargs):
+    encoded = {name: getattr(self, name) for name in self.__slots__}
+    encoded.update(self.__dict__)
+    return encoded
+
+def _compact_repr(self):
+    from pprint import pformat
+    return "<" + type(self).__name__ + "> " + pformat(self.to_msgpack(), indent=4, width=1)
+
+def compact_class(cls):
+    """
+    Return the `__slots__` subclass of `cls` used by compact decoding
+
+    Args:
+        cls (type): A `MsgpackMixin` subclass such as `Vector3r`
+
+    Returns:
+        type: Subclass storing the fields of `cls` in slots
+    """
+    compact = _compact_classes.get(cls)
+    if compact is None:
+        names = tuple(name for name, _ in _msgpack_fields(cls))
+        compact = type(cls.__name__, (cls,), {
+            '__slots__': names,
+            '__module__': cls.__module__,
+            'to_msgpack': _compact_to_msgpack,
+            '__repr__': _compact_repr,
+        })
+        _compact_classes[cls] = compact
+    return compact
+
+def compact_decoder(cls):
+    """
+    Return a function decoding a msgpack dict into a compact instance of `cls`
+
+    The decoder is built once per class. When the message carries exactly the known fields it assigns them
+    straight into slots and recurses into the nested decoders; otherwise missing fields take the class defaults and
+    unknown fields are kept as regular attributes, as with `from_msgpack`.
+
+    Args:
+        cls (type): A `MsgpackMixin` subclass such as `MultirotorState`
+
+    Returns:
+        callable: `decode(encoded) -> compact instance of cls`
+    """
+    decoder = _compact_decoders.get(cls)
+    if decoder is not None:
+        return decoder
+
+    fields = _msgpack_fields(cls)
+    nested = {name: compact_decoder(type(default)) for name, default in fields if isinstance(default, MsgpackMixin)}
+    plain = tuple(name for name, _ in fields if name not in nested)
+    nested_items = tuple(nested.items())
+    field_count = len(fields)
+    compact = compact_class(cls)
+    new = object.__new__
+
+    def decode(encoded):
+        if encoded.__class__ is not dict:
+            return encoded
+        obj = new(compact)
+        if len(encoded) != field_count:
+            return _decode_slow(obj, encoded, fields, nested)
+        try:
+            for name in plain:
+                setattr(obj, name, encoded[name])
+            for name, decode_nested in nested_items:
+                setattr(obj, name, decode_nested(encoded[name]))
+        except KeyError:
+            return _decode_slow(obj, encoded, fields, nested)
+        return obj
+
+    decode.__doc__ = "Decode a msgpack dict into a compact `%s`" % cls.__name__
+    _compact_decoders[cls] = decode
+    return decode
+
+def _decode_slow(obj, encoded, fields, nested):
+    for name, default in fields:
+        if name in encoded:
+            value = encoded[name]
+            setattr(obj, name, nested[name](value) if name in nested else value)
+        else:
+            setattr(obj, name, default)
+    for name, value in encoded.items():
+        if name not in obj.__slots__:
+            obj.__dict__[name] = value
+    return obj
+
+def msgpack_decoder(cls, compact = False):
+    """
+    Return the function the clients use to decode replies of type `cls`
+
+    Args:
+        cls (type): A `MsgpackMixin` subclass
+        compact (bool): Use `compact_decoder` instead of `cls.from_msgpack`
+    """
+    return compact_decoder(cls) if compact else cls.from_msgpack
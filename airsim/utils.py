@@ -12,13 +12,22 @@ from .types import *
 
 
 def string_to_uint8_array(bstr):
-    return np.fromstring(bstr, np.uint8)
+    # Read-only view over the bytes; np.fromstring copied them
+    return np.frombuffer(bstr, np.uint8)
     
 def string_to_float_array(bstr):
-    return np.fromstring(bstr, np.float32)
+    return np.frombuffer(bstr, np.float32)
     
 def list_to_2d_float_array(flst, width, height):
-    return np.reshape(np.asarray(flst, np.float32), (height, width))
+    if isinstance(flst, (bytes, bytearray, memoryview)):
+        values = np.frombuffer(flst, np.float32)
+    elif isinstance(flst, np.ndarray):
+        # Already decoded from the reply bytes (FloatArrayUnpacker connections)
+        values = flst.astype(np.float32, copy=False)
+    else:
+        # Convert straight to float32 in one pass over the list
+        values = np.fromiter(flst, np.float32, count=len(flst))
+    return values.reshape(height, width)
     
 def get_pfm_array(response):
     return list_to_2d_float_array(response.image_data_float, response.width, response.height)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compare AirSim reply decoding throughput with and without compact types.
+
+Builds a msgpack-style message for each type the control loop decodes every
+tick (with every field populated, as the simulator sends them) and times
+``cls.from_msgpack`` against ``airsim.compact_decoder(cls)`` on it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import timeit
+from typing import Any, Dict, List
+
+# Ensure the repository root is on sys.path when executed directly
+if __package__ is None:
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    )
+
+import airsim
+
+TYPES = ("MultirotorState", "CollisionInfo", "Pose", "ImageResponse")
+
+
+def sample_message(cls: type) -> Dict[str, Any]:
+    """Return a reply dict for ``cls`` with every field set to its default."""
+    message = {}
+    for name in airsim.compact_class(cls).__slots__:
+        default = getattr(cls, name)
+        if isinstance(default, airsim.MsgpackMixin):
+            message[name] = sample_message(type(default))
+        else:
+            message[name] = default
+    return message
+
+
+def benchmark(cls: type, number: int = 20000) -> Dict[str, Any]:
+    """Time both decoders on a sample message for ``cls``.
+
+    Returns:
+        A dictionary with the type ``name`` and decode rates in objects per
+        second for ``dict_per_s`` (``from_msgpack``) and ``compact_per_s``.
+    """
+    message = sample_message(cls)
+    compact = airsim.compact_decoder(cls)
+    dict_s = min(timeit.repeat(lambda: cls.from_msgpack(message), number=number, repeat=3))
+    compact_s = min(timeit.repeat(lambda: compact(message), number=number, repeat=3))
+    return {
+        "name": cls.__name__,
+        "dict_per_s": number / dict_s,
+        "compact_per_s": number / compact_s,
+    }
+
+
+def run(number: int = 20000) -> List[Dict[str, Any]]:
+    """Benchmark every type in :data:`TYPES`."""
+    return [benchmark(getattr(airsim, name), number) for name in TYPES]
+
+
+def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=20000,
+        help="Decodes per timing run (default: 20000)",
+    )
+    args = parser.parse_args()
+    for row in run(args.number):
+        print(
+            f"{row['name']:>16}: from_msgpack {row['dict_per_s']:>10,.0f}/s, "
+            f"compact {row['compact_per_s']:>10,.0f}/s "
+            f"({row['compact_per_s'] / row['dict_per_s']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
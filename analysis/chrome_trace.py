@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Export a run's per-frame pipeline timings as a Chrome trace.
+
+The output is Chrome trace-event JSON, which ``ui.perfetto.dev`` and
+``chrome://tracing`` open directly. Each frame becomes a set of slices on
+four tracks: the perception thread (fetch, decode, track), the control loop
+(decide, dispatch, log inside one slice per frame), the video writer and the
+log writer. An arrow links each frame's perception slices to the control
+tick that consumed it, and counters plot the loop period and FPS, so stalls
+and overlap against the loop budget are visible at a glance.
+
+Logs with ``perf_counter_ns`` stamps (schema version 2) are placed exactly.
+Older logs only carry the rounded ``simgetimage_s``, ``decode_s``,
+``processing_s`` and ``loop_s`` durations. Their perception stages are laid
+out back to back ending at the tick that consumed the frame, so the slices
+show durations, not exact start times.
+
+The video and log writer tracks come from the ``thread_spans_*.csv`` files
+``main.py`` writes at shutdown. Only spans within the log's time range are
+kept, so one file can serve every log of a run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Ensure the repository root is on sys.path when executed directly
+if __package__ is None:
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    )
+
+from uav.flight_log import read_binary_log
+from uav.spans import PERCEPTION_STAMPS, SPANS, STAMPS
+
+PID = 1
+# track -> (tid, display name)
+TRACKS: Dict[str, tuple] = {
+    "perception": (1, "Perception"),
+    "control": (2, "Control loop"),
+    "video": (3, "Video writer"),
+    "log": (4, "Log writer"),
+}
+PERCEPTION_SPANS = tuple(span for span in SPANS if span[2] in PERCEPTION_STAMPS)
+CONTROL_SPANS = tuple(span for span in SPANS if span[0] in ("decide", "dispatch", "log"))
+# Duration columns of logs without stamps, in pipeline order
+SECONDS_STAGES = (("fetch", "simgetimage_s"), ("decode", "decode_s"), ("track", "processing_s"))
+
+
+def load_log(path: str) -> pd.DataFrame:
+    """Read a ``full_log_*`` CSV or binary flight log into a frame."""
+    if not path.endswith(".bin"):
+        return pd.read_csv(path)
+    meta, records = read_binary_log(path)
+    df = pd.DataFrame(records)
+    if "state" in df.columns:
+        states = meta["states"]
+        df["state"] = [
+            states[code] if 0 <= code < len(states) else "unknown"
+            for code in df["state"].tolist()
+        ]
+    return df
+
+
+def has_stamps(df: pd.DataFrame) -> bool:
+    """Return ``True`` if ``df`` carries measured ``perf_counter_ns`` stamps."""
+    return all(name in df.columns for name in STAMPS) and bool(
+        (df["log_ns"].to_numpy() > 0).any()
+    )
+
+
+def _slice(track: str, name: str, ts: float, dur: float, args: Optional[dict] = None) -> Dict[str, Any]:
+    event = {
+        "name": name,
+        "cat": track,
+        "ph": "X",
+        "pid": PID,
+        "tid": TRACKS[track][0],
+        "ts": ts,
+        "dur": max(dur, 0.0),
+    }
+    if args:
+        event["args"] = args
+    return event
+
+
+def _counter(ts: float, values: Dict[str, float]) -> Dict[str, Any]:
+    return {"name": "loop", "ph": "C", "pid": PID, "ts": ts, "args": values}
+
+
+def _frame_args(row: Dict[str, Any]) -> Dict[str, Any]:
+    args = {"frame": int(row["frame"])}
+    for name in ("state", "features", "loop_s", "overrun_s"):
+        if name in row:
+            value = row[name]
+            args[name] = value if isinstance(value, str) else float(value)
+    return args
+
+
+def _loop_values(row: Dict[str, Any]) -> Dict[str, float]:
+    values = {}
+    if "loop_s" in row:
+        values["loop_ms"] = 1000.0 * float(row["loop_s"])
+    if "fps" in row:
+        values["fps"] = float(row["fps"])
+    return values
+
+
+def stamp_events(df: pd.DataFrame, origin_ns: int) -> List[Dict[str, Any]]:
+    """Trace events for rows with ``perf_counter_ns`` stamps.
+
+    Timestamps are microseconds since ``origin_ns``.
+    """
+    events: List[Dict[str, Any]] = []
+
+    def us(ns: int) -> float:
+        return (ns - origin_ns) / 1e3
+
+    for i, row in enumerate(df.to_dict("records")):
+        stamps = {name: int(row[name]) for name in STAMPS}
+        args = {"frame": int(row["frame"])}
+        for name, start, end in PERCEPTION_SPANS:
+            if stamps[start] and stamps[end]:
+                events.append(
+                    _slice("perception", name, us(stamps[start]), (stamps[end] - stamps[start]) / 1e3, args)
+                )
+        if not stamps["dequeue_ns"] or not stamps["log_ns"]:
+            continue
+        events.append(
+            _slice(
+                "control",
+                f"frame {args['frame']}",
+                us(stamps["dequeue_ns"]),
+                (stamps["log_ns"] - stamps["dequeue_ns"]) / 1e3,
+                _frame_args(row),
+            )
+        )
+        for name, start, end in CONTROL_SPANS:
+            if stamps[start] and stamps[end]:
+                events.append(
+                    _slice("control", name, us(stamps[start]), (stamps[end] - stamps[start]) / 1e3)
+                )
+        if stamps["processed_ns"]:
+            # Hand-off arrow from the end of tracking to the consuming tick
+            flow = {"name": "handoff", "cat": "handoff", "pid": PID, "id": i}
+            events.append(
+                dict(flow, ph="s", tid=TRACKS["perception"][0], ts=us(stamps["processed_ns"]))
+            )
+            events.append(
+                dict(flow, ph="f", bp="e", tid=TRACKS["control"][0], ts=us(stamps["dequeue_ns"]))
+            )
+        values = _loop_values(row)
+        if values:
+            events.append(_counter(us(stamps["log_ns"]), values))
+    return events
+
+
+def seconds_events(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Trace events for logs with only rounded second durations.
+
+    Timestamps are microseconds since the first row's ``time``.
+    """
+    events: List[Dict[str, Any]] = []
+    rows = df.to_dict("records")
+    if not rows:
+        return events
+    origin = float(rows[0]["time"])
+    for row in rows:
+        tick = 1e6 * (float(row["time"]) - origin)
+        args = {"frame": int(row["frame"])}
+        stages = [(name, 1e6 * float(row.get(column, 0.0))) for name, column in SECONDS_STAGES]
+        ts = tick - sum(dur for _, dur in stages)
+        for name, dur in stages:
+            events.append(_slice("perception", name, ts, dur, args))
+            ts += dur
+        loop_us = 1e6 * float(row.get("loop_s", 0.0))
+        events.append(_slice("control", f"frame {args['frame']}", tick, loop_us, _frame_args(row)))
+        values = _loop_values(row)
+        if values:
+            events.append(_counter(tick, values))
+    return events
+
+
+def thread_events(
+    spans: Iterable[Sequence[Any]], origin_ns: int, start_ns: int, end_ns: int
+) -> List[Dict[str, Any]]:
+    """Trace events for ``(track, name, start_ns, end_ns)`` thread spans.
+
+    Spans outside ``[start_ns, end_ns]`` or on unknown tracks are skipped.
+    """
+    events = []
+    for track, name, span_start, span_end in spans:
+        span_start, span_end = int(span_start), int(span_end)
+        if track not in TRACKS or span_end < start_ns or span_start > end_ns:
+            continue
+        events.append(
+            _slice(track, name, (span_start - origin_ns) / 1e3, (span_end - span_start) / 1e3)
+        )
+    return events
+
+
+def read_thread_spans(paths: Iterable[str]) -> List[tuple]:
+    """Load and concatenate ``thread_spans_*.csv`` files."""
+    spans: List[tuple] = []
+    for path in paths:
+        df = pd.read_csv(path)
+        spans.extend(df[["track", "name", "start_ns", "end_ns"]].itertuples(index=False, name=None))
+    return spans
+
+
+def build_trace(df: pd.DataFrame, thread_spans: Iterable[Sequence[Any]] = ()) -> Dict[str, Any]:
+    """Convert flight log rows (and thread spans) to a Chrome trace.
+
+    Args:
+        df: Rows of one flight log.
+        thread_spans: ``(track, name, start_ns, end_ns)`` spans of the
+            helper threads. They are only placed for logs with stamps, since
+            older logs share no clock with them.
+
+    Returns:
+        A ``{"traceEvents": [...]}`` dictionary ready for :func:`json.dump`.
+    """
+    events: List[Dict[str, Any]] = [
+        {"name": "process_name", "ph": "M", "pid": PID, "args": {"name": "UAV pipeline"}}
+    ]
+    for tid, label in TRACKS.values():
+        events.append({"name": "thread_name", "ph": "M", "pid": PID, "tid": tid, "args": {"name": label}})
+        events.append({"name": "thread_sort_index", "ph": "M", "pid": PID, "tid": tid, "args": {"sort_index": tid}})
+
+    if has_stamps(df):
+        stamps = df[list(STAMPS)].to_numpy(dtype=np.int64)
+        measured = stamps[stamps > 0]
+        origin_ns = int(measured.min())
+        events.extend(stamp_events(df, origin_ns))
+        events.extend(thread_events(thread_spans, origin_ns, origin_ns, int(measured.max())))
+    else:
+        events.extend(seconds_events(df))
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_trace(
+    log_path: str,
+    output: Optional[str] = None,
+    thread_span_paths: Optional[Iterable[str]] = None,
+) -> str:
+    """Write the Chrome trace of one flight log and return its path.
+
+    Args:
+        log_path: ``full_log_*`` CSV or binary log.
+        output: JSON path; defaults to the log path with ``.trace.json``.
+        thread_span_paths: Thread span CSVs; defaults to every
+            ``thread_spans_*.csv`` next to the log.
+    """
+    if output is None:
+        output = os.path.splitext(log_path)[0] + ".trace.json"
+    if thread_span_paths is None:
+        log_dir = os.path.dirname(log_path) or "."
+        thread_span_paths = sorted(glob.glob(os.path.join(log_dir, "thread_spans_*.csv")))
+    trace = build_trace(load_log(log_path), read_thread_spans(thread_span_paths))
+    with open(output, "w") as f:
+        json.dump(trace, f)
+    return output
+
+
+def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Export flight log timings as Chrome trace-event JSON"
+    )
+    parser.add_argument(
+        "--log",
+        help="full_log_* CSV or binary log (default: the latest CSV in --log-dir)",
+    )
+    parser.add_argument(
+        "--log-dir",
+        default="flow_logs",
+        help="Directory containing full_log_*.csv files",
+    )
+    parser.add_argument(
+        "--thread-spans",
+        nargs="*",
+        help="thread_spans_*.csv files (default: all next to the log)",
+    )
+    parser.add_argument("--output", help="Trace JSON path (default: <log>.trace.json)")
+    args = parser.parse_args()
+
+    log_path = args.log
+    if log_path is None:
+        pattern = os.path.join(args.log_dir, "full_log_*.csv")
+        files = sorted(glob.glob(pattern))
+        if not files:
+            print(f"No log files found matching {pattern}")
+            return
+        log_path = files[-1]
+
+    output = export_trace(log_path, args.output, args.thread_spans)
+    print(f"✅ Trace written to {output}; open it in https://ui.perfetto.dev or chrome://tracing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Convert binary flight logs to the ``full_log_*.csv`` layout.
+
+``main.py --log-format binary`` converts its log when the run ends. Use
+this script for logs left behind by a run that did not shut down cleanly,
+or to convert specific files again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+from typing import List
+
+# Ensure the repository root is on sys.path when executed directly
+if __package__ is None:
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    )
+
+from uav.flight_log import binary_log_to_csv
+
+
+def pending_logs(log_dir: str) -> List[str]:
+    """Return ``full_log_*.bin`` files in ``log_dir`` without a CSV beside them."""
+    pattern = os.path.join(log_dir, "full_log_*.bin")
+    return [
+        path
+        for path in sorted(glob.glob(pattern))
+        if not os.path.exists(os.path.splitext(path)[0] + ".csv")
+    ]
+
+
+def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "logs",
+        nargs="*",
+        help="Binary logs to convert (default: unconverted logs in --log-dir)",
+    )
+    parser.add_argument(
+        "--log-dir",
+        default="flow_logs",
+        help="Directory containing full_log_*.bin files",
+    )
+    args = parser.parse_args()
+
+    paths = args.logs or pending_logs(args.log_dir)
+    if not paths:
+        print("No binary logs to convert.")
+        return
+    for path in paths:
+        print(f"{path} -> {binary_log_to_csv(path)}")
+
+
+if __name__ == "__main__":
+    main()
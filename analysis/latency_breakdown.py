@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Break per-frame latency down into the spans of :mod:`uav.spans`.
+
+Flight logs written with schema version 2 carry ``perf_counter_ns`` stamps
+for every frame. This script turns consecutive stamps into span durations
+(fetch, decode, track, hand-off, decide, dispatch, log and the end-to-end
+``capture_to_log``) and prints their distribution in microseconds. Stamps
+of ``0`` were not measured and leave the spans they delimit out; logs
+without stamp columns are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Ensure the repository root is on sys.path when executed directly
+if __package__ is None:
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    )
+
+from uav.spans import SPANS, TOTAL_SPAN
+
+STATS = ("count", "mean", "p50", "p95", "p99", "max")
+
+
+def frame_spans(df: pd.DataFrame) -> pd.DataFrame:
+    """Return one column per span with its duration in microseconds.
+
+    Args:
+        df: Flight log rows with the stamp columns of :data:`uav.spans.STAMPS`.
+
+    Returns:
+        A frame indexed like ``df``; spans with a missing stamp are ``NaN``.
+    """
+    spans = {}
+    for name, start, end in SPANS + (TOTAL_SPAN,):
+        if start not in df.columns or end not in df.columns:
+            continue
+        begin = df[start].to_numpy(dtype=np.int64)
+        finish = df[end].to_numpy(dtype=np.int64)
+        # Subtract in int64 before converting so ns resolution survives
+        us = (finish - begin) / 1e3
+        us[(begin == 0) | (finish == 0)] = np.nan
+        spans[name] = us
+    return pd.DataFrame(spans, index=df.index)
+
+
+def latency_breakdown(df: pd.DataFrame) -> pd.DataFrame:
+    """Summarise :func:`frame_spans` of ``df``.
+
+    Returns:
+        One row per span with the :data:`STATS` columns in microseconds;
+        ``count`` is the number of frames the span was measured on.
+    """
+    spans = frame_spans(df)
+    rows = {}
+    for name in spans.columns:
+        values = spans[name].dropna().to_numpy()
+        if not len(values):
+            rows[name] = [0] + [float("nan")] * (len(STATS) - 1)
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        rows[name] = [len(values), values.mean(), p50, p95, p99, values.max()]
+    return pd.DataFrame.from_dict(rows, orient="index", columns=list(STATS))
+
+
+def format_breakdown(summary: pd.DataFrame) -> str:
+    """Render a :func:`latency_breakdown` result as a text table."""
+    lines = [f"{'span':<15}" + "".join(f"{stat:>11}" for stat in STATS)]
+    for name, row in summary.iterrows():
+        cells = f"{int(row['count']):>11d}" + "".join(
+            f"{row[stat]:>11.1f}" for stat in STATS[1:]
+        )
+        lines.append(f"{name:<15}{cells}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Per-stage latency breakdown of flight logs (microseconds)"
+    )
+    parser.add_argument(
+        "logs",
+        nargs="*",
+        help="full_log_*.csv files (default: the latest in --log-dir)",
+    )
+    parser.add_argument(
+        "--log-dir",
+        default="flow_logs",
+        help="Directory containing full_log_*.csv files",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Pool every log in --log-dir instead of only the latest",
+    )
+    args = parser.parse_args()
+
+    files: List[str] = args.logs
+    if not files:
+        pattern = os.path.join(args.log_dir, "full_log_*.csv")
+        files = sorted(glob.glob(pattern))
+        if not files:
+            print(f"No log files found matching {pattern}")
+            return
+        if not args.all:
+            files = files[-1:]
+
+    frames = []
+    for path in files:
+        try:
+            df = pd.read_csv(path)
+        except Exception as exc:
+            print(f"Error reading {path}: {exc}")
+            continue
+        if TOTAL_SPAN[1] not in df.columns:
+            print(f"{os.path.basename(path)}: no span stamps (schema < 2), skipped")
+            continue
+        frames.append(df)
+    if not frames:
+        return
+
+    summary = latency_breakdown(pd.concat(frames, ignore_index=True))
+    print(f"Latency breakdown over {len(frames)} log(s), microseconds:")
+    print(format_breakdown(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Replay recorded flow logs through the navigation decision engine.
+
+Each ``full_log_*.csv`` row is turned into :class:`uav.decision.DecisionInputs`
+and fed to :func:`uav.decision.decide` without touching the simulator. This
+makes it possible to compare threshold settings across every recorded run in
+seconds. The replay is open loop: the logged flow and speed are used as-is,
+so it shows which decisions a parameter set would make, not how the flight
+would have unfolded.
+
+The probe band measurements are not logged; they default to values that
+leave the flat-wall fallback disabled.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import fields
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# Ensure the repository root is on sys.path when executed directly
+if __package__ is None:
+    sys.path.insert(
+        0,
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+    )
+
+from uav.decision import (
+    DEFAULT_PARAMS,
+    DecisionInputs,
+    DecisionParams,
+    NavState,
+    decide,
+)
+
+
+def _column(df: pd.DataFrame, name: str, default: float = 0.0) -> list:
+    """Return a column as a list of Python floats (fast to index per row)."""
+    if name in df.columns:
+        values = df[name].to_numpy(dtype=float)
+    else:
+        values = np.full(len(df), default, dtype=float)
+    return values.tolist()
+
+
+def replay_log(
+    path: str, params: DecisionParams = DEFAULT_PARAMS
+) -> Dict[str, Any]:
+    """Run the decision engine over one log file.
+
+    Args:
+        path: Path to a ``full_log_*.csv`` file.
+        params: Thresholds to evaluate.
+
+    Returns:
+        A dictionary with the number of ``frames``, the replayed ``states``
+        counts, ``agreement`` (fraction of rows whose replayed state matches
+        the logged one), ``obstacles`` and the replay speed in ``fps``.
+    """
+    df = pd.read_csv(path)
+    t = _column(df, "time")
+    left = _column(df, "flow_left")
+    center = _column(df, "flow_center")
+    right = _column(df, "flow_right")
+    features = _column(df, "features")
+    speed = _column(df, "speed")
+    flow_std = _column(df, "flow_std")
+    pos_x = _column(df, "pos_x")
+    pos_y = _column(df, "pos_y")
+    logged = (
+        df["state"].astype(str).to_numpy() if "state" in df.columns else None
+    )
+
+    frames = len(df)
+    states: Counter = Counter()
+    matches = 0
+    obstacles = 0
+    nav_state = NavState(last_movement_time=float(t[0]) if frames else 0.0)
+    start = time.perf_counter()
+    for i in range(frames):
+        inputs = DecisionInputs(
+            smooth_L=left[i],
+            smooth_C=center[i],
+            smooth_R=right[i],
+            center_mag=center[i],
+            probe_mag=0.0,
+            probe_count=0,
+            features=features[i],
+            speed=speed[i],
+            flow_std=flow_std[i],
+            pos_x=pos_x[i],
+            pos_y=pos_y[i],
+        )
+        decision, nav_state = decide(inputs, nav_state, t[i], params)
+        states[decision.state] += 1
+        obstacles += decision.obstacle
+        if logged is not None and logged[i] == decision.state:
+            matches += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": frames,
+        "states": dict(states),
+        "agreement": matches / frames if frames and logged is not None else float("nan"),
+        "obstacles": obstacles,
+        "fps": frames / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main() -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Replay flow logs through the decision engine"
+    )
+    parser.add_argument(
+        "--log-dir",
+        default="flow_logs",
+        help="Directory containing full_log_*.csv files",
+    )
+    for field in fields(DecisionParams):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=type(field.default),
+            default=field.default,
+            help=f"Decision parameter (default: {field.default})",
+        )
+    args = parser.parse_args()
+    params = DecisionParams(
+        **{field.name: getattr(args, field.name) for field in fields(DecisionParams)}
+    )
+
+    pattern = os.path.join(args.log_dir, "full_log_*.csv")
+    files = sorted(glob.glob(pattern))
+    if not files:
+        print(f"No log files found matching {pattern}")
+        return
+
+    total_frames = 0
+    total_time = 0.0
+    for path in files:
+        try:
+            result = replay_log(path, params)
+        except Exception as exc:
+            print(f"Error processing {path}: {exc}")
+            continue
+        total_frames += result["frames"]
+        if result["frames"]:
+            total_time += result["frames"] / result["fps"]
+        states = ", ".join(
+            f"{name}={count}" for name, count in sorted(result["states"].items())
+        )
+        print(
+            f"{os.path.basename(path)}: frames={result['frames']}, "
+            f"obstacles={result['obstacles']}, "
+            f"agreement={result['agreement']:.1%}, {states}"
+        )
+    if total_time > 0:
+        print(
+            f"Replayed {total_frames} frames at "
+            f"{total_frames / total_time:,.0f} frames/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,17 @@ from datetime import datetime
 import os
 import subprocess
 import math
-from airsim import ImageRequest, ImageType
 import argparse
 from queue import Queue
 from threading import Thread
-from multiprocessing import Process, Queue as MPQueue
+from multiprocessing import Process
 
-from uav.perception import OpticalFlowTracker
+from uav.mailbox import LatestMailbox
+from uav.perception import OpticalFlowTracker, perception_result
+from uav.pipeline import StagedPerceptionPipeline
+from uav.preprocessing import PROFILES, STEPS as PREPROCESS_STEPS, FramePreprocessor
+from uav.shm_ring import SharedFrameRing
+from uav.spans import SpanRecorder, ThreadSpans, now_ns
 
 from uav.utils import FLOW_STD_MAX
 
@@ -24,8 +28,50 @@ ENV_UE4_PATH = os.environ.get("UE4_PATH")
 ue4_default = ENV_UE4_PATH if ENV_UE4_PATH else DEFAULT_UE4_PATH
 
 
-def perception_worker(queue: MPQueue, flag) -> None:
-    """Capture images and compute optical flow in a separate process."""
+def parse_resolution(value: str):
+    """Parse a ``WIDTHxHEIGHT`` string such as ``640x360``."""
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid resolution '{value}', expected WIDTHxHEIGHT"
+        )
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("Resolution must be positive")
+    return width, height
+
+
+def make_preprocessor(profile=None, size=None):
+    """Build the tracker's ``FramePreprocessor``.
+
+    ``profile`` names an entry of :data:`uav.preprocessing.PROFILES`;
+    ``size`` (``--proc-res``) overrides the profile's resolution.
+    """
+    if profile is None:
+        return FramePreprocessor(size=size)
+    overrides = {} if size is None else {"size": size}
+    return FramePreprocessor.from_profile(profile, **overrides)
+
+
+def perception_worker(
+    mailbox,
+    flag,
+    processing_size=None,
+    raw_images: bool = True,
+    keep_tracks: bool = False,
+    min_tracks=None,
+    clock_mode: str = "wall",
+    clock_speed: float = 1.0,
+    preprocess_profile=None,
+) -> None:
+    """Capture images and compute optical flow in a separate process.
+
+    ``mailbox`` is a :class:`SharedFrameRing`; each
+    :class:`uav.perception.PerceptionResult` is published with
+    ``mailbox.put``.
+    """
+    from uav.acquisition import ImageFetcher
+    from uav.clock import make_clock
     from uav.perception import OpticalFlowTracker
 
     feature_params = dict(maxCorners=150, qualityLevel=0.05, minDistance=5, blockSize=5)
@@ -34,77 +80,57 @@ def perception_worker(queue: MPQueue, flag) -> None:
         maxLevel=2,
         criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
     )
-    tracker = OpticalFlowTracker(lk_params, feature_params)
-    last_vis_img = np.zeros((720, 1280, 3), dtype=np.uint8)
-
     # Use a dedicated RPC client to avoid cross-process issues
-    local_client = airsim.MultirotorClient()
+    local_client = airsim.MultirotorClient(compact_types=True)
     local_client.confirmConnection()
 
+    tracker = OpticalFlowTracker(
+        lk_params,
+        feature_params,
+        keep_tracks=keep_tracks,
+        min_tracks=min_tracks,
+        preprocessor=make_preprocessor(preprocess_profile, processing_size),
+        clock=make_clock(clock_mode, local_client, clock_speed),
+    )
+    last_vis_img = np.zeros((720, 1280, 3), dtype=np.uint8)
+    fetcher = ImageFetcher(local_client, raw=raw_images)
+
     while not flag.is_set():
-        t0 = time.time()
-        responses = local_client.simGetImages([
-            ImageRequest("oakd_camera", ImageType.Scene, False, True)
-        ])
-        t_fetch_end = time.time()
-        response = responses[0]
-
-        if (
-            response.width == 0
-            or response.height == 0
-            or len(response.image_data_uint8) == 0
-        ):
-            data = (
-                last_vis_img,
-                np.array([]),
-                np.array([]),
-                0.0,
-                t_fetch_end - t0,
-                0.0,
-                0.0,
+        capture_ns = now_ns()
+        response = fetcher.fetch()
+        fetched_ns = now_ns()
+
+        if not fetcher.is_empty(response) and fetcher.is_duplicate(response):
+            # Same render as the previous frame; skip decode and tracking
+            continue
+        capture_time = fetcher.capture_time(response)
+        if fetcher.is_empty(response):
+            data = perception_result(
+                last_vis_img, (capture_ns, fetched_ns, fetched_ns, fetched_ns)
             )
         else:
-            img1d = np.frombuffer(response.image_data_uint8, dtype=np.uint8).copy()
-            img = cv2.imdecode(img1d, cv2.IMREAD_COLOR)
-            t_decode_end = time.time()
+            img = fetcher.decode(response)
+            decoded_ns = now_ns()
             if img is None:
                 continue
-            img = cv2.resize(img, (1280, 720))
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             vis_img = img.copy()
             last_vis_img = vis_img
 
+            flow = None
             if tracker.prev_gray is None:
-                tracker.initialize(gray)
-                data = (
-                    vis_img,
-                    np.array([]),
-                    np.array([]),
-                    0.0,
-                    t_fetch_end - t0,
-                    t_decode_end - t_fetch_end,
-                    0.0,
-                )
+                tracker.initialize(gray, capture_time)
             else:
-                t_proc_start = time.time()
-                good_old, flow_vectors, flow_std = tracker.process_frame(gray, t0)
-                processing_s = time.time() - t_proc_start
-                data = (
-                    vis_img,
-                    good_old,
-                    flow_vectors,
-                    flow_std,
-                    t_fetch_end - t0,
-                    t_decode_end - t_fetch_end,
-                    processing_s,
-                )
+                flow = tracker.process_frame(gray, capture_time)
+            data = perception_result(
+                vis_img,
+                (capture_ns, fetched_ns, decoded_ns, now_ns()),
+                capture_time,
+                flow,
+                tracker.preprocessor.step_timings(),
+            )
 
-        if queue.full():
-            try:
-                queue.get_nowait()
-            except Exception:
-                pass
-        queue.put(data)
+        mailbox.put(data)
 
 def main():
     parser = argparse.ArgumentParser(description="Optical flow navigation script")
@@ -114,12 +140,122 @@ def main():
         default=ue4_default,
         help="Path to the Unreal Engine executable (or set UE4_PATH env variable)",
     )
+    parser.add_argument(
+        "--keep-tracks",
+        action="store_true",
+        help="Carry feature tracks across frames instead of re-detecting corners every frame",
+    )
+    parser.add_argument(
+        "--min-tracks",
+        type=int,
+        default=None,
+        help="Live track count that triggers corner replenishment (default: half of maxCorners)",
+    )
+    parser.add_argument(
+        "--proc-res",
+        type=parse_resolution,
+        default=None,
+        metavar="WIDTHxHEIGHT",
+        help="Resolution optical flow is tracked at, e.g. 640x360 (default: full 1280x720 frame)",
+    )
+    parser.add_argument(
+        "--preprocess-profile",
+        choices=sorted(PROFILES),
+        default=None,
+        help="Preprocessing steps applied before tracking (default: CLAHE at "
+             "--proc-res); --proc-res overrides the profile's resolution",
+    )
+    parser.add_argument(
+        "--image-mode",
+        choices=["raw", "png"],
+        default="raw",
+        help="Fetch uncompressed frames (falls back to PNG automatically) or PNG-compressed frames",
+    )
+    parser.add_argument(
+        "--perception-mode",
+        choices=["thread", "process", "staged"],
+        default="thread",
+        help="Run perception in a background thread, in a separate process "
+             "that shares frames through a shared-memory ring buffer, or as "
+             "separate fetch/decode/track threads",
+    )
+    parser.add_argument(
+        "--telemetry-rate",
+        type=float,
+        default=0.0,
+        metavar="HZ",
+        help="Poll vehicle state on a background thread at this rate instead "
+             "of once per control tick (default: 0, disabled)",
+    )
+    parser.add_argument(
+        "--loop-rate",
+        type=float,
+        default=20.0,
+        metavar="HZ",
+        help="Target control loop rate (default: 20)",
+    )
+    parser.add_argument(
+        "--overrun-policy",
+        choices=["skip", "catch_up", "degrade"],
+        default="skip",
+        help="What the loop scheduler does after a tick overruns its budget",
+    )
+    parser.add_argument(
+        "--clock",
+        choices=["wall", "sim"],
+        default="wall",
+        help="Time source for navigation timers, flow rates and loop pacing",
+    )
+    parser.add_argument(
+        "--clock-speed",
+        type=float,
+        default=1.0,
+        help="Simulator ClockSpeed from settings.json, used with --clock sim",
+    )
+    parser.add_argument(
+        "--dispatch",
+        choices=["async", "sync"],
+        default="async",
+        help="Send motion commands from a dispatcher thread with its own RPC "
+             "client (async) or directly from the control loop (sync)",
+    )
+    parser.add_argument(
+        "--io",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Talk to the simulator from separate threads and clients per "
+             "concern (threads), or fetch images, poll telemetry and send "
+             "commands over one client on a single asyncio event loop",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=["binary", "csv"],
+        default="binary",
+        help="Append per-frame log records to a memory-mapped binary file "
+             "converted to CSV at exit (binary), or write CSV lines (csv)",
+    )
+    parser.add_argument(
+        "--log-fsync",
+        choices=["never", "interval", "always"],
+        default="interval",
+        help="When the log sink thread forces the flight log to disk "
+             "(default: once per second)",
+    )
     args = parser.parse_args()
 
+    from uav.acquisition import ImageFetcher
+    from uav.async_driver import AsyncDriver
+    from uav.clock import make_clock
+    from uav.decision import DecisionInputs, NavState, decide
+    from uav.dispatcher import CommandDispatcher
+    from uav.log_sink import LogSink
     from uav.interface import exit_flag, start_gui
     from uav.perception import FlowHistory
     from uav.navigation import Navigator
-    from uav.utils import get_drone_state, retain_recent_logs, should_flat_wall_dodge
+    from uav.scheduler import RateScheduler
+    from uav.stats import RunStats
+    from uav.telemetry import TelemetryPoller, fetch_telemetry
+    from uav.utils import retain_recent_logs
     from analysis.utils import retain_recent_views
 
     # GUI parameter and status holders
@@ -128,7 +264,9 @@ def main():
         'C': [0.0],
         'R': [0.0],
         'state': [''],
-        'reset_flag': [False]
+        'reset_flag': [False],
+        'telemetry': [None],
+        'stats': [None],
     }
 
     start_gui(param_refs)
@@ -142,45 +280,83 @@ def main():
     except Exception as e:
         print("Failed to launch UE4:", e)
 
-    client = airsim.MultirotorClient()
+    client = airsim.MultirotorClient(compact_types=True)
     client.confirmConnection()
     print("Connected!")
     client.enableApiControl(True)
     client.armDisarm(True)
+    clock = make_clock(args.clock, client, args.clock_speed)
 
     # After takeoff
     client.takeoffAsync().join()
     client.moveToPositionAsync(0, 0, -2, 2).join()
 
+    # Optional background telemetry poller with its own RPC client
+    telemetry_poller = None
+    TELEMETRY_MAX_AGE = 0.5  # seconds before falling back to a direct fetch
+    if args.telemetry_rate > 0 and args.io == "threads":
+        def make_telemetry_client():
+            local_client = airsim.MultirotorClient(compact_types=True)
+            local_client.confirmConnection()
+            return local_client
+
+        telemetry_poller = TelemetryPoller(make_telemetry_client, rate_hz=args.telemetry_rate)
+        telemetry_poller.start()
+        param_refs['telemetry'][0] = telemetry_poller
+
     # Tune feature detection to pick up more corners even on smooth surfaces
     feature_params = dict(maxCorners=150, qualityLevel=0.05, minDistance=5, blockSize=5)
 
     lk_params = dict(winSize=(15, 15), maxLevel=2,
                      criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
 
-    tracker = OpticalFlowTracker(lk_params, feature_params)
+    tracker = OpticalFlowTracker(
+        lk_params,
+        feature_params,
+        keep_tracks=args.keep_tracks,
+        min_tracks=args.min_tracks,
+        preprocessor=make_preprocessor(args.preprocess_profile, args.proc_res),
+        clock=clock,
+    )
 
     flow_history = FlowHistory()
-    navigator = Navigator(client)
-    from collections import deque
-    state_history = deque(maxlen=3)
-    pos_history = deque(maxlen=3)
+    navigator = Navigator(client, clock=clock)
+    nav_state = NavState(last_movement_time=clock.now())
+
+    # Motion commands leave the control loop through a dispatcher thread so
+    # loop timing does not depend on simulator RPC latency
+    dispatcher = None
+    if args.dispatch == "async" and args.io == "threads":
+        def make_command_navigator():
+            local_client = airsim.MultirotorClient(compact_types=True)
+            local_client.confirmConnection()
+            return Navigator(local_client, clock=clock)
+
+        dispatcher = CommandDispatcher(make_command_navigator, clock=clock.monotonic)
+        dispatcher.start()
 
     frame_count = 0
-    start_time = time.time()
+    start_time = clock.now()
     MAX_SIM_DURATION = 60  # seconds
     GOAL_X = 29  # distance from start in AirSim coordinates
     GOAL_RADIUS = 1.0  # meters
-    MIN_PROBE_FEATURES = 5
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     os.makedirs("flow_logs", exist_ok=True)
-    log_file = open(f"flow_logs/full_log_{timestamp}.csv", 'w')
-    log_file.write(
-        "frame,time,features,flow_left,flow_center,flow_right,"
-        "flow_std,pos_x,pos_y,pos_z,yaw,speed,state,collided,obstacle,side_safe,"
-        "brake_thres,dodge_thres,probe_req,fps,simgetimage_s,decode_s,processing_s,loop_s\n"
+    # Work of the video and log writer threads, for analysis/chrome_trace.py
+    thread_spans = ThreadSpans()
+    thread_spans_path = f"flow_logs/thread_spans_{timestamp}.csv"
+    # Log records are formatted, written, synced and rotated on a sink
+    # thread; the control loop only enqueues them
+    log_sink = LogSink(
+        f"flow_logs/full_log_{timestamp}",
+        args.log_format,
+        fsync=args.log_fsync,
+        retain=lambda path: retain_recent_logs(
+            "flow_logs", pattern=f"full_log_*{os.path.splitext(path)[1]}"
+        ),
+        spans=thread_spans,
     )
-    retain_recent_logs("flow_logs")
+    log_sink.start()
 
     # Video writer setup
     fourcc = cv2.VideoWriter_fourcc(*'MJPG')
@@ -195,129 +371,178 @@ def main():
             frame = frame_queue.get()
             if frame is None:
                 break
+            start = now_ns()
             out.write(frame)
+            thread_spans.record("video", "write", start)
             frame_queue.task_done()
 
     video_thread = Thread(target=video_worker, daemon=True)
     video_thread.start()
 
-    # Perception thread for image capture and optical flow
-    perception_queue: Queue = Queue(maxsize=1)
+    # Perception thread for image capture and optical flow. The mailbox keeps
+    # only the newest result so the control loop never acts on a stale frame.
+    perception_queue = LatestMailbox()
     last_vis_img = np.zeros((720, 1280, 3), dtype=np.uint8)
     
-    def perception_worker() -> None:
+    def perception_thread_worker() -> None:
         nonlocal last_vis_img
         # Use a dedicated RPC client to avoid cross-thread issues
-        local_client = airsim.MultirotorClient()
+        local_client = airsim.MultirotorClient(compact_types=True)
         local_client.confirmConnection()
-        request = [ImageRequest("oakd_camera", ImageType.Scene, False, True)]
+        fetcher = ImageFetcher(local_client, raw=args.image_mode == "raw")
         while not exit_flag.is_set():
-            t0 = time.time()
-            responses = local_client.simGetImages(request)
-            t_fetch_end = time.time()
-            response = responses[0]
-            if (
-                response.width == 0
-                or response.height == 0
-                or len(response.image_data_uint8) == 0
-            ):
-                data = (
-                    last_vis_img,
-                    np.array([]),
-                    np.array([]),
-                    0.0,
-                    t_fetch_end - t0,
-                    0.0,
-                    0.0,
+            capture_ns = now_ns()
+            response = fetcher.fetch()
+            fetched_ns = now_ns()
+            if not fetcher.is_empty(response) and fetcher.is_duplicate(response):
+                # Same render as the previous frame; skip decode and tracking
+                continue
+            capture_time = fetcher.capture_time(response)
+            if fetcher.is_empty(response):
+                data = perception_result(
+                    last_vis_img, (capture_ns, fetched_ns, fetched_ns, fetched_ns)
                 )
             else:
-                img1d = np.frombuffer(response.image_data_uint8, dtype=np.uint8).copy()
-                img = cv2.imdecode(img1d, cv2.IMREAD_COLOR)
-                t_decode_end = time.time()
+                img = fetcher.decode(response)
+                decoded_ns = now_ns()
                 if img is None:
                     continue
-                img = cv2.resize(img, (1280, 720))
                 gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
                 vis_img = img.copy()
                 last_vis_img = vis_img
+                flow = None
                 if tracker.prev_gray is None:
-                    tracker.initialize(gray)
-                    data = (
-                        vis_img,
-                        np.array([]),
-                        np.array([]),
-                        0.0,
-                        t_fetch_end - t0,
-                        t_decode_end - t_fetch_end,
-                        0.0,
-                    )
+                    tracker.initialize(gray, capture_time)
                 else:
-                    t_proc_start = time.time()
-                    good_old, flow_vectors, flow_std = tracker.process_frame(gray, t0)
-                    processing_s = time.time() - t_proc_start
-                    data = (
-                        vis_img,
-                        good_old,
-                        flow_vectors,
-                        flow_std,
-                        t_fetch_end - t0,
-                        t_decode_end - t_fetch_end,
-                        processing_s,
-                    )
-
-            try:
-                perception_queue.put(data, block=False)
-            except Exception:
-                # Drop frame if queue already contains an item
-                pass
+                    flow = tracker.process_frame(gray, capture_time)
+                data = perception_result(
+                    vis_img,
+                    (capture_ns, fetched_ns, decoded_ns, now_ns()),
+                    capture_time,
+                    flow,
+                    tracker.preprocessor.step_timings(),
+                )
 
-    perception_thread = Thread(target=perception_worker, daemon=True)
+            perception_queue.put(data)
+
+    if args.io == "asyncio":
+        # One event loop and one connection serve images, telemetry and
+        # commands; the loop below reads them through the usual interfaces
+        perception_thread = AsyncDriver(
+            lambda: airsim.AsyncMultirotorClient(compact_types=True),
+            lambda async_client: Navigator(async_client, clock=clock),
+            tracker,
+            perception_queue,
+            exit_flag,
+            raw=args.image_mode == "raw",
+            telemetry_rate_hz=args.telemetry_rate or 50.0,
+            clock=clock.monotonic,
+        )
+        telemetry_poller = perception_thread.telemetry
+        param_refs['telemetry'][0] = telemetry_poller
+        dispatcher = perception_thread.commands
+    elif args.perception_mode == "process":
+        # Track in a separate interpreter; results arrive zero-copy through
+        # shared memory instead of being pickled through a queue.
+        perception_queue = SharedFrameRing.create(
+            slots=4,
+            height=720,
+            width=1280,
+            max_points=feature_params["maxCorners"],
+        )
+        perception_thread = Process(
+            target=perception_worker,
+            args=(perception_queue, exit_flag),
+            kwargs=dict(
+                processing_size=args.proc_res,
+                raw_images=args.image_mode == "raw",
+                keep_tracks=args.keep_tracks,
+                min_tracks=args.min_tracks,
+                clock_mode=args.clock,
+                clock_speed=args.clock_speed,
+                preprocess_profile=args.preprocess_profile,
+            ),
+            daemon=True,
+        )
+    elif args.perception_mode == "staged":
+        def make_fetcher():
+            local_client = airsim.MultirotorClient(compact_types=True)
+            local_client.confirmConnection()
+            return ImageFetcher(local_client, raw=args.image_mode == "raw")
+
+        perception_thread = StagedPerceptionPipeline(
+            make_fetcher, tracker, perception_queue, exit_flag
+        )
+    else:
+        perception_thread = Thread(target=perception_thread_worker, daemon=True)
     perception_thread.start()
 
-    # Buffer log lines to throttle disk writes
-    log_buffer = []
-    LOG_INTERVAL = 5  # flush every 5 frames
 
+    # Fixed-rate control loop on absolute deadlines
+    scheduler = RateScheduler(
+        args.loop_rate,
+        policy=args.overrun_policy,
+        clock=clock.monotonic,
+        sleep=clock.sleep,
+    )
 
-    target_fps = 20
-    frame_duration = 1.0 / target_fps
-
-    fps_list = []
+    # FPS, loop time and per-stage spans (seconds) as constant-memory
+    # histograms; lo resolves sub-microsecond spans
+    run_stats = RunStats(lo=1e-7, hi=1e4)
+    param_refs['stats'][0] = run_stats
+    # Shared-memory frames recycled by the worker while being copied
+    torn_frames = 0
     img = None  # Add this before your main loop
 
     try:
-        loop_start = time.time()
         while not exit_flag.is_set():
+            tick = scheduler.wait()
             frame_count += 1
-            time_now = time.time()
-            prev_state = param_refs['state'][0]
-            # Handle brief settle period after dodge
-            if navigator.settling and time_now >= navigator.settle_end_time:
-                print("✅ Settle period over — resuming evaluation")
-                navigator.settling = False
-
+            time_now = clock.now()
             if time_now - start_time >= MAX_SIM_DURATION:
                 print("⏱️ Time limit reached — landing and stopping.")
                 break
 
-            pos_goal, _, _ = get_drone_state(client)
-            if pos_goal.x_val >= GOAL_X - GOAL_RADIUS:
-                print("\U0001F3C1 Goal reached — landing.")
-                break
-
             # --- Retrieve perception results ---
+            ring_seq = None
             try:
-                (
-                    vis_img,
-                    good_old,
-                    flow_vectors,
-                    flow_std,
-                    simgetimage_s,
-                    decode_s,
-                    processing_s,
-                ) = perception_queue.get(timeout=1.0)
+                if isinstance(perception_queue, SharedFrameRing):
+                    ring_seq, result = perception_queue.get_with_seq(timeout=1.0)
+                else:
+                    result = perception_queue.get(timeout=1.0)
             except Exception:
                 continue
+            vis_img = result.vis_img
+            good_old = result.points
+            flow_vectors = result.vectors
+            flow_std = result.flow_std
+            spans = SpanRecorder(result.stamps)
+            spans.mark("dequeue_ns")
+
+            if ring_seq is not None:
+                # Shared-memory frames are read-only views into a slot the
+                # worker recycles; copy them, then drop the frame if the slot
+                # was rewritten while we were copying
+                good_old = good_old.copy()
+                flow_vectors = flow_vectors.copy()
+                vis_img = vis_img.copy()
+                if not perception_queue.still_valid(ring_seq):
+                    torn_frames += 1
+                    continue
+
+            # One state/collision snapshot per tick, shared by every consumer.
+            # Taken after the frame arrives: the dequeue can block for up to
+            # a second, which would leave an earlier snapshot that old.
+            telemetry = None
+            if telemetry_poller is not None and not telemetry_poller.is_stale(TELEMETRY_MAX_AGE):
+                telemetry = telemetry_poller.latest()
+            if telemetry is None:
+                telemetry = fetch_telemetry(client)
+            clock.observe(telemetry.sim_timestamp, telemetry.wall_time)
+            time_now = clock.now()
+            if telemetry.position.x_val >= GOAL_X - GOAL_RADIUS:
+                print("\U0001F3C1 Goal reached — landing.")
+                break
 
             gray = cv2.cvtColor(vis_img, cv2.COLOR_BGR2GRAY)
 
@@ -363,135 +588,59 @@ def main():
                 cv2.arrowedLine(vis_img, (x1, y1), (x2, y2), (0, 255, 0), 1, tipLength=0.3)
 
             # Overlay info
-            pos, yaw, speed = get_drone_state(client)
+            pos, yaw, speed = telemetry.position, telemetry.yaw, telemetry.speed
             cv2.putText(vis_img, f"Frame: {frame_count}", (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,255), 2)
             cv2.putText(vis_img, f"Speed: {speed:.2f}", (10, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,255), 2)
             cv2.putText(vis_img, f"State: {param_refs['state'][0]}", (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,255), 2)
             cv2.putText(vis_img, f"Sim Time: {time_now-start_time:.2f}s", (10, 115), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,255), 2)
 
             # === Navigation logic ===
-            state_str = "none"
-            brake_thres = 0.0
-            dodge_thres = 0.0
-            probe_req = 0.0
-            side_safe = False
+            inputs = DecisionInputs(
+                smooth_L=smooth_L,
+                smooth_C=smooth_C,
+                smooth_R=smooth_R,
+                center_mag=center_mag,
+                probe_mag=probe_mag,
+                probe_count=probe_count,
+                features=len(good_old),
+                speed=speed,
+                flow_std=flow_std,
+                pos_x=pos.x_val,
+                pos_y=pos.y_val,
+            )
+            decision, nav_state = decide(inputs, nav_state, time_now)
+            spans.mark("decision_ns")
+            for message in decision.messages:
+                print(message)
+            param_refs['state'][0] = decision.state
 
             # Skip obstacle logic during grace period after resuming
-            if navigator.just_resumed and time_now < navigator.resume_grace_end_time:
-                param_refs['state'][0] = "resume_grace"
-                obstacle_detected = 0
-                # Still log flow and state, but don't issue new nav commands
+            if decision.state == "resume_grace":
+                # Still show the frame, but don't issue new nav commands
                 try:
                     frame_queue.put_nowait(vis_img)
                 except Exception:
                     pass
                 continue
-            elif navigator.just_resumed and time_now >= navigator.resume_grace_end_time:
-                navigator.just_resumed = False  # Grace over
 
-            if len(good_old) < 5: #If the number of "good" feature points tracked by the optical flow algorithm is less than 5, then...
-                if smooth_L > 1.5 and smooth_R > 1.5 and smooth_C < 0.2:
-                    state_str = navigator.brake()
+            for command in decision.commands:
+                if dispatcher is not None:
+                    dispatcher.submit(command)
                 else:
-                    state_str = navigator.blind_forward()
-            else:
-                pos, yaw, speed = get_drone_state(client)
-
-                # Adaptive thresholds tuned for quicker reactions
-                brake_thres = 20 + 10 * speed
-                dodge_thres = 2 + 0.5 * speed
-
-                center_high = smooth_C > dodge_thres or smooth_C > 2 * min(smooth_L, smooth_R)
-                side_diff = abs(smooth_L - smooth_R)
-                side_safe = side_diff > 0.3 * smooth_C and (smooth_L < 100 or smooth_R < 100)
-
-                probe_reliable = probe_count > MIN_PROBE_FEATURES and probe_mag > 0.05
-                in_grace_period = time_now < navigator.grace_period_end_time
-
-                # === Priority 1: Severe brake override (ignores grace period)
-                if smooth_C > (brake_thres * 1.5):
-                    state_str = navigator.brake()
-                    navigator.grace_period_end_time = time_now + 1.5
-
-                elif not in_grace_period:
-                    # === Brake Logic
-                    if smooth_C > brake_thres:
-                        state_str = navigator.brake()
-                        navigator.grace_period_end_time = time_now + 1.5
-                    # elif not probe_reliable and center_mag > 0.7:
-                    #     print("⚠️ No probe flow but high center flow — possible wall ahead")
-                    #     state_str = navigator.brake()
-                    #     navigator.grace_period_end_time = time_now + 2.5
-
-                    # === Dodge Logic
-                    elif center_high and side_safe:
-                        state_str = navigator.dodge(smooth_L, smooth_C, smooth_R)
-                        navigator.grace_period_end_time = time_now + 1.5
-                    elif probe_mag < 0.5 and center_mag > 0.7:
-                        if should_flat_wall_dodge(center_mag, probe_mag, probe_count, MIN_PROBE_FEATURES, flow_std, FLOW_STD_MAX):
-                            print("🟥 Flat wall detected — attempting fallback dodge")
-                            state_str = navigator.dodge(smooth_L, smooth_C, smooth_R)
-                            navigator.grace_period_end_time = time_now + 1.5
-                        else:
-                            print("🔬 Insufficient probe features — ignoring fallback")
-
-                # === Recovery / Maintenance States (always allowed)
-                if state_str == "none":
-                    if (
-                        navigator.dodging
-                        and smooth_C < dodge_thres * 0.9
-                        and time_now >= navigator.grace_period_end_time
-                        and not navigator.settling
-                    ):
-                        print(f"🔄 Dodge ended — resuming forward at frame {frame_count}")
-                        state_str = navigator.resume_forward()
-
-                    elif (
-                        navigator.braked
-                        and smooth_C < brake_thres * 0.8
-                        and smooth_L < brake_thres * 0.8
-                        and smooth_R < brake_thres * 0.8
-                        and time_now >= navigator.grace_period_end_time
-                    ):
-                        print(f"🟢 Brake released — resuming forward at frame {frame_count}")
-                        state_str = navigator.resume_forward()
-                    elif not navigator.braked and not navigator.dodging and time_now - navigator.last_movement_time > 2:
-                        state_str = navigator.reinforce()
-                    elif (navigator.braked or navigator.dodging) and speed < 0.2 and smooth_C < 5 and smooth_L < 5 and smooth_R < 5:
-                        state_str = navigator.nudge()
-                    elif time_now - navigator.last_movement_time > 4:
-                        state_str = navigator.timeout_recover()
-
-            if (
-                state_str == "none"
-                and navigator.dodging
-                and time_now < navigator.grace_period_end_time
-                and isinstance(prev_state, str)
-                and prev_state.startswith("dodge")
-            ):
-                state_str = prev_state
-            param_refs['state'][0] = state_str
-            obstacle_detected = int('dodge' in state_str or state_str == 'brake')
-
-
-
-            # === Detect repeated dodges with minimal progress ===
-            pos_hist, _, _ = get_drone_state(client)
-            state_history.append(state_str)
-            pos_history.append((pos_hist.x_val, pos_hist.y_val))
-            if len(state_history) == state_history.maxlen:
-                if all(s == state_history[-1] for s in state_history) and state_history[-1].startswith("dodge"):
-                    dx = pos_history[-1][0] - pos_history[0][0]
-                    dy = pos_history[-1][1] - pos_history[0][1]
-                    if abs(dx) < 0.5 and abs(dy) < 1.0:
-                        print("♻️ Repeated dodges detected — extending dodge")
-                        state_str = navigator.dodge(smooth_L, smooth_C, smooth_R, duration=3.0)
-                        state_history[-1] = state_str
-                        param_refs['state'][0] = state_str
+                    navigator.execute(command)
+            spans.mark("dispatch_ns")
+            state_str = decision.state
+            brake_thres = decision.brake_thres
+            dodge_thres = decision.dodge_thres
+            probe_req = 0.0
+            side_safe = decision.side_safe
+            obstacle_detected = decision.obstacle
 
             # === Reset logic from GUI ===
             if param_refs['reset_flag'][0]:
                 print("🔄 Resetting simulation...")
+                if dispatcher is not None:
+                    dispatcher.flush(timeout=1.0)
                 try:
                     client.landAsync().join()
                     client.reset()
@@ -503,23 +652,16 @@ def main():
                     print("Reset error:", e)
 
                 flow_history = FlowHistory()
-                navigator = Navigator(client)
+                navigator = Navigator(client, clock=clock)
+                nav_state = NavState(last_movement_time=clock.now())
+                if dispatcher is not None:
+                    dispatcher.forget_active()
                 frame_count = 0
                 param_refs['reset_flag'][0] = False
 
                 # === Reset log file ===
-                if log_buffer:
-                    log_file.writelines(log_buffer)
-                    log_buffer.clear()
-                log_file.close()
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                log_file = open(f"flow_logs/full_log_{timestamp}.csv", 'w')
-                log_file.write(
-                    "frame,time,features,flow_left,flow_center,flow_right,"
-                    "flow_std,pos_x,pos_y,pos_z,yaw,speed,state,collided,obstacle,side_safe,"
-                    "brake_thres,dodge_thres,probe_req,fps,simgetimage_s,decode_s,processing_s,loop_s\n"
-                )
-                retain_recent_logs("flow_logs")
+                log_sink.rotate(f"flow_logs/full_log_{timestamp}", timeout=5.0)
 
                 # === Reset video writer ===
                 frame_queue.put(None)
@@ -528,6 +670,8 @@ def main():
                 out = cv2.VideoWriter('flow_output.avi', fourcc, 8.0, (1280, 720))
                 video_thread = Thread(target=video_worker, daemon=True)
                 video_thread.start()
+                # Reset time is not a loop overrun
+                scheduler.rearm()
                 continue
 
             # Queue frame for async video writing
@@ -536,30 +680,32 @@ def main():
             except Exception:
                 pass
 
-            # Throttle loop to target FPS
-            elapsed = time.time() - loop_start
-            if elapsed < frame_duration:
-                time.sleep(frame_duration - elapsed)
-            loop_elapsed = time.time() - loop_start
+            loop_elapsed = tick.period
             actual_fps = 1 / max(loop_elapsed, 1e-6)
-            loop_start = time.time()
 
-            fps_list.append(actual_fps)
-
-            pos, yaw, speed = get_drone_state(client)
-            collision = client.simGetCollisionInfo()
-            collided = int(getattr(collision, "has_collided", False))
-
-            log_buffer.append(
-                f"{frame_count},{time_now:.2f},{len(good_old)},"
-                f"{smooth_L:.3f},{smooth_C:.3f},{smooth_R:.3f},{flow_std:.3f},"
-                f"{pos.x_val:.2f},{pos.y_val:.2f},{pos.z_val:.2f},{yaw:.2f},{speed:.2f},{state_str},{collided},{obstacle_detected},{int(side_safe)},"
-                f"{brake_thres:.2f},{dodge_thres:.2f},{probe_req:.2f},{actual_fps:.2f},"
-                f"{simgetimage_s:.3f},{decode_s:.3f},{processing_s:.3f},{loop_elapsed:.3f}\n"
-            )
-            if frame_count % LOG_INTERVAL == 0:
-                log_file.writelines(log_buffer)
-                log_buffer.clear()
+            run_stats.add("fps", actual_fps)
+            run_stats.add("loop_s", loop_elapsed)
+            run_stats.add("simgetimage_s", result.simgetimage_s)
+            run_stats.add("decode_s", result.decode_s)
+            run_stats.add("processing_s", result.processing_s)
+            for step, seconds in zip(PREPROCESS_STEPS, result.preprocess_s):
+                if seconds:
+                    # Steps that did not run this frame report 0.0
+                    run_stats.add(f"preprocess_{step}", seconds)
+
+            collided = int(telemetry.collided)
+
+            spans.mark("log_ns")
+            log_sink.put((
+                frame_count, time_now, len(good_old),
+                smooth_L, smooth_C, smooth_R, flow_std,
+                pos.x_val, pos.y_val, pos.z_val, yaw, speed, state_str, collided, obstacle_detected, int(side_safe),
+                brake_thres, dodge_thres, probe_req, actual_fps,
+                result.simgetimage_s, result.decode_s, result.processing_s, loop_elapsed,
+                tick.overrun_s, tick.jitter_s, result.capture_time,
+            ) + spans.stamps())
+            for span, ns in spans.spans().items():
+                run_stats.add(span, None if ns is None else ns / 1e9)
 
             print(f"Actual FPS: {actual_fps:.2f}")
             print(f"Features detected: {len(good_old)}")
@@ -569,15 +715,87 @@ def main():
 
     finally:
         print("Landing...")
-        if log_buffer:
-            log_file.writelines(log_buffer)
-            log_buffer.clear()
-        log_file.close()
+        log_sink.stop(timeout=10.0)
+        sink_stats = log_sink.stats()
+        print(
+            f"Log records: {sink_stats['written']} written, "
+            f"{sink_stats['dropped']} dropped, {sink_stats['syncs']} syncs, "
+            f"{sink_stats['errors']} errors"
+        )
         exit_flag.set()
         frame_queue.put(None)
         video_thread.join()
-        perception_thread.join()
+        perception_thread.join(timeout=5.0)
+        if isinstance(perception_thread, StagedPerceptionPipeline):
+            for stage, stage_stats in perception_thread.stats().items():
+                print(
+                    f"Stage {stage}: {stage_stats['frames']} frames, "
+                    f"{stage_stats['fps']:.1f} fps, "
+                    f"{100 * stage_stats['utilisation']:.0f}% busy, "
+                    f"avg input depth {stage_stats['avg_input_depth']:.2f}"
+                )
+        mailbox_stats = perception_queue.stats()
+        perception_queue.close()
+        print(
+            f"Perception frames: {mailbox_stats['puts']} published, "
+            f"{mailbox_stats['gets']} consumed, "
+            f"{mailbox_stats['overwritten']} overwritten, "
+            f"{mailbox_stats['dropped']} dropped"
+        )
+        if isinstance(perception_queue, SharedFrameRing):
+            print(f"Shared-memory frames dropped as overwritten mid-copy: {torn_frames}")
+        sched_stats = scheduler.stats()
+        print(
+            f"Loop: {sched_stats['overruns']}/{sched_stats['ticks']} ticks "
+            f"overran the {1000 / args.loop_rate:.0f} ms budget "
+            f"({100 * sched_stats['overrun_ratio']:.1f}%), "
+            f"mean {1000 * sched_stats['mean_overrun_s']:.1f} ms, "
+            f"max {1000 * sched_stats['max_overrun_s']:.1f} ms, "
+            f"{sched_stats['skipped']} deadlines skipped, "
+            f"max jitter {1000 * sched_stats['max_jitter_s']:.1f} ms"
+        )
+        for name in run_stats.names():
+            scale, unit = (1.0, "") if name == "fps" else (1000.0, " ms")
+            summary = run_stats[name].summary(scale)
+            print(
+                f"  {name}: {summary['count']} frames, "
+                f"p50 {summary['p50']:.2f}{unit} / p95 {summary['p95']:.2f}{unit} / "
+                f"p99 {summary['p99']:.2f}{unit} / max {summary['max']:.2f}{unit}"
+            )
+        if telemetry_poller is not None:
+            telemetry_poller.stop(timeout=2.0)
+            tel_stats = telemetry_poller.stats()
+            print(
+                f"Telemetry: {tel_stats['polls']} polls at "
+                f"{tel_stats['poll_rate_hz']:.1f} Hz, RPC latency "
+                f"p50 {tel_stats['latency_p50_ms']:.1f} ms / "
+                f"p95 {tel_stats['latency_p95_ms']:.1f} ms / "
+                f"p99 {tel_stats['latency_p99_ms']:.1f} ms, "
+                f"{tel_stats['overruns']} overruns"
+            )
+        if dispatcher is not None:
+            # Stop before landing so no velocity command follows landAsync
+            dispatcher.stop(timeout=2.0)
+            disp_stats = dispatcher.stats()
+            print(
+                f"Commands: {disp_stats['submitted']} submitted, "
+                f"{disp_stats['executed']} sent, "
+                f"{disp_stats['coalesced']} coalesced, "
+                f"{disp_stats['skipped']} skipped as still active, "
+                f"{disp_stats['errors']} errors"
+            )
+            for action, lat in sorted(disp_stats['send_latency'].items()):
+                print(
+                    f"  {action}: {lat['count']} sent, submit-to-send "
+                    f"p50 {lat['p50_ms']:.1f} ms / p95 {lat['p95_ms']:.1f} ms / "
+                    f"max {lat['max_ms']:.1f} ms"
+                )
         out.release()
+        try:
+            thread_spans.write_csv(thread_spans_path)
+            retain_recent_logs("flow_logs", pattern="thread_spans_*.csv")
+        except Exception as e:
+            print(f"⚠️ Could not write thread spans: {e}")
         try:
             client.landAsync().join()
             client.armDisarm(False)
@@ -605,9 +823,8 @@ def main():
             print("UE4 simulation closed.")
 
         # Re-encode video at median FPS using OpenCV
-        import statistics
-        if len(fps_list) > 0:
-            median_fps = statistics.median(fps_list)
+        if "fps" in run_stats:
+            median_fps = run_stats["fps"].quantile(0.5)
             print(f"Median FPS: {median_fps:.2f}")
 
             input_video = 'flow_output.avi'
@@ -35,9 +35,9 @@ if importlib.util.find_spec('numpy') is None:
 # Minimal cv2 stub for environments without OpenCV
 if importlib.util.find_spec('cv2') is None:
     cv2_stub = types.SimpleNamespace(
-        createCLAHE=lambda **kwargs: types.SimpleNamespace(apply=lambda img: img),
+        createCLAHE=lambda **kwargs: types.SimpleNamespace(apply=lambda img, dst=None: img),
         goodFeaturesToTrack=lambda *a, **k: None,
-        calcOpticalFlowPyrLK=lambda *a, **k: (None, None, None)
+        calcOpticalFlowPyrLK=lambda *a, **k: (None, None, None),
     )
     import importlib.machinery
     cv2_stub.__spec__ = importlib.machinery.ModuleSpec('cv2', loader=None)
@@ -56,3 +56,24 @@ airsim_stub = types.SimpleNamespace(
 if "airsim" not in sys.modules:
     sys.modules["airsim"] = airsim_stub
 
+
+
+import pytest
+
+
+@pytest.fixture
+def bundled_airsim():
+    """The repository's own ``airsim`` package (the stub above shadows it)."""
+    pytest.importorskip("msgpackrpc")
+    name = "_airsim_bundled"
+    if name not in sys.modules:
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "airsim"))
+        spec = importlib.util.spec_from_file_location(
+            name,
+            os.path.join(root, "__init__.py"),
+            submodule_search_locations=[root],
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
@@ -0,0 +1,113 @@
+import types
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+if getattr(cv2, "__file__", None) is None:
+    pytest.skip("OpenCV not available", allow_module_level=True)
+
+import uav.acquisition as acquisition
+from uav.acquisition import ImageFetcher
+
+
+class DummyRequest:
+    def __init__(self, camera_name, image_type, pixels_as_float, compress):
+        self.camera_name = camera_name
+        self.compress = compress
+
+
+@pytest.fixture(autouse=True)
+def image_request_stub(monkeypatch):
+    stub = types.SimpleNamespace(
+        ImageRequest=DummyRequest,
+        ImageType=types.SimpleNamespace(Scene=0),
+    )
+    monkeypatch.setattr(acquisition, "airsim", stub)
+
+
+@pytest.fixture
+def make_response(bundled_airsim):
+    def make(img, compress=False, data=None):
+        response = bundled_airsim.ImageResponse()
+        response.image_data_uint8 = img.tobytes() if data is None else data
+        response.height, response.width = img.shape[:2]
+        response.compress = compress
+        return response
+
+    return make
+
+
+class DummyClient:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def simGetImages(self, requests):
+        self.requests.append(requests)
+        return [self.response]
+
+
+def test_raw_frame_is_reshaped_without_copy(make_response):
+    img = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    response = make_response(img)
+    fetcher = ImageFetcher(DummyClient(response), frame_size=None)
+
+    fetched = fetcher.fetch()
+    assert fetcher.client.requests[0][0].compress is False
+    out = fetcher.decode(fetched)
+    assert np.array_equal(out, img)
+    assert not out.flags.writeable  # view over the response bytes
+
+
+def test_raw_rgba_frame_drops_alpha_and_resizes(make_response):
+    img = np.zeros((4, 6, 4), dtype=np.uint8)
+    img[..., 2] = 200
+    fetcher = ImageFetcher(DummyClient(None), frame_size=(12, 8))
+    out = fetcher.decode(make_response(img))
+    assert out.shape == (8, 12, 3)
+    assert np.all(out[..., 2] == 200)
+
+
+def test_png_mode_decodes_compressed_frames(make_response):
+    img = np.full((4, 6, 3), 77, dtype=np.uint8)
+    ok, png = cv2.imencode(".png", img)
+    response = make_response(img, compress=True, data=png.tobytes())
+    fetcher = ImageFetcher(DummyClient(response), raw=False, frame_size=None)
+    fetcher.fetch()
+    assert fetcher.client.requests[0][0].compress is True
+    assert np.array_equal(fetcher.decode(response), img)
+
+
+def test_falls_back_to_compressed_after_bad_raw_frames(make_response):
+    img = np.zeros((4, 6, 3), dtype=np.uint8)
+    bad = make_response(img, data=b"\x00" * 10)
+    fetcher = ImageFetcher(DummyClient(bad), frame_size=None, fallback_after=2)
+    assert fetcher.decode(bad) is None
+    assert fetcher.raw is True
+    assert fetcher.decode(bad) is None
+    assert fetcher.raw is False
+    fetcher.fetch()
+    assert fetcher.client.requests[-1][0].compress is True
+
+
+def test_is_empty_detects_missing_data(make_response):
+    img = np.zeros((4, 6, 3), dtype=np.uint8)
+    assert ImageFetcher.is_empty(make_response(img, data=b""))
+    assert not ImageFetcher.is_empty(make_response(img))
+
+
+def test_duplicate_frames_detected_by_timestamp():
+    fetcher = ImageFetcher(DummyClient(None))
+    first = types.SimpleNamespace(time_stamp=1_000_000_000)
+    again = types.SimpleNamespace(time_stamp=1_000_000_000)
+    newer = types.SimpleNamespace(time_stamp=1_050_000_000)
+    unstamped = types.SimpleNamespace(time_stamp=0)
+    assert fetcher.is_duplicate(first) is False
+    assert fetcher.is_duplicate(again) is True
+    assert fetcher.is_duplicate(newer) is False
+    assert fetcher.is_duplicate(unstamped) is False
+    assert fetcher.is_duplicate(unstamped) is False
+    assert fetcher.duplicates == 1
+    assert fetcher.capture_time(newer) == pytest.approx(1.05)
+    assert fetcher.capture_time(unstamped) == 0.0
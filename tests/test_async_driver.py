@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+if getattr(cv2, "__file__", None) is None:
+    pytest.skip("OpenCV not available", allow_module_level=True)
+
+import uav.acquisition as acquisition
+from uav.async_driver import AsyncDriver, LoopCommandDispatcher
+from uav.decision import Command
+from uav.mailbox import LatestMailbox
+from uav.navigation import Navigator
+from uav.preprocessing import FramePreprocessor
+
+
+@pytest.fixture(autouse=True)
+def image_request_stub(monkeypatch):
+    stub = types.SimpleNamespace(
+        ImageRequest=lambda *args: args,
+        ImageType=types.SimpleNamespace(Scene=0),
+    )
+    monkeypatch.setattr(acquisition, "airsim", stub)
+
+
+class FakeAsyncClient:
+    """Asyncio client double: every RPC yields to the loop like a socket."""
+
+    def __init__(self, airsim):
+        self.airsim = airsim
+        self.frame = 0
+        self.commands = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    async def _rpc(self, value):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.005)
+        self.in_flight -= 1
+        return value
+
+    async def simGetImages(self, requests):
+        self.frame += 1
+        img = np.full((8, 8, 3), self.frame % 250, dtype=np.uint8)
+        response = self.airsim.ImageResponse()
+        response.image_data_uint8 = img.tobytes()
+        response.width = response.height = 8
+        response.compress = False
+        response.time_stamp = self.frame * 1_000_000
+        return [await self._rpc(response)]
+
+    async def getMultirotorState(self):
+        vec = types.SimpleNamespace(x_val=1.0, y_val=0.0, z_val=0.0)
+        kin = types.SimpleNamespace(position=vec, orientation=None, linear_velocity=vec)
+        return await self._rpc(
+            types.SimpleNamespace(kinematics_estimated=kin, timestamp=self.frame)
+        )
+
+    async def simGetCollisionInfo(self):
+        await self._rpc(None)
+        raise RuntimeError("collision query failed")
+
+    def _command(self, *args):
+        self.commands.append(args)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(True)
+        return future
+
+    def moveByVelocityAsync(self, vx, vy, vz, duration, **kwargs):
+        return self._command("world", vx, vy, vz, duration)
+
+    def moveByVelocityBodyFrameAsync(self, vx, vy, vz, duration):
+        return self._command("body", vx, vy, vz, duration)
+
+
+class DummyTracker:
+    def __init__(self):
+        self.prev_gray = None
+        self.frames = 0
+        self.preprocessor = FramePreprocessor()
+
+    def initialize(self, gray, capture_time=None):
+        self.prev_gray = self.preprocessor.process(gray)
+
+    def process_frame(self, gray, capture_time=None):
+        self.frames += 1
+        self.preprocessor.process(gray)
+        return np.zeros((1, 2)), np.ones((1, 2)), 0.5
+
+
+def test_driver_serves_images_telemetry_and_commands(bundled_airsim):
+    client = FakeAsyncClient(bundled_airsim)
+    output = LatestMailbox()
+    stop = threading.Event()
+    driver = AsyncDriver(
+        lambda: client,
+        lambda c: Navigator(c),
+        DummyTracker(),
+        output,
+        stop,
+        telemetry_rate_hz=100.0,
+        frame_size=(8, 8),
+        poll_timeout=0.01,
+    )
+    driver.commands.submit(Command("brake"))  # before the loop is running
+    driver.start()
+    payload = output.get(timeout=2.0)
+    assert all(stamp > 0 for stamp in payload.stamps)
+    assert payload.preprocess_s[-1] > 0  # preprocessing total
+    deadline = time.time() + 2.0
+    while driver.telemetry.latest() is None and time.time() < deadline:
+        time.sleep(0.01)
+    driver.commands.submit(Command("nudge"))
+    assert driver.commands.flush(timeout=1.0)
+    stop.set()
+    driver.join(timeout=2.0)
+
+    assert not driver.is_alive()
+    assert client.closed
+    snapshot = driver.telemetry.latest()
+    assert snapshot.speed == pytest.approx(1.0)
+    assert snapshot.collided is False  # failed query falls back to neutral
+    assert client.commands == [("world", 0, 0, 0, 1), ("world", 0.5, 0, 0, 1)]
+    assert driver.commands.stats()["executed"] == 2
+    # Image, state and collision requests were in flight together
+    assert client.max_in_flight >= 2
+
+
+def test_loop_dispatcher_skips_active_velocity():
+    sent = []
+    executor = types.SimpleNamespace(execute=lambda command: sent.append(command.action))
+    dispatcher = LoopCommandDispatcher(clock=lambda: 0.0)
+
+    async def scenario():
+        dispatcher.attach(asyncio.get_running_loop(), executor)
+        for action in ("resume_forward", "reinforce", "brake"):
+            dispatcher.submit(Command(action))
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert dispatcher.flush(timeout=0)
+    assert sent == ["resume_forward", "brake"]
+    assert dispatcher.stats()["skipped"] == 1
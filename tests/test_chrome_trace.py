@@ -0,0 +1,101 @@
+import json
+
+import pandas as pd
+
+from analysis.chrome_trace import TRACKS, build_trace, export_trace
+from uav.flight_log import COLUMN_NAMES
+from uav.log_sink import LogSink
+from uav.spans import STAMPS, ThreadSpans
+
+BASE = 10**12
+
+
+def stamped_rows(frames=3):
+    rows = []
+    for frame in range(frames):
+        start = BASE + 50_000_000 * frame
+        # fetch 10 ms, decode 2 ms, track 5 ms, hand-off 1 ms, decide/dispatch/log 0.1 ms
+        offsets = (0, 10_000_000, 12_000_000, 17_000_000, 18_000_000, 18_100_000, 18_200_000, 18_300_000)
+        row = dict(zip(STAMPS, (start + offset for offset in offsets)))
+        row.update(frame=frame + 1, state="resume", features=80, loop_s=0.05, fps=20.0, overrun_s=0.0)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def slices(trace, track):
+    tid = TRACKS[track][0]
+    return [e for e in trace["traceEvents"] if e["ph"] == "X" and e["tid"] == tid]
+
+
+def test_stamped_log_places_stages_on_their_tracks():
+    spans = [
+        ("video", "write", BASE + 20_000_000, BASE + 23_000_000),
+        ("log", "write", BASE + 30_000_000, BASE + 30_500_000),
+        ("log", "write", BASE - 10**9, BASE - 10**9 + 1),  # before this log
+    ]
+    trace = build_trace(stamped_rows(), spans)
+    names = {e["args"]["name"] for e in trace["traceEvents"] if e["name"] == "thread_name"}
+    assert names == {"Perception", "Control loop", "Video writer", "Log writer"}
+
+    perception = slices(trace, "perception")
+    assert [e["name"] for e in perception[:3]] == ["fetch", "decode", "track"]
+    assert perception[0]["ts"] == 0.0
+    assert perception[0]["dur"] == 10_000.0
+    assert perception[3]["ts"] == 50_000.0
+
+    control = slices(trace, "control")
+    assert control[0]["name"] == "frame 1"
+    assert control[0]["ts"] == 18_000.0
+    assert control[0]["dur"] == 300.0
+    assert [e["name"] for e in control[1:4]] == ["decide", "dispatch", "log"]
+
+    assert [(e["ts"], e["dur"]) for e in slices(trace, "video")] == [(20_000.0, 3_000.0)]
+    assert len(slices(trace, "log")) == 1
+    flows = [e for e in trace["traceEvents"] if e["ph"] in ("s", "f")]
+    assert len(flows) == 6
+    counters = [e for e in trace["traceEvents"] if e["ph"] == "C"]
+    assert counters[0]["args"] == {"loop_ms": 50.0, "fps": 20.0}
+
+
+def test_log_without_stamps_falls_back_to_rounded_durations():
+    df = pd.DataFrame(
+        {
+            "frame": [1, 2],
+            "time": [100.0, 100.05],
+            "simgetimage_s": [0.01, 0.012],
+            "decode_s": [0.002, 0.002],
+            "processing_s": [0.005, 0.004],
+            "loop_s": [0.05, 0.05],
+        }
+    )
+    trace = build_trace(df, [("video", "write", 1, 2)])
+    perception = slices(trace, "perception")
+    assert [e["name"] for e in perception[:3]] == ["fetch", "decode", "track"]
+    # Stages end at the tick that consumed the frame
+    assert abs(perception[2]["ts"] + perception[2]["dur"]) < 1e-6
+    assert slices(trace, "control")[1]["ts"] == 1e6 * (100.05 - 100.0)
+    assert slices(trace, "video") == []
+
+
+def test_export_reads_binary_log_and_sink_spans(tmp_path):
+    thread_spans = ThreadSpans()
+    sink = LogSink(str(tmp_path / "full_log_1"), spans=thread_spans, retain=None)
+    rows = stamped_rows(4)
+    for row in rows.to_dict("records"):
+        sink.put(tuple(row.get(name, 0) for name in COLUMN_NAMES))
+    sink.flush()
+    bin_path = sink.path
+    thread_spans.record("video", "write", BASE + 1_000, BASE + 2_000)
+    thread_spans.record("log", "write", BASE + 3_000, BASE + 4_000)
+    spans_path = thread_spans.write_csv(str(tmp_path / "thread_spans_1.csv"))
+
+    output = export_trace(bin_path)
+    with open(output) as f:
+        trace = json.load(f)
+    sink.stop()
+    assert output.endswith("full_log_1.trace.json")
+    assert slices(trace, "control")[0]["args"]["state"] == "resume"
+    assert len(slices(trace, "video")) == 1
+    assert len(slices(trace, "log")) == 1  # the sink's own spans are later than the log range
+    assert {span[0] for span in thread_spans.spans()} == {"log", "video"}
+    assert pd.read_csv(spans_path).columns.tolist() == list(ThreadSpans.COLUMNS)
@@ -0,0 +1,98 @@
+import time
+import types
+
+import pytest
+
+from uav.clock import Clock, ManualClock, SimClock, WallClock, make_clock
+from uav.navigation import Navigator
+from uav.scheduler import RateScheduler
+
+
+class DummyClient:
+    def __init__(self, timestamp=0):
+        self.timestamp = timestamp
+        self.calls = []
+
+    def getMultirotorState(self):
+        return types.SimpleNamespace(timestamp=self.timestamp)
+
+    def moveByVelocityAsync(self, *args, **kwargs):
+        self.calls.append(args)
+
+    def moveByVelocityBodyFrameAsync(self, *args, **kwargs):
+        self.calls.append(args)
+
+
+def test_manual_clock_advances_only_when_told():
+    clock = ManualClock(5.0)
+    assert clock.now() == 5.0
+    clock.sleep(0.25)
+    clock.advance(-1.0)
+    clock.set(1.0)
+    assert clock.now() == 5.25
+
+
+def test_sim_clock_follows_observed_timestamps():
+    clock = SimClock(clock_speed=10.0)
+    clock.observe(42_000_000_000)
+    start = clock.now()
+    assert start == pytest.approx(42.0, abs=0.1)
+    time.sleep(0.02)
+    # Ten simulated seconds per wall second
+    assert clock.now() - start == pytest.approx(0.2, abs=0.1)
+
+
+def test_sim_clock_reanchors_when_the_simulator_falls_behind():
+    clock = SimClock(clock_speed=10.0)
+    clock.observe(42_000_000_000)
+    time.sleep(0.02)
+    ahead = clock.monotonic()
+    # The simulator stalled at 42 s: real sim data wins over extrapolation
+    clock.observe(42_000_000_000)
+    assert clock.now() == pytest.approx(42.0, abs=0.05)
+    assert clock.now() < ahead
+    # ...but loop deadlines never run backwards
+    assert clock.monotonic() == ahead
+
+
+def test_sim_clock_anchors_at_the_snapshot_time():
+    clock = SimClock(clock_speed=1.0)
+    clock.observe(10_000_000_000, wall_time=time.time() - 0.5)
+    # A snapshot read half a second ago has advanced by half a second
+    assert clock.now() == pytest.approx(10.5, abs=0.05)
+
+
+def test_clock_interface_is_abstract():
+    with pytest.raises(TypeError):
+        Clock()
+
+
+def test_sim_clock_syncs_from_client():
+    clock = SimClock(DummyClient(timestamp=7_500_000_000))
+    assert clock.now() == pytest.approx(7.5, abs=0.1)
+
+
+def test_make_clock_modes():
+    assert isinstance(make_clock("wall"), WallClock)
+    assert isinstance(make_clock("sim", clock_speed=2.0), SimClock)
+    with pytest.raises(ValueError):
+        make_clock("bogus")
+
+
+def test_navigator_timers_use_injected_clock():
+    clock = ManualClock(100.0)
+    nav = Navigator(DummyClient(), clock=clock)
+    assert nav.last_movement_time == 100.0
+    clock.advance(3.0)
+    nav.resume_forward()
+    assert nav.last_movement_time == 103.0
+    assert nav.resume_grace_end_time == pytest.approx(103.75)
+
+
+def test_scheduler_runs_on_virtual_time():
+    clock = ManualClock()
+    sched = RateScheduler(20.0, clock=clock.monotonic, sleep=clock.sleep)
+    for _ in range(1000):
+        sched.wait()
+    assert clock.now() == pytest.approx(999 * 0.05)
+    assert sched.stats()["overruns"] == 0
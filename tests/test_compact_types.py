@@ -0,0 +1,55 @@
+import importlib
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def bench(bundled_airsim, monkeypatch):
+    monkeypatch.setitem(sys.modules, "airsim", bundled_airsim)
+    monkeypatch.delitem(sys.modules, "analysis.benchmark_decoding", raising=False)
+    module = importlib.import_module("analysis.benchmark_decoding")
+    yield module
+    sys.modules.pop("analysis.benchmark_decoding", None)
+
+
+def test_compact_decode_matches_from_msgpack(bundled_airsim, bench):
+    airsim = bundled_airsim
+    message = bench.sample_message(airsim.MultirotorState)
+    message["kinematics_estimated"]["position"] = {"x_val": 1.0, "y_val": 2.0, "z_val": 3.0}
+    full = airsim.MultirotorState.from_msgpack(message)
+    compact = airsim.compact_decoder(airsim.MultirotorState)(message)
+
+    assert isinstance(compact, airsim.MultirotorState)
+    assert isinstance(compact.kinematics_estimated.position, airsim.Vector3r)
+    assert compact.kinematics_estimated.position.z_val == 3.0
+    assert compact.to_msgpack().keys() == full.__dict__.keys()
+    assert compact.collision.normal.to_msgpack() == full.collision.normal.__dict__
+    # Known fields live in slots, not in the inherited instance dict
+    assert "position" not in vars(compact.kinematics_estimated)
+    # Methods and type checks of the original classes still apply
+    full_vec = airsim.Vector3r(1.0, 0.0, 0.0)
+    assert compact.kinematics_estimated.position.dot(full_vec) == 1.0
+
+
+def test_missing_and_unknown_fields(bundled_airsim):
+    airsim = bundled_airsim
+    decode = airsim.compact_decoder(airsim.Vector3r)
+    partial = decode({"x_val": 5.0, "w_val": 9.0})
+    assert (partial.x_val, partial.y_val, partial.z_val) == (5.0, 0.0, 0.0)
+    assert partial.w_val == 9.0
+    assert partial.to_msgpack() == {"x_val": 5.0, "y_val": 0.0, "z_val": 0.0, "w_val": 9.0}
+
+
+def test_client_option_selects_decoder(bundled_airsim):
+    airsim = bundled_airsim
+    assert airsim.msgpack_decoder(airsim.Pose) == airsim.Pose.from_msgpack
+    assert airsim.msgpack_decoder(airsim.Pose, compact=True) is airsim.compact_decoder(airsim.Pose)
+    client = airsim.MultirotorClient(compact_types=True)
+    assert client.compact_types
+
+
+def test_benchmark_reports_every_type(bench):
+    rows = bench.run(number=50)
+    assert [row["name"] for row in rows] == list(bench.TYPES)
+    assert all(row["dict_per_s"] > 0 and row["compact_per_s"] > 0 for row in rows)
@@ -0,0 +1,101 @@
+import pytest
+
+from uav.decision import (
+    DecisionInputs,
+    DecisionParams,
+    NavState,
+    decide,
+    dodge_direction,
+)
+
+
+def make_inputs(L=0.0, C=0.0, R=0.0, features=50, speed=1.0, **kwargs):
+    values = dict(
+        smooth_L=L, smooth_C=C, smooth_R=R,
+        center_mag=C, probe_mag=1.0, probe_count=10,
+        features=features, speed=speed,
+    )
+    values.update(kwargs)
+    return DecisionInputs(**values)
+
+
+def test_decide_is_pure():
+    state = NavState(last_movement_time=0.0)
+    inputs = make_inputs(L=1.0, C=100.0, R=1.0)
+    first = decide(inputs, state, 1.0)
+    second = decide(inputs, state, 1.0)
+    assert first == second
+    assert state == NavState(last_movement_time=0.0)
+
+
+def test_severe_brake_sets_grace_period():
+    decision, state = decide(make_inputs(C=100.0, L=90.0, R=90.0), NavState(), 5.0)
+    assert decision.state == "brake"
+    assert decision.obstacle == 1
+    assert decision.brake_thres == pytest.approx(30.0)
+    assert state.braked is True
+    assert state.grace_period_end_time == pytest.approx(6.5)
+
+
+def test_dodge_picks_quieter_side():
+    decision, state = decide(make_inputs(L=1.0, C=10.0, R=6.0), NavState(), 5.0)
+    assert decision.state == "dodge_left"
+    assert decision.commands[0].action == "dodge"
+    assert state.dodging and state.settling and not state.braked
+    assert state.last_movement_time == 5.0
+
+
+def test_grace_period_suppresses_brake():
+    state = NavState(grace_period_end_time=10.0, last_movement_time=4.5)
+    decision, _ = decide(make_inputs(C=35.0, L=20.0, R=20.0), state, 5.0)
+    assert decision.state == "none"
+    assert decision.commands == ()
+
+
+def test_few_features_goes_blind_forward():
+    decision, state = decide(make_inputs(features=2), NavState(), 3.0)
+    assert decision.state == "blind_forward"
+    assert state.last_movement_time == 3.0
+
+
+def test_resume_grace_issues_nothing():
+    state = NavState(just_resumed=True, resume_grace_end_time=2.0)
+    decision, new_state = decide(make_inputs(C=100.0), state, 1.0)
+    assert decision.state == "resume_grace"
+    assert decision.commands == ()
+    assert new_state.last_state == "resume_grace"
+
+
+def test_ongoing_dodge_label_is_held():
+    state = NavState(
+        dodging=True, grace_period_end_time=10.0,
+        last_state="dodge_right", last_movement_time=4.5,
+    )
+    decision, _ = decide(make_inputs(C=1.0, L=1.0, R=1.0), state, 5.0)
+    assert decision.state == "dodge_right"
+    assert decision.commands == ()
+
+
+def test_repeated_dodge_without_progress_is_extended():
+    state = NavState()
+    inputs = make_inputs(L=1.0, C=10.0, R=6.0)
+    for t in (1.0, 3.0):
+        _, state = decide(inputs, state, t)
+    decision, state = decide(inputs, state, 5.0)
+    assert [c.action for c in decision.commands] == ["dodge", "dodge"]
+    assert decision.commands[1].duration == 3.0
+    assert state.state_history == ("dodge_left",) * 3
+
+
+def test_params_change_thresholds():
+    inputs = make_inputs(L=20.0, C=25.0, R=20.0)
+    decision, _ = decide(inputs, NavState(), 5.0)
+    assert decision.state != "brake"
+    strict = DecisionParams(brake_base=10.0)
+    decision, _ = decide(inputs, NavState(), 5.0, strict)
+    assert decision.state == "brake"
+
+
+def test_dodge_direction_ties_prefer_left():
+    assert dodge_direction(5.0, 10.0, 5.0) == "left"
+    assert dodge_direction(9.0, 10.0, 1.0) == "right"
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from uav.clock import ManualClock
+from uav.decision import Command
+from uav.dispatcher import CommandDispatcher
+from uav.navigation import VELOCITY_COMMANDS, Navigator, velocity_signature
+
+
+class RecordingExecutor:
+    def __init__(self, delay=0.0, gate=None):
+        self.delay = delay
+        self.gate = gate
+        self.actions = []
+
+    def execute(self, command):
+        if self.gate is not None:
+            self.gate.wait(1.0)
+        time.sleep(self.delay)
+        self.actions.append(command.action)
+
+
+def run_dispatcher(executor, clock=None):
+    dispatcher = CommandDispatcher(
+        lambda: executor,
+        clock=(clock or ManualClock()).now,
+        poll_timeout=0.01,
+    )
+    dispatcher.start()
+    return dispatcher
+
+
+def test_pending_command_is_replaced_by_newer_one():
+    gate = threading.Event()
+    executor = RecordingExecutor(gate=gate)
+    dispatcher = run_dispatcher(executor)
+    dispatcher.submit(Command("reinforce"))
+    time.sleep(0.05)  # reinforce is now in flight, blocked on the gate
+    dispatcher.submit(Command("nudge"))
+    dispatcher.submit(Command("brake"))
+    gate.set()
+    assert dispatcher.flush(timeout=1.0)
+    dispatcher.stop(timeout=1.0)
+    assert executor.actions == ["reinforce", "brake"]
+    stats = dispatcher.stats()
+    assert stats["coalesced"] == 1
+    assert stats["submitted"] == 3
+
+
+def test_identical_active_velocity_is_not_resent():
+    clock = ManualClock()
+    executor = RecordingExecutor()
+    dispatcher = run_dispatcher(executor, clock)
+    for action in ("resume_forward", "reinforce"):
+        # Same 3 s forward velocity in the same window: a true duplicate
+        dispatcher.submit(Command(action))
+        dispatcher.flush(timeout=1.0)
+    clock.advance(2.0)  # 1 s left; reinforce extends it to t+5
+    dispatcher.submit(Command("reinforce"))
+    dispatcher.flush(timeout=1.0)
+    clock.advance(0.5)
+    dispatcher.submit(Command("reinforce"))
+    dispatcher.flush(timeout=1.0)
+    dispatcher.stop(timeout=1.0)
+    assert executor.actions == ["resume_forward", "reinforce", "reinforce"]
+    assert dispatcher.stats()["skipped"] == 1
+
+
+def test_latency_recorded_per_action():
+    executor = RecordingExecutor(delay=0.01)
+    dispatcher = run_dispatcher(executor)
+    dispatcher.submit(Command("brake"))
+    dispatcher.flush(timeout=1.0)
+    dispatcher.submit(Command("dodge", flows=(1.0, 10.0, 6.0)))
+    dispatcher.flush(timeout=1.0)
+    dispatcher.stop(timeout=1.0)
+    latency = dispatcher.stats()["send_latency"]
+    assert set(latency) == {"brake", "dodge"}
+    assert latency["brake"]["p50_ms"] >= 10.0
+    assert not dispatcher.is_alive()
+
+
+class RecordingClient:
+    def __init__(self):
+        self.last = None
+
+    def moveByVelocityAsync(self, vx, vy, vz, duration=None, drivetrain=None, yaw_mode=None):
+        frame = "forward" if drivetrain is not None else "world"
+        self.last = (frame, vx, vy, vz, duration)
+
+    def moveByVelocityBodyFrameAsync(self, vx, vy, vz, duration):
+        self.last = ("body", vx, vy, vz, duration)
+
+
+@pytest.mark.parametrize(
+    "command",
+    [Command(action) for action in VELOCITY_COMMANDS]
+    + [
+        Command("dodge", flows=(1.0, 10.0, 6.0)),
+        Command("dodge", duration=3.0, flows=(150.0, 200.0, 20.0)),
+    ],
+)
+def test_velocity_signature_matches_navigator_rpcs(command):
+    client = RecordingClient()
+    Navigator(client, clock=ManualClock()).execute(command)
+    assert client.last == pytest.approx(velocity_signature(command))
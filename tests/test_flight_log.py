@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.convert_logs import pending_logs
+from uav.flight_log import (
+    COLUMN_NAMES,
+    CSV_HEADER,
+    SCHEMA_VERSION,
+    BinaryFlightLog,
+    binary_log_to_csv,
+    open_flight_log,
+    read_binary_log,
+)
+
+
+def make_row(frame, state="dodge_left"):
+    return (
+        frame, 1.23456789 * frame, 80,
+        0.1234567, 2.5, 3.75, 0.5,
+        1.0 / 3, -2.0, -3.0, 0.25, 1.5, state, 0, 1, 1,
+        1.1, 2.2, 0.0, 19.87654,
+        0.0123456, 0.001, 0.02, 0.05,
+        0.0, 0.00012345, 100.0 + frame,
+    ) + tuple(10**15 + 1000 * frame + i for i in range(8))
+
+
+def test_binary_log_round_trip_keeps_full_precision(tmp_path):
+    log = BinaryFlightLog(str(tmp_path / "full_log_x.bin"), capacity=2)
+    rows = [make_row(i, state) for i, state in enumerate(["none", "dodge_left", "brake", "???"])]
+    for row in rows:
+        log.append(row)  # grows past the initial capacity
+    log.close()
+    log.close()
+
+    meta, records = read_binary_log(log.path)
+    assert meta["version"] == SCHEMA_VERSION
+    assert records.dtype.names == COLUMN_NAMES
+    assert len(records) == 4
+    assert records["pos_x"][1] == 1.0 / 3
+    assert records["time"][3] == 1.23456789 * 3
+    assert records["log_ns"][3] == 10**15 + 3007
+    assert [meta["states"][c] if c >= 0 else None for c in records["state"]] == [
+        "none", "dodge_left", "brake", None
+    ]
+
+
+def test_unflushed_rows_are_not_read_back(tmp_path):
+    log = BinaryFlightLog(str(tmp_path / "full_log_x.bin"))
+    log.append(make_row(1))
+    log.flush()
+    log.append(make_row(2))  # not flushed: a crash here loses only this row
+    _, records = read_binary_log(log.path)
+    assert records["frame"].tolist() == [1]
+    log.close()
+
+
+def test_converter_matches_csv_layout(tmp_path):
+    stem = str(tmp_path / "full_log_20240101_000000")
+    binary = open_flight_log(stem, "binary")
+    text = open_flight_log(stem + "_text", "csv")
+    for i in range(3):
+        binary.append(make_row(i))
+        text.append(make_row(i))
+    binary.close()
+    text.close()
+
+    assert pending_logs(str(tmp_path)) == [binary.path]
+    converted = pd.read_csv(binary_log_to_csv(binary.path))
+    assert pending_logs(str(tmp_path)) == []
+    formatted = pd.read_csv(text.path)
+    with open(text.path) as f:
+        assert f.readline() == CSV_HEADER
+    assert list(converted.columns) == list(formatted.columns)
+    assert converted["state"].tolist() == formatted["state"].tolist()
+    assert converted["pos_x"].iloc[0] == 1.0 / 3
+    assert formatted["pos_x"].iloc[0] == 0.33
+    assert np.allclose(converted["fps"], formatted["fps"], atol=0.005)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "full_log_x.csv"
+    path.write_text(CSV_HEADER)
+    with pytest.raises(ValueError):
+        read_binary_log(str(path))
+    with pytest.raises(ValueError):
+        open_flight_log(str(tmp_path / "x"), "parquet")
@@ -0,0 +1,187 @@
+import asyncio
+import socket
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def depth_reply(msgid, width, height, seed=0):
+    """Encode a simGetImages reply the way AirSim does: float32 pixels."""
+    depth = np.random.default_rng(seed).random(width * height, dtype=np.float32) * 100
+    response = {
+        "image_data_uint8": b"",
+        "image_data_float": depth.tolist(),
+        "camera_name": "oakd_camera",
+        "width": width,
+        "height": height,
+        "pixels_as_float": True,
+        "compress": False,
+        "time_stamp": 123,
+        "message": "",
+    }
+    raw = msgpack.packb([1, msgid, None, [response]], use_single_float=True)
+    return raw, depth.reshape(height, width)
+
+
+def test_unpackb_matches_msgpack(bundled_airsim):
+    fu = bundled_airsim.float_unpack
+    message = [
+        1, 300, -5, -70000, 2 ** 40, None, True, False, 1.5,
+        "x" * 40, b"\x00\x01", {"k": [1, 2.5, "v"]}, list(range(20)),
+    ]
+    raw = msgpack.packb(message, use_bin_type=True)
+    assert fu.unpackb(raw) == msgpack.unpackb(raw, raw=False)
+
+    mixed = [0.5] * 20 + [1]
+    decoded = fu.unpackb(msgpack.packb(mixed, use_single_float=True))
+    assert isinstance(decoded, list) and decoded == mixed
+    short = fu.unpackb(msgpack.packb([0.5] * 4, use_single_float=True))
+    assert short == [0.5] * 4
+
+    with pytest.raises(ValueError):
+        fu.unpackb(raw[:-3])
+
+
+def test_streaming_unpacker_reassembles_chunks(bundled_airsim):
+    raw, depth = depth_reply(7, 64, 48)
+    unpacker = bundled_airsim.FloatArrayUnpacker()
+    stream = raw + msgpack.packb([1, 8, None, True])
+    messages = []
+    for i in range(0, len(stream), 1000):
+        unpacker.feed(stream[i:i + 1000])
+        messages.extend(unpacker)
+    assert [m[1] for m in messages] == [7, 8]
+    values = messages[0][3][0]["image_data_float"]
+    assert values.dtype == np.float32 and (values == depth.ravel()).all()
+
+
+def test_float_image_decode_benchmark(bundled_airsim, capsys):
+    """Compare the list path with the binary fast path on one depth reply."""
+    airsim = bundled_airsim
+    raw, depth = depth_reply(1, 160, 120)
+
+    def list_path():
+        reply = msgpack.unpackb(raw, raw=False)
+        return airsim.get_pfm_array(airsim.ImageResponse.from_msgpack(reply[3][0]))
+
+    def binary_path():
+        reply = airsim.float_unpack.unpackb(raw)
+        return airsim.get_pfm_array(airsim.ImageResponse.from_msgpack(reply[3][0]))
+
+    timings = {}
+    for name, path in (("list", list_path), ("binary", binary_path)):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            img = path()
+            best = min(best, time.perf_counter() - start)
+        assert img.dtype == np.float32 and img.shape == (120, 160)
+        assert (img == depth).all()
+        timings[name] = best
+    with capsys.disabled():
+        print(
+            f"\n160x120 depth decode: list {timings['list'] * 1e3:.2f} ms, "
+            f"binary {timings['binary'] * 1e3:.2f} ms "
+            f"({timings['list'] / timings['binary']:.0f}x)"
+        )
+    assert timings["binary"] < timings["list"]
+
+
+@pytest.fixture
+def depth_server():
+    """Socket server answering every request with a float32 depth reply."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    port = listener.getsockname()[1]
+    frames = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with conn:
+                unpacker = msgpack.Unpacker(raw=False)
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    unpacker.feed(data)
+                    for _, msgid, method, params in unpacker:
+                        if method == "simGetImages":
+                            raw, depth = depth_reply(msgid, 32, 24, seed=msgid)
+                            frames.append(depth)
+                        else:
+                            raw = msgpack.packb([1, msgid, None, True])
+                        conn.sendall(raw)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield port, frames
+    listener.close()
+
+
+def test_clients_decode_depth_into_arrays(bundled_airsim, depth_server):
+    pytest.importorskip("msgpackrpc")
+    airsim = bundled_airsim
+    port, frames = depth_server
+    request = [airsim.ImageRequest("oakd_camera", airsim.ImageType.DepthPerspective, True, False)]
+
+    with airsim.ImageClient(port=port, timeout_value=5) as images:
+        assert images.ping() is True
+        for _ in range(2):
+            response = images.simGetImages(request)[0]
+            assert isinstance(response.image_data_float, np.ndarray)
+            assert (response.as_array() == frames[-1]).all()
+
+    # The regular client keeps the stock unpacker on its own connection
+    client = airsim.MultirotorClient(port=port, timeout_value=5)
+    try:
+        response = client.simGetImages(request)[0]
+        assert isinstance(response.image_data_float, list)
+        assert (response.as_array() == frames[-1]).all()
+    finally:
+        client.client.close()
+
+    async def fetch():
+        async with airsim.AsyncMultirotorClient(
+            port=port, timeout_value=5, unpacker_factory=airsim.FloatArrayUnpacker
+        ) as aclient:
+            return await aclient.simGetImages(request)
+
+    response = asyncio.run(fetch())[0]
+    assert isinstance(response.image_data_float, np.ndarray)
+    assert (airsim.get_pfm_array(response) == frames[-1]).all()
+
+
+def test_depth_fetcher_decodes_float_responses(monkeypatch):
+    cv2 = pytest.importorskip("cv2")
+    if getattr(cv2, "__file__", None) is None:
+        pytest.skip("OpenCV not available")
+    import uav.acquisition as acquisition
+
+    def get_pfm_array(response):
+        return response.image_data_float.reshape(response.height, response.width)
+
+    stub = types.SimpleNamespace(
+        ImageRequest=lambda *args: args,
+        ImageType=types.SimpleNamespace(DepthPerspective=2),
+        get_pfm_array=get_pfm_array,
+    )
+    monkeypatch.setattr(acquisition, "airsim", stub)
+    depth = np.arange(6, dtype=np.float32)
+    response = types.SimpleNamespace(image_data_float=depth, width=3, height=2)
+    client = types.SimpleNamespace(simGetImages=lambda requests: requests)
+
+    fetcher = acquisition.DepthFetcher(client)
+    assert fetcher.fetch() == ("oakd_camera", 2, True, False)
+    assert fetcher.decode(response).shape == (2, 3)
+    assert fetcher.decode(types.SimpleNamespace(image_data_float=depth, width=4, height=2)) is None
+    assert fetcher.decode(types.SimpleNamespace(width=0, height=0)) is None
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+
+def make_response(airsim, **fields):
+    response = airsim.ImageResponse()
+    for name, value in fields.items():
+        setattr(response, name, value)
+    return response
+
+
+def test_uint8_payload_is_a_read_only_view(bundled_airsim):
+    frame = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(4, 3, 3)
+    payload = frame.tobytes()
+    response = make_response(
+        bundled_airsim, image_data_uint8=payload, width=3, height=4, compress=False
+    )
+    img = response.as_array()
+    assert img.shape == (4, 3, 3)
+    assert (img == frame).all()
+    assert img.base is not None and not img.flags.writeable
+    assert np.shares_memory(img, np.frombuffer(payload, np.uint8))
+
+
+def test_compressed_and_bad_payloads(bundled_airsim):
+    png = make_response(bundled_airsim, image_data_uint8=b"\x89PNG", width=3, height=4)
+    assert png.as_array().shape == (4,)
+    bad = make_response(
+        bundled_airsim, image_data_uint8=b"\x00" * 10, width=3, height=4, compress=False
+    )
+    with pytest.raises(ValueError):
+        bad.as_array()
+
+
+def test_float_payloads(bundled_airsim):
+    depth = np.linspace(0, 1, 6, dtype=np.float32)
+    from_list = make_response(
+        bundled_airsim, image_data_float=depth.tolist(), width=3, height=2, pixels_as_float=True
+    )
+    from_bytes = make_response(
+        bundled_airsim, image_data_float=depth.tobytes(), width=3, height=2, pixels_as_float=True
+    )
+    for response in (from_list, from_bytes):
+        arr = response.as_array()
+        assert arr.dtype == np.float32 and arr.shape == (2, 3)
+        assert np.allclose(arr.ravel(), depth)
+    pfm = bundled_airsim.get_pfm_array(from_list)
+    assert pfm.dtype == np.float32 and pfm.shape == (2, 3)
+
+
+def test_string_to_uint8_array_does_not_copy(bundled_airsim):
+    data = b"\x01\x02\x03"
+    arr = bundled_airsim.string_to_uint8_array(data)
+    assert arr.tolist() == [1, 2, 3]
+    assert not arr.flags.owndata
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from uav.log_sink import LogSink
+
+
+def make_row(frame):
+    return (
+        frame, 0.05 * frame, 100, 1.0, 2.0, 3.0, 0.5,
+        float(frame), 0.0, -2.0, 0.0, 1.5, "resume", 0, 0, 1,
+        1.0, 2.0, 0.0, 20.0, 0.01, 0.002, 0.02, 0.05, 0.0, 0.001, 0.0,
+    ) + (0,) * 8
+
+
+class FakeLog:
+    """Writer double whose ``append`` can be held to simulate a stalled disk."""
+
+    def __init__(self, stem, log_format):
+        self.path = f"{stem}.{log_format}"
+        self.rows = []
+        self.flushes = 0
+        self.syncs = 0
+        self.closed = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def append(self, row):
+        self.release.wait()
+        self.rows.append(row)
+
+    def flush(self):
+        self.flushes += 1
+
+    def sync(self):
+        self.syncs += 1
+
+    def close(self):
+        self.closed = True
+
+
+def fake_sink(**kwargs):
+    logs = []
+
+    def open_log(stem, log_format):
+        logs.append(FakeLog(stem, log_format))
+        return logs[-1]
+
+    def close_log(log):
+        log.close()
+        return log.path
+
+    sink = LogSink("run", "fake", open_log=open_log, close_log=close_log, **kwargs)
+    return sink, logs
+
+
+def test_binary_logs_are_written_off_thread_and_converted(tmp_path):
+    retained = []
+    sink = LogSink(str(tmp_path / "full_log_1"), retain=retained.append, poll_interval=0.005)
+    sink.start()
+    for frame in range(10):
+        assert sink.put(make_row(frame))
+    assert sink.flush(timeout=2.0)
+    assert sink.stats()["written"] == 10
+    sink.stop(timeout=2.0)
+
+    assert not sink.is_alive()
+    assert retained == [str(tmp_path / "full_log_1.bin")]
+    assert sink.closed_paths == [str(tmp_path / "full_log_1.csv")]
+    df = pd.read_csv(sink.closed_paths[0])
+    assert df["frame"].tolist() == list(range(10))
+    assert sink.stats()["dropped"] == 0
+
+
+def test_stalled_writer_never_blocks_put():
+    sink, logs = fake_sink(capacity=5, poll_interval=0.001)
+    logs[0].release.clear()  # disk stall: the sink thread blocks in append
+    sink.start()
+    start = time.perf_counter()
+    results = [sink.put(make_row(frame)) for frame in range(20)]
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.05
+    assert results.count(False) == sink.stats()["dropped"] >= 10
+
+    logs[0].release.set()
+    sink.stop(timeout=2.0)
+    stats = sink.stats()
+    assert stats["written"] + stats["dropped"] == 20
+    assert logs[0].closed
+
+
+def test_rotate_splits_records_at_the_reset():
+    sink, logs = fake_sink(fsync="never")
+    for frame in range(3):
+        sink.put(make_row(frame))
+    assert sink.rotate("run2", timeout=1.0)  # drained inline when not started
+    sink.put(make_row(3))
+    sink.stop(timeout=1.0)
+    sink.put(make_row(4))  # after shutdown: counted, never written
+
+    assert [len(log.rows) for log in logs] == [3, 1]
+    assert all(log.closed for log in logs)
+    assert sink.closed_paths == ["run.fake", "run2.fake"]
+    assert sink.stats()["rotations"] == 1
+    assert logs[0].syncs == logs[1].syncs == 0
+
+
+@pytest.mark.parametrize(
+    "policy, after_batches, after_flush",
+    [("always", 2, 3), ("interval", 0, 1), ("never", 0, 0)],
+)
+def test_fsync_policy(policy, after_batches, after_flush):
+    sink, logs = fake_sink(fsync=policy, fsync_interval=3600.0)
+    for frame in range(2):
+        sink.put(make_row(frame))
+        sink._drain()
+    assert logs[0].flushes == 2
+    assert logs[0].syncs == after_batches
+    sink.flush()
+    assert logs[0].syncs == after_flush
+
+
+def test_rejects_unknown_fsync_policy():
+    with pytest.raises(ValueError):
+        fake_sink(fsync="sometimes")
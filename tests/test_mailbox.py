@@ -0,0 +1,50 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from uav.mailbox import LatestMailbox
+
+
+def test_latest_item_wins_and_counts_overwrites():
+    box = LatestMailbox()
+    assert box.put("a") == 1
+    assert box.put("b") == 2
+    assert box.put("c") == 3
+    assert box.get_with_seq(timeout=0.1) == (3, "c")
+    stats = box.stats()
+    assert stats["overwritten"] == 2
+    assert stats["puts"] == 3
+    assert stats["gets"] == 1
+
+
+def test_get_times_out_when_nothing_new():
+    box = LatestMailbox()
+    box.put(1)
+    box.get(timeout=0.1)
+    with pytest.raises(queue.Empty):
+        box.get(timeout=0.05)
+    assert box.depth() == 0
+
+
+def test_waiting_reader_is_woken_by_put():
+    box = LatestMailbox()
+    result = []
+    reader = threading.Thread(target=lambda: result.append(box.get(timeout=2.0)))
+    reader.start()
+    time.sleep(0.05)
+    box.put("frame")
+    reader.join(timeout=2.0)
+    assert result == ["frame"]
+
+
+def test_close_drops_unread_and_rejects_puts():
+    box = LatestMailbox()
+    box.put("unread")
+    box.close()
+    assert box.put("late") == 0
+    assert box.dropped == 2
+    with pytest.raises(queue.Empty):
+        box.get(timeout=0.05)
+
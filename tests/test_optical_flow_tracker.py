@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+if getattr(cv2, "__file__", None) is None:
+    pytest.skip("OpenCV not available", allow_module_level=True)
+
+from uav.perception import OpticalFlowTracker, perception_result
+
+
+FEATURE_PARAMS = dict(maxCorners=60, qualityLevel=0.05, minDistance=5, blockSize=5)
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+
+def make_frames(count, shift=2, size=(240, 320)):
+    rng = np.random.default_rng(0)
+    h, w = size
+    base = np.zeros((h, w + shift * count), dtype=np.uint8)
+    for _ in range(80):
+        x = int(rng.integers(0, base.shape[1] - 12))
+        y = int(rng.integers(0, h - 12))
+        base[y:y + 10, x:x + 10] = int(rng.integers(80, 255))
+    return [base[:, i * shift:i * shift + w].copy() for i in range(count)]
+
+
+def test_default_mode_redetects_every_frame():
+    frames = make_frames(3)
+    tracker = OpticalFlowTracker(LK_PARAMS, FEATURE_PARAMS)
+    tracker.initialize(frames[0])
+    tracker.process_frame(frames[1], 0.0)
+    tracker.process_frame(frames[2], 0.0)
+    assert np.all(tracker.last_track_ages == 1)
+
+
+def test_keep_tracks_carries_ids_and_ages_forward():
+    frames = make_frames(4)
+    tracker = OpticalFlowTracker(
+        LK_PARAMS, FEATURE_PARAMS, keep_tracks=True, min_tracks=10
+    )
+    tracker.initialize(frames[0])
+    first_ids = set(tracker.track_ids.tolist())
+    assert first_ids
+
+    for frame in frames[1:]:
+        pts, vectors, _ = tracker.process_frame(frame, 0.0)
+        assert len(pts) == len(tracker.last_track_ids)
+
+    survivors = set(tracker.last_track_ids.tolist()) & first_ids
+    assert survivors
+    assert tracker.last_track_ages.max() == 3
+    # Content scrolls left by two pixels per frame
+    assert np.median(vectors.reshape(-1, 2)[:, 0]) == pytest.approx(-2, abs=0.5)
+
+
+def test_keep_tracks_replenishes_below_floor():
+    frames = make_frames(2)
+    tracker = OpticalFlowTracker(
+        LK_PARAMS, FEATURE_PARAMS, keep_tracks=True, min_tracks=60
+    )
+    tracker.initialize(frames[0])
+    # Drop most tracks so the live count falls below the floor
+    tracker.prev_pts = tracker.prev_pts[:5]
+    tracker.track_ids = tracker.track_ids[:5]
+    tracker.track_ages = tracker.track_ages[:5]
+    next_id = tracker._next_track_id
+
+    tracker.process_frame(frames[1], 0.0)
+
+    assert len(tracker.prev_pts) > 5
+    assert len(tracker.prev_pts) == len(tracker.track_ids)
+    new_ids = tracker.track_ids[tracker.track_ids >= next_id]
+    assert len(new_ids) > 0
+    assert np.all(tracker.track_ages[tracker.track_ids >= next_id] == 0)
+
+
+def test_processing_resolution_reports_frame_coordinates():
+    from uav.preprocessing import FramePreprocessor
+
+    frames = make_frames(2, shift=4, size=(240, 320))
+    tracker = OpticalFlowTracker(
+        LK_PARAMS,
+        FEATURE_PARAMS,
+        preprocessor=FramePreprocessor(size=(160, 120)),
+    )
+    tracker.initialize(frames[0])
+    pts, vectors, _ = tracker.process_frame(frames[1], 0.0)
+
+    assert len(pts) > 0
+    pts = pts.reshape(-1, 2)
+    assert pts[:, 0].max() > 160  # mapped back beyond the processed width
+    assert np.median(vectors.reshape(-1, 2)[:, 0]) == pytest.approx(-4, abs=1.0)
+
+
+def test_flow_rate_uses_injected_clock():
+    from uav.clock import ManualClock
+
+    frames = make_frames(2)
+    stds = []
+    for step in (0.1, 0.5):
+        clock = ManualClock(100.0)
+        tracker = OpticalFlowTracker(LK_PARAMS, FEATURE_PARAMS, clock=clock)
+        tracker.initialize(frames[0])
+        clock.advance(step)
+        _, _, flow_std = tracker.process_frame(frames[1], 0.0)
+        stds.append(flow_std)
+    assert stds[0] == pytest.approx(5 * stds[1])
+
+
+def test_capture_time_drives_flow_rate():
+    from uav.clock import ManualClock
+
+    frames = make_frames(2)
+    stds = []
+    for capture_dt in (0.05, 0.25):
+        clock = ManualClock(100.0)
+        tracker = OpticalFlowTracker(LK_PARAMS, FEATURE_PARAMS, clock=clock)
+        tracker.initialize(frames[0], 10.0)
+        clock.advance(3.0)  # processing delay must not leak into the rate
+        _, _, flow_std = tracker.process_frame(frames[1], 10.0 + capture_dt)
+        stds.append(flow_std)
+    assert stds[0] == pytest.approx(5 * stds[1])
+
+
+def test_perception_result_durations_from_stamps():
+    img = np.zeros((4, 4, 3), dtype=np.uint8)
+    stamps = (1_000_000, 3_000_000, 4_000_000, 8_000_000)
+    pts = np.zeros((2, 1, 2), dtype=np.float32)
+    result = perception_result(img, stamps, 12.5, (pts, pts + 1, 0.25), (0.0, 0.0, 0.001, 0.001))
+    assert result.simgetimage_s == pytest.approx(0.002)
+    assert result.decode_s == pytest.approx(0.001)
+    assert result.processing_s == pytest.approx(0.004)
+    assert result.points is pts and result.flow_std == 0.25
+    assert (result.capture_time, result.stamps) == (12.5, stamps)
+
+    # No flow (empty response or first frame): nothing tracked, no tracking time
+    seeded = perception_result(img, stamps, decode_s=0.0005)
+    assert len(seeded.points) == 0 and seeded.flow_std == 0.0
+    assert seeded.decode_s == 0.0005 and seeded.processing_s == 0.0
+    assert seeded.preprocess_s == (0.0, 0.0, 0.0, 0.0)
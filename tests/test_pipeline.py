@@ -0,0 +1,113 @@
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+if getattr(cv2, "__file__", None) is None:
+    pytest.skip("OpenCV not available", allow_module_level=True)
+
+from uav.mailbox import LatestMailbox
+from uav.pipeline import StagedPerceptionPipeline, StageMetrics
+from uav.preprocessing import STEPS, FramePreprocessor
+
+
+class DummyFetcher:
+    def __init__(self):
+        self.count = 0
+
+    def fetch(self):
+        time.sleep(0.002)
+        self.count += 1
+        # Every other response repeats the previous render
+        return types.SimpleNamespace(
+            value=self.count % 250, time_stamp=(self.count + 1) // 2
+        )
+
+    @staticmethod
+    def is_empty(response):
+        return False
+
+    def is_duplicate(self, response):
+        duplicate = response.time_stamp == getattr(self, "last", None)
+        self.last = response.time_stamp
+        return duplicate
+
+    @staticmethod
+    def capture_time(response):
+        return response.time_stamp / 1e9
+
+    def decode(self, response):
+        return np.full((8, 8, 3), response.value, dtype=np.uint8)
+
+
+class DummyTracker:
+    def __init__(self):
+        self.prev_gray = None
+        self.calls = 0
+        self.preprocessor = FramePreprocessor()
+        self.capture_times = []
+
+    def initialize(self, gray, capture_time=None):
+        self.prev_gray = gray
+
+    def process_frame(self, gray, capture_time=None):
+        self.calls += 1
+        self.capture_times.append(capture_time)
+        self.prev_gray = self.preprocessor.process(gray)
+        pts = np.zeros((2, 1, 2), dtype=np.float32)
+        return pts, pts + 1, 0.25
+
+
+def test_pipeline_publishes_tracked_frames_and_metrics():
+    output = LatestMailbox()
+    stop = threading.Event()
+    tracker = DummyTracker()
+    pipeline = StagedPerceptionPipeline(
+        DummyFetcher, tracker, output, stop, frame_size=(8, 8), poll_timeout=0.01
+    )
+    pipeline.start()
+    results = []
+    deadline = time.time() + 5.0
+    while len(results) < 5 and time.time() < deadline:
+        try:
+            results.append(output.get(timeout=0.5))
+        except Exception:
+            pass
+    stop.set()
+    pipeline.join(timeout=2.0)
+
+    assert not pipeline.is_alive()
+    assert len(results) == 5
+    result = results[-1]
+    assert result.vis_img.shape == (8, 8, 3)
+    assert len(result.points) == 2 and result.flow_std == 0.25
+    assert result.simgetimage_s > 0
+    assert result.capture_time > 0
+    # capture, fetched, decoded and processed stamps in order
+    stamps = result.stamps
+    assert len(stamps) == 4 and 0 < stamps[0] <= stamps[1] <= stamps[2] <= stamps[3]
+    timings = dict(zip(STEPS, result.preprocess_s))
+    assert timings["roi"] == timings["resize"] == 0.0  # steps not configured
+    assert 0 < timings["clahe"] <= timings["total"]
+    # Duplicate renders never reach the tracker
+    assert len(set(tracker.capture_times)) == len(tracker.capture_times)
+
+    stats = pipeline.stats()
+    assert set(stats) == {"fetch", "decode", "track"}
+    assert stats["fetch"]["frames"] >= stats["track"]["frames"] >= 4
+    assert "queue_depth" in stats["fetch"]
+    assert 0.0 <= stats["track"]["avg_input_depth"] <= 1.0
+
+
+def test_stage_metrics_fps_from_recent_completions():
+    metrics = StageMetrics("x")
+    assert metrics.fps() == 0.0
+    for _ in range(3):
+        metrics.record(0.001)
+        time.sleep(0.01)
+    snap = metrics.snapshot()
+    assert snap["frames"] == 3
+    assert snap["fps"] > 0
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+if getattr(cv2, "__file__", None) is None:
+    pytest.skip("OpenCV not available", allow_module_level=True)
+
+from uav.preprocessing import PROFILES, STEPS, FramePreprocessor
+from uav.utils import apply_clahe
+
+
+def make_gray(h=72, w=128):
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 255, size=(h, w), dtype=np.uint8)
+
+
+def test_clahe_only_matches_apply_clahe():
+    gray = make_gray()
+    pre = FramePreprocessor()
+    out = pre.process(gray)
+    assert np.array_equal(out, apply_clahe(gray))
+    assert set(pre.timings) == {"clahe", "total"}
+
+
+def test_output_buffers_are_rotated_and_reused():
+    pre = FramePreprocessor(buffer_count=2)
+    a = pre.process(make_gray())
+    b = pre.process(make_gray())
+    c = pre.process(make_gray())
+    assert a is not b
+    assert a is c
+
+
+def test_resize_and_roi_map_points_back_to_frame():
+    gray = make_gray(720, 1280)
+    pre = FramePreprocessor(clahe=False, roi=(100, 50, 800, 400), size=(200, 100))
+    out = pre.process(gray)
+    assert out.shape == (100, 200)
+    assert set(pre.timings) == {"roi", "resize", "total"}
+
+    pts = np.array([[[0.0, 0.0]], [[50.0, 25.0]]], dtype=np.float32)
+    mapped = pre.to_frame_points(pts)
+    # Pixel centres: processed (0, 0) covers frame pixels 100..103 x 50..53
+    assert np.allclose(mapped.reshape(-1, 2), [[101.5, 51.5], [301.5, 151.5]])
+    vec = pre.to_frame_vectors(np.array([[[1.0, 1.0]]], dtype=np.float32))
+    assert np.allclose(vec.reshape(-1), [4.0, 4.0])
+
+
+def test_non_integer_resize_round_trips_pixel_centres():
+    gray = np.zeros((360, 640), dtype=np.uint8)
+    gray[150:190, 300:340] = 255  # centred on frame pixel (319.5, 169.5)
+    pre = FramePreprocessor(clahe=False, size=(224, 126))  # scale 0.35
+    out = pre.process(gray).astype(np.float64)
+
+    ys, xs = np.indices(out.shape)
+    centroid = np.array([[[(xs * out).sum() / out.sum(), (ys * out).sum() / out.sum()]]])
+    mapped = pre.to_frame_points(centroid.astype(np.float32))
+    assert np.allclose(mapped.reshape(-1), [319.5, 169.5], atol=0.05)
+
+
+def test_from_profile_and_overrides():
+    pre = FramePreprocessor.from_profile("half", clahe=False)
+    assert pre.size == PROFILES["half"]["size"]
+    assert pre.clahe_enabled is False
+    with pytest.raises(ValueError):
+        FramePreprocessor.from_profile("missing")
+
+
+def test_roi_with_clahe_reuses_buffers_and_reports_step_timings():
+    gray = make_gray(720, 1280)
+    pre = FramePreprocessor(roi=(100, 50, 800, 400), buffer_count=1)
+    first = pre.process(gray)
+    roi_buffer = pre._buffers[("roi", (400, 800))][0]
+    second = pre.process(gray)
+    assert first is second
+    assert pre._buffers[("roi", (400, 800))][0] is roi_buffer
+    assert np.array_equal(second, apply_clahe(np.ascontiguousarray(gray[50:450, 100:900])))
+
+    timings = dict(zip(STEPS, pre.step_timings()))
+    assert timings["resize"] == 0.0
+    assert 0 < timings["clahe"] <= timings["total"]
@@ -0,0 +1,44 @@
+import csv
+
+from analysis.replay_decisions import replay_log
+from uav.decision import DecisionParams
+
+FIELDS = [
+    "frame", "time", "features", "flow_left", "flow_center", "flow_right",
+    "flow_std", "pos_x", "pos_y", "speed", "state",
+]
+
+
+def write_log(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def row(i, center, state):
+    return {
+        "frame": i, "time": 100.0 + 0.05 * i, "features": 40,
+        "flow_left": 10.0, "flow_center": center, "flow_right": 10.0,
+        "flow_std": 1.0, "pos_x": 0.1 * i, "pos_y": 0.0, "speed": 1.0,
+        "state": state,
+    }
+
+
+def test_replay_log_matches_logged_states(tmp_path):
+    path = tmp_path / "full_log_test.csv"
+    write_log(path, [row(1, 1.0, "none"), row(2, 50.0, "brake"), row(3, 1.0, "none")])
+    result = replay_log(str(path))
+    assert result["frames"] == 3
+    assert result["states"] == {"none": 2, "brake": 1}
+    assert result["agreement"] == 1.0
+    assert result["obstacles"] == 1
+    assert result["fps"] > 0
+
+
+def test_replay_log_with_custom_thresholds(tmp_path):
+    path = tmp_path / "full_log_test.csv"
+    write_log(path, [row(1, 1.0, "none"), row(2, 50.0, "brake")])
+    result = replay_log(str(path), DecisionParams(brake_base=100.0))
+    assert "brake" not in result["states"]
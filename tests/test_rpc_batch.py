@@ -0,0 +1,148 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+msgpackrpc = pytest.importorskip("msgpackrpc")
+pytest.importorskip("tornado")
+
+from msgpackrpc.server import AsyncResult
+
+from uav.telemetry import fetch_telemetry
+
+STATE = {
+    "timestamp": 123,
+    "kinematics_estimated": {
+        "position": {"x_val": 1.0, "y_val": 2.0, "z_val": -3.0},
+        "orientation": {"w_val": 1.0, "x_val": 0.0, "y_val": 0.0, "z_val": 0.0},
+        "linear_velocity": {"x_val": 3.0, "y_val": 4.0, "z_val": 0.0},
+    },
+}
+
+
+class LockstepSim:
+    """Server that answers the state request only once collision info is asked.
+
+    A client that waits for each reply before sending the next request
+    would stall on ``getMultirotorState``.
+    """
+
+    def __init__(self):
+        self.pending = None
+        self.commands = []
+
+    def getMultirotorState(self, vehicle_name):
+        self.pending = AsyncResult()
+        return self.pending
+
+    def simGetCollisionInfo(self, vehicle_name):
+        if self.pending is not None:
+            self.pending.set_result(STATE)
+            self.pending = None
+        return {"has_collided": True}
+
+    def moveByVelocity(self, vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name):
+        self.commands.append((vx, vy, vz, duration))
+        return True
+
+    def fail(self):
+        raise RuntimeError("boom")
+
+
+@pytest.fixture
+def sim(bundled_airsim):
+    airsim = bundled_airsim
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    handler = LockstepSim()
+    ready = threading.Event()
+
+    def serve():
+        server = msgpackrpc.Server(handler, pack_encoding="utf-8", unpack_encoding="utf-8")
+        server.listen(msgpackrpc.Address("127.0.0.1", port))
+        ready.set()
+        server.start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    assert ready.wait(2.0)
+    client = airsim.MultirotorClient(port=port, timeout_value=2)
+    return airsim, client, handler, port
+
+
+def test_batch_pipelines_calls(sim):
+    airsim, client, handler, _ = sim
+    with client.batch() as batch:
+        state = batch.getMultirotorState()
+        collision = batch.simGetCollisionInfo()
+        command = batch.moveByVelocityAsync(2.0, 0.0, 0.0, 1.0)
+    assert isinstance(state.result(), airsim.MultirotorState)
+    assert state.result().timestamp == 123
+    assert collision.result().has_collided is True
+    assert command.result() is True
+    assert handler.commands == [(2.0, 0.0, 0.0, 1.0)]
+
+
+def test_join_returns_results_in_order(sim):
+    _, client, _, _ = sim
+    batch = client.batch()
+    batch.getMultirotorState()
+    batch.call("simGetCollisionInfo", "")
+    state, collision = batch.join()
+    assert state.kinematics_estimated.position.x_val == 1.0
+    assert collision == {"has_collided": True}
+    assert batch.join() == []
+
+
+def test_batch_raises_server_errors(sim):
+    _, client, _, _ = sim
+    with pytest.raises(Exception):
+        with client.batch() as batch:
+            batch.call("fail")
+
+
+def test_fetch_telemetry_uses_one_batch(sim):
+    _, client, _, _ = sim
+    snap = fetch_telemetry(client)
+    assert snap.sim_timestamp == 123
+    assert snap.speed == pytest.approx(5.0)
+    assert snap.collided is True
+
+
+def test_async_client_overlaps_requests(sim):
+    airsim, _, handler, port = sim
+
+    async def scenario():
+        async with airsim.AsyncMultirotorClient(port=port, timeout_value=2) as client:
+            state, collision = await asyncio.gather(
+                client.getMultirotorState(), client.simGetCollisionInfo()
+            )
+            accepted = await client.moveByVelocityAsync(2.0, 0.0, 0.0, 1.0)
+            with pytest.raises(msgpackrpc.error.RPCError):
+                await client.call("fail")
+            return state, collision, accepted
+
+    state, collision, accepted = asyncio.run(scenario())
+    assert isinstance(state, airsim.MultirotorState)
+    assert state.kinematics_estimated.linear_velocity.x_val == 3.0
+    assert collision.has_collided is True
+    assert accepted is True
+    assert handler.commands == [(2.0, 0.0, 0.0, 1.0)]
+
+
+def test_async_client_close_fails_pending_calls(sim):
+    airsim, _, _, port = sim
+
+    async def scenario():
+        client = airsim.AsyncMultirotorClient(port=port, timeout_value=2)
+        await client.connect()
+        pending = asyncio.ensure_future(client.getMultirotorState())
+        await asyncio.sleep(0.05)  # the server holds the reply
+        await client.close()
+        with pytest.raises(ConnectionError):
+            await pending
+        with pytest.raises(ConnectionError):
+            client.moveByVelocityAsync(0.0, 0.0, 0.0, 1.0)
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+import pytest
+
+from uav.scheduler import RateScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.0)
+
+    def work(self, seconds):
+        self.now += seconds
+
+
+def make(policy="skip", **kwargs):
+    clock = FakeClock()
+    sched = RateScheduler(20.0, policy=policy, clock=clock, sleep=clock.sleep, **kwargs)
+    return sched, clock
+
+
+def test_absolute_deadlines_do_not_drift():
+    sched, clock = make()
+    first = sched.wait()
+    for _ in range(10):
+        clock.work(0.01)
+        tick = sched.wait()
+    assert tick.start == pytest.approx(first.start + 10 * 0.05)
+    assert tick.period == pytest.approx(0.05)
+    assert tick.work_s == pytest.approx(0.01)
+    assert sched.stats()["overruns"] == 0
+
+
+def test_skip_policy_drops_missed_deadlines():
+    sched, clock = make("skip")
+    first = sched.wait()
+    clock.work(0.12)  # overruns the 50 ms budget by 70 ms
+    tick = sched.wait()
+    assert tick.overrun_s == pytest.approx(0.07)
+    assert tick.skipped == 2
+    assert tick.start == pytest.approx(first.start + 0.15)
+    stats = sched.stats()
+    assert stats["overruns"] == 1
+    assert stats["max_overrun_s"] == pytest.approx(0.07)
+
+
+def test_catch_up_policy_runs_back_to_back():
+    sched, clock = make("catch_up")
+    first = sched.wait()
+    clock.work(0.12)
+    late = sched.wait()
+    assert late.start == pytest.approx(first.start + 0.12)
+    burst = sched.wait()
+    assert burst.start == late.start  # deadline already passed, no sleep
+    on_grid = sched.wait()
+    assert on_grid.deadline == pytest.approx(first.start + 0.15)
+
+
+def test_degrade_policy_stretches_and_recovers():
+    sched, clock = make("degrade", degrade_factor=2.0, recover_after=2)
+    sched.wait()
+    clock.work(0.06)
+    sched.wait()
+    assert sched.rate_hz == pytest.approx(10.0)
+    sched.wait()
+    sched.wait()
+    assert sched.rate_hz == pytest.approx(20.0)
+
+
+def test_rearm_keeps_counters():
+    sched, clock = make()
+    sched.wait()
+    clock.work(0.2)
+    sched.wait()
+    clock.work(5.0)
+    sched.rearm()
+    sched.wait()
+    stats = sched.stats()
+    assert stats["ticks"] == 3
+    assert stats["overruns"] == 1
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        RateScheduler(20.0, policy="bogus")
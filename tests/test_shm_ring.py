@@ -0,0 +1,84 @@
+import multiprocessing
+import queue
+
+import numpy as np
+import pytest
+
+from uav.shm_ring import SharedFrameRing
+
+
+def make_data(value, n_points=3):
+    image = np.full((6, 8, 3), value, dtype=np.uint8)
+    points = np.arange(n_points * 2, dtype=np.float32).reshape(-1, 1, 2) + value
+    vectors = np.ones((n_points, 1, 2), dtype=np.float32) * value
+    return image, points, vectors, 0.5, 0.01, 0.02, 0.03, 12.5
+
+
+@pytest.fixture
+def ring():
+    r = SharedFrameRing.create(slots=3, height=6, width=8, max_points=4)
+    yield r
+    r.close()
+
+
+def test_put_and_get_round_trip(ring):
+    ring.put(make_data(7))
+    seq, (image, points, vectors, std, fetch_s, decode_s, proc_s, capture, stamps, preprocess_s) = ring.get_with_seq(
+        timeout=0.1
+    )
+    assert seq == 1
+    assert np.all(image == 7)
+    assert not image.flags.writeable
+    assert points.shape == (3, 1, 2)
+    assert np.allclose(points, make_data(7)[1])
+    assert np.allclose(vectors, 7)
+    assert (std, fetch_s, decode_s, proc_s, capture) == (0.5, 0.01, 0.02, 0.03, 12.5)
+    assert stamps == (0, 0, 0, 0)  # omitted by the producer
+    assert preprocess_s == (0.0, 0.0, 0.0, 0.0)
+
+
+def test_perception_stamps_survive_the_ring(ring):
+    stamps = (2**62 + 1, 2**62 + 2, 2**62 + 3, 2**62 + 4)  # beyond float64 precision
+    timings = (0.0, 0.00125, 0.0025, 0.004)
+    ring.put(make_data(1) + (stamps, timings))
+    data = ring.get(timeout=0.1)
+    assert data[8] == stamps
+    assert data[9] == timings
+
+
+def test_reader_skips_to_newest_and_counts_overwrites(ring):
+    for value in range(1, 6):
+        ring.put(make_data(value))
+    seq, data = ring.get_with_seq(timeout=0.1)
+    assert seq == 5
+    assert np.all(data[0] == 5)
+    assert ring.stats()["overwritten"] == 4
+    with pytest.raises(queue.Empty):
+        ring.get(timeout=0.05)
+
+
+def test_recycled_slot_is_detected_and_points_truncated(ring):
+    seq = ring.put(make_data(1, n_points=10))
+    _, data = ring.get_with_seq(timeout=0.1)
+    assert len(data[1]) == 4
+    for value in range(2, 5):
+        ring.put(make_data(value))
+    assert not ring.still_valid(seq)
+
+
+def test_empty_points_are_returned_as_empty_arrays(ring):
+    ring.put(make_data(3, n_points=0))
+    _, data = ring.get_with_seq(timeout=0.1)
+    assert len(data[1]) == 0 and len(data[2]) == 0
+
+
+def _writer(ring):
+    ring.put(make_data(42))
+
+
+def test_frames_cross_process_boundary(ring):
+    proc = multiprocessing.Process(target=_writer, args=(ring,))
+    proc.start()
+    _, data = ring.get_with_seq(timeout=5.0)
+    proc.join(timeout=5.0)
+    assert np.all(data[0] == 42)
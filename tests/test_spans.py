@@ -0,0 +1,56 @@
+import math
+
+import pandas as pd
+
+from analysis.latency_breakdown import format_breakdown, frame_spans, latency_breakdown
+from uav.spans import CONTROL_STAMPS, NO_STAMPS, SPANS, STAMPS, SpanRecorder, now_ns, span_ns
+
+
+def test_recorder_orders_perception_and_control_stamps():
+    base = now_ns() - 10_000
+    spans = SpanRecorder((base, base + 2_000, base + 3_500, base + 3_501))
+    for name in CONTROL_STAMPS:
+        spans.mark(name)
+
+    stamps = spans.stamps()
+    assert len(stamps) == len(STAMPS)
+    assert spans["decoded_ns"] == base + 3_500
+    durations = spans.spans()
+    assert durations["fetch"] == 2_000
+    assert durations["decode"] == 1_500
+    assert durations["track"] == 1
+    assert all(durations[name] >= 0 for name, _, _ in SPANS)
+    assert durations["capture_to_log"] == sum(durations[name] for name, _, _ in SPANS)
+
+
+def test_missing_stamps_leave_spans_unmeasured():
+    spans = SpanRecorder(NO_STAMPS)
+    spans.mark("dequeue_ns")
+    spans.mark("decision_ns")
+    durations = spans.spans()
+    assert durations["handoff"] is None
+    assert durations["decide"] >= 0
+    assert durations["capture_to_log"] is None
+    assert span_ns(0, 5) is None
+
+
+def test_latency_breakdown_in_microseconds():
+    base = 10**15
+    rows = []
+    for frame in range(100):
+        stamps = [base + 1_000_000 * frame + 1_000 * i + (frame if i == 2 else 0) for i in range(8)]
+        rows.append(dict(zip(STAMPS, stamps), frame=frame))
+    rows[0]["capture_ns"] = 0  # first frame carries no perception stamp
+    df = pd.DataFrame(rows)
+
+    per_frame = frame_spans(df)
+    assert math.isnan(per_frame["fetch"][0])
+    assert per_frame["fetch"][1] == 1.0
+    assert per_frame["decode"][99] == 1.099  # ns resolution survives
+
+    summary = latency_breakdown(df)
+    assert summary.loc["fetch", "count"] == 99
+    assert summary.loc["decide", "count"] == 100
+    assert summary.loc["capture_to_log", "max"] == 7.0
+    assert summary.loc["decode", "p50"] < summary.loc["decode", "p99"]
+    assert "capture_to_log" in format_breakdown(summary)
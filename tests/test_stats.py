@@ -0,0 +1,83 @@
+import math
+import random
+import sys
+
+import numpy as np
+import pytest
+
+from uav.stats import LogHistogram, RunStats
+
+
+def test_quantiles_within_precision_of_exact():
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-3.0, 0.8) for _ in range(20000)]
+    hist = LogHistogram(precision=0.01)
+    hist.extend(samples)
+
+    exact = np.sort(samples)
+    for q in (0.0, 0.5, 0.95, 0.99, 1.0):
+        expected = exact[max(math.ceil(q * len(exact)), 1) - 1]
+        assert abs(hist.quantile(q) - expected) <= 0.0101 * expected
+    assert hist.quantile(1.0) == max(samples)
+    assert hist.quantile(0.0) == min(samples)
+    assert hist.mean == pytest.approx(sum(samples) / len(samples))
+
+
+def test_memory_is_constant():
+    hist = LogHistogram()
+    hist.add(0.05)
+    size = sys.getsizeof(hist._counts)
+    for i in range(100000):
+        hist.add(0.001 + (i % 997) * 0.01)
+    assert sys.getsizeof(hist._counts) == size
+    assert hist.count == 100001
+
+
+def test_out_of_range_and_empty():
+    hist = LogHistogram(lo=1.0, hi=100.0)
+    assert math.isnan(hist.quantile(0.5))
+    assert math.isnan(hist.summary()["max"])
+    hist.extend([0.0, 0.2, 500.0])
+    assert hist.quantile(0.0) == 0.0
+    assert hist.quantile(1.0) == 500.0
+    # Out-of-range buckets report a value clamped to the observed range
+    assert 0.0 <= hist.quantile(0.5) <= 500.0
+
+
+
+def test_non_finite_samples_are_counted_not_recorded():
+    hist = LogHistogram()
+    hist.extend([0.01, math.nan, math.inf, 0.02])
+    assert hist.count == 2
+    assert hist.non_finite == 2
+    assert hist.max == 0.02
+    assert hist.mean == pytest.approx(0.015)
+    stats = RunStats()
+    stats.add("loop_s", math.nan)
+    assert stats["loop_s"].non_finite == 1
+
+
+def test_summary_scale_and_merge():
+    a = LogHistogram()
+    b = LogHistogram()
+    a.extend([0.010, 0.020])
+    b.extend([0.030, 0.050])
+    a.merge(b)
+    summary = a.summary(scale=1000.0)
+    assert summary["count"] == 4
+    assert summary["max"] == pytest.approx(50.0)
+    assert summary["p50"] == pytest.approx(20.0, rel=0.01)
+    assert set(summary) == {"count", "mean", "p50", "p95", "p99", "max"}
+    with pytest.raises(ValueError):
+        a.merge(LogHistogram(precision=0.05))
+
+
+def test_run_stats_creates_metrics_on_first_use():
+    stats = RunStats()
+    stats.add("fps", 20.0)
+    stats.add("fetch", None)  # not measured this frame
+    stats.add("fps", 10.0)
+    assert stats.names() == ["fps"]
+    assert "fetch" not in stats
+    assert stats.summary()["fps"]["count"] == 2
+    assert stats["fps"].quantile(0.5) == pytest.approx(10.0, rel=0.01)
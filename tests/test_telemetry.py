@@ -0,0 +1,92 @@
+import time
+import types
+
+import pytest
+
+import uav.telemetry as telemetry
+from uav.telemetry import TelemetryPoller, fetch_telemetry
+
+
+def vec(x=0.0, y=0.0, z=0.0):
+    return types.SimpleNamespace(x_val=x, y_val=y, z_val=z)
+
+
+class DummyClient:
+    def __init__(self, collided=False, fail_state=False):
+        self.collided = collided
+        self.fail_state = fail_state
+        self.state_calls = 0
+        self.collision_calls = 0
+
+    def getMultirotorState(self):
+        self.state_calls += 1
+        if self.fail_state:
+            raise RuntimeError("rpc down")
+        kin = types.SimpleNamespace(
+            position=vec(1.0, 2.0, -3.0),
+            orientation=vec(),
+            linear_velocity=vec(3.0, 4.0, 0.0),
+        )
+        return types.SimpleNamespace(kinematics_estimated=kin, timestamp=42)
+
+    def simGetCollisionInfo(self):
+        self.collision_calls += 1
+        return types.SimpleNamespace(has_collided=self.collided)
+
+
+def test_fetch_telemetry_single_rpc_each():
+    client = DummyClient(collided=True)
+    snap = fetch_telemetry(client)
+    assert client.state_calls == 1
+    assert client.collision_calls == 1
+    assert snap.position.x_val == 1.0
+    assert snap.speed == pytest.approx(5.0)
+    assert snap.collided is True
+    assert snap.sim_timestamp == 42
+
+
+def test_fetch_telemetry_is_immutable():
+    snap = fetch_telemetry(DummyClient())
+    with pytest.raises(AttributeError):
+        snap.speed = 1.0
+
+
+def test_fetch_telemetry_state_error(monkeypatch):
+    monkeypatch.setattr(
+        telemetry, "airsim", types.SimpleNamespace(Vector3r=vec)
+    )
+    client = DummyClient(fail_state=True)
+    snap = fetch_telemetry(client)
+    assert snap.position.x_val == 0
+    assert snap.speed == 0.0
+    assert snap.collided is False
+    assert client.collision_calls == 1
+
+
+def test_poller_publishes_latest_snapshot():
+    poller = TelemetryPoller(DummyClient)
+    assert poller.latest() is None
+    assert poller.age() == float("inf")
+    client = DummyClient()
+    first = poller.poll_once(client)
+    second = poller.poll_once(client)
+    assert poller.latest() is second
+    assert first is not second
+    assert poller.polls == 2
+    assert not poller.is_stale(1.0)
+    assert poller.age(now=second.wall_time + 2.0) == pytest.approx(2.0)
+
+
+def test_poller_thread_stats():
+    client = DummyClient()
+    poller = TelemetryPoller(lambda: client, rate_hz=200.0)
+    poller.start()
+    deadline = time.time() + 2.0
+    while poller.polls < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    poller.stop(timeout=1.0)
+    assert not poller.is_alive()
+    assert client.state_calls == poller.polls >= 5
+    stats = poller.stats()
+    assert stats["poll_rate_hz"] > 0
+    assert 0 <= stats["latency_p50_ms"] <= stats["latency_p99_ms"] <= stats["latency_max_ms"]
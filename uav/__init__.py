@@ -1,6 +1,7 @@
 """UAV package providing perception, navigation and interface utilities."""
 
 from .perception import OpticalFlowTracker, FlowHistory
+from .preprocessing import FramePreprocessor
 from .navigation import Navigator
 from .interface import exit_flag, start_gui
 from .utils import apply_clahe, get_yaw, get_speed, get_drone_state
@@ -8,6 +9,7 @@ from .utils import apply_clahe, get_yaw, get_speed, get_drone_state
 __all__ = [
     "OpticalFlowTracker",
     "FlowHistory",
+    "FramePreprocessor",
     "Navigator",
     "exit_flag",
     "start_gui",
@@ -0,0 +1,206 @@
+# uav/acquisition.py
+"""Image acquisition helpers for fetching and decoding AirSim camera frames."""
+
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import airsim
+
+
+class ImageFetcher:
+    """Request scene images from AirSim and turn them into BGR frames.
+
+    In ``raw`` mode frames are requested uncompressed and the response bytes
+    are reshaped in place into an ``HxWxC`` view, skipping the PNG decode and
+    the extra buffer copy. If the simulator returns data that cannot be
+    interpreted as a raw image ``fallback_after`` times in a row, the fetcher
+    permanently switches to compressed PNG requests.
+
+    Responses carrying the same ``time_stamp`` as the previous one are
+    repeats of an already seen render; :meth:`is_duplicate` flags them so
+    callers can skip decoding and tracking.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        camera_name: str = "oakd_camera",
+        raw: bool = True,
+        frame_size: Optional[Tuple[int, int]] = (1280, 720),
+        fallback_after: int = 3,
+    ) -> None:
+        """Create a fetcher bound to ``client``.
+
+        Args:
+            client: AirSim client used for ``simGetImages`` calls.
+            camera_name: Camera to request images from.
+            raw: Request uncompressed frames when ``True``.
+            frame_size: ``(width, height)`` frames are resized to, or
+                ``None`` to keep the simulator resolution.
+            fallback_after: Consecutive undecodable raw frames tolerated
+                before switching to compressed requests.
+        """
+        self.client = client
+        self.camera_name: str = camera_name
+        self.raw: bool = raw
+        self.frame_size: Optional[Tuple[int, int]] = frame_size
+        self.fallback_after: int = fallback_after
+        self._raw_failures: int = 0
+        self._requests: Optional[List[Any]] = None
+        self._last_time_stamp: int = 0
+        self.duplicates: int = 0
+
+    def _build_requests(self) -> List[Any]:
+        """Return the cached ``ImageRequest`` list for the current mode."""
+        if self._requests is None:
+            self._requests = [
+                airsim.ImageRequest(
+                    self.camera_name,
+                    airsim.ImageType.Scene,
+                    False,
+                    not self.raw,
+                )
+            ]
+        return self._requests
+
+    def fetch(self) -> Any:
+        """Issue one ``simGetImages`` call and return the first response."""
+        return self.client.simGetImages(self._build_requests())[0]
+
+    async def fetch_async(self) -> Any:
+        """Like :meth:`fetch` for an ``airsim.AsyncMultirotorClient``."""
+        return (await self.client.simGetImages(self._build_requests()))[0]
+
+    @staticmethod
+    def is_empty(response: Any) -> bool:
+        """Return ``True`` if ``response`` carries no image data."""
+        return (
+            response.width == 0
+            or response.height == 0
+            or len(response.image_data_uint8) == 0
+        )
+
+    @staticmethod
+    def capture_time(response: Any) -> float:
+        """Return the simulator capture time of ``response`` in seconds.
+
+        ``0.0`` means the simulator did not stamp the image.
+        """
+        return int(getattr(response, "time_stamp", 0) or 0) / 1e9
+
+    def is_duplicate(self, response: Any) -> bool:
+        """Return ``True`` if ``response`` repeats the previous frame.
+
+        Frames are compared by their capture timestamp; unstamped responses
+        are never treated as duplicates.
+        """
+        stamp = int(getattr(response, "time_stamp", 0) or 0)
+        if not stamp:
+            return False
+        if stamp == self._last_time_stamp:
+            self.duplicates += 1
+            return True
+        self._last_time_stamp = stamp
+        return False
+
+    def _switch_to_compressed(self) -> None:
+        print("⚠️ Raw image data unusable — falling back to compressed PNG frames")
+        self.raw = False
+        self._requests = None
+
+    def decode(self, response: Any) -> Optional[np.ndarray]:
+        """Convert ``response`` into a BGR frame of ``frame_size``.
+
+        Returns ``None`` if the image could not be decoded. Raw frames that
+        need no resizing are returned as read-only views over the response
+        buffer; copy before drawing on them.
+        """
+        img = None
+        if self.raw and not getattr(response, "compress", False):
+            try:
+                img = response.as_array()
+            except ValueError:
+                img = None
+            if img is None or img.shape[2] not in (3, 4):
+                self._raw_failures += 1
+                if self._raw_failures >= self.fallback_after:
+                    self._switch_to_compressed()
+                return None
+            self._raw_failures = 0
+            # BGRA frames keep their buffer; the slice only hides alpha
+            img = img[:, :, :3]
+        else:
+            img1d = np.frombuffer(response.image_data_uint8, dtype=np.uint8)
+            img = cv2.imdecode(img1d, cv2.IMREAD_COLOR)
+            if img is None:
+                return None
+
+        if self.frame_size is not None:
+            h, w = img.shape[:2]
+            if (w, h) != tuple(self.frame_size):
+                img = cv2.resize(img, tuple(self.frame_size))
+        return img
+
+
+class DepthFetcher:
+    """Request float depth images from AirSim as ``HxW`` float32 arrays.
+
+    Depth is requested uncompressed with ``pixels_as_float`` so the reply
+    carries metric distances. Pair it with an ``airsim.ImageClient``, a
+    connection of its own whose replies are decoded by
+    ``FloatArrayUnpacker``: the depth values then arrive as a float32 array
+    instead of one Python float per pixel, and :meth:`decode` only reshapes
+    them. State and command replies stay on the regular client.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        camera_name: str = "oakd_camera",
+        image_type: Optional[int] = None,
+    ) -> None:
+        """Create a fetcher bound to ``client``.
+
+        Args:
+            client: AirSim client used for ``simGetImages`` calls.
+            camera_name: Camera to request depth from.
+            image_type: AirSim image type; defaults to
+                ``ImageType.DepthPerspective``.
+        """
+        self.client = client
+        self.camera_name: str = camera_name
+        self.image_type = image_type
+        self._requests: Optional[List[Any]] = None
+
+    def _build_requests(self) -> List[Any]:
+        """Return the cached depth ``ImageRequest`` list."""
+        if self._requests is None:
+            image_type = self.image_type
+            if image_type is None:
+                image_type = airsim.ImageType.DepthPerspective
+            self._requests = [
+                airsim.ImageRequest(self.camera_name, image_type, True, False)
+            ]
+        return self._requests
+
+    def fetch(self) -> Any:
+        """Issue one ``simGetImages`` call and return the first response."""
+        return self.client.simGetImages(self._build_requests())[0]
+
+    async def fetch_async(self) -> Any:
+        """Like :meth:`fetch` for an ``airsim.AsyncMultirotorClient``."""
+        return (await self.client.simGetImages(self._build_requests()))[0]
+
+    @staticmethod
+    def decode(response: Any) -> Optional[np.ndarray]:
+        """Return the depth image of ``response`` or ``None`` if it is empty
+        or does not match its reported size."""
+        if response.width == 0 or response.height == 0:
+            return None
+        try:
+            return airsim.get_pfm_array(response)
+        except ValueError:
+            return None
@@ -0,0 +1,259 @@
+# uav/async_driver.py
+"""Drive simulator I/O for the control loop from a single asyncio event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .acquisition import ImageFetcher
+from .decision import Command
+from .dispatcher import CommandDispatcher
+from .perception import perception_result
+from .spans import now_ns
+from .telemetry import TelemetryPoller, snapshot_from
+
+
+class LoopCommandDispatcher(CommandDispatcher):
+    """:class:`CommandDispatcher` that sends from an asyncio event loop.
+
+    Sending a command over an ``airsim.AsyncMultirotorClient`` only writes to
+    the socket, so instead of a dispatch thread :meth:`submit` schedules
+    :meth:`drain` on the loop the driver attached. Coalescing, skipping of
+    still-active velocities, ``flush`` and statistics behave exactly as in
+    the threaded dispatcher; submit-to-send latency ends once the request
+    is written, without awaiting the simulator's reply.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 200,
+    ) -> None:
+        super().__init__(lambda: self.executor, clock=clock, window=window)
+        self.executor: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop], executor: Any = None) -> None:
+        """Send future commands on ``loop`` through ``executor``.
+
+        Passing ``None`` detaches; later submissions wait until the next
+        :meth:`drain`.
+        """
+        self._loop = loop
+        if executor is not None:
+            self.executor = executor
+
+    def start(self) -> None:
+        """No thread to start; the driver attaches its loop."""
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Wait until the pending command has been sent."""
+        self.flush(timeout)
+
+    def is_alive(self) -> bool:
+        loop = self._loop
+        return loop is not None and loop.is_running()
+
+    def submit(self, command: Command) -> None:
+        super().submit(command)
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self.drain)
+            except RuntimeError:
+                # Loop already closed; nothing will send this command.
+                pass
+
+    def drain(self) -> None:
+        """Send the pending command, if any. Runs on the loop thread."""
+        try:
+            seq, (command, submitted_at) = self._slot.get_with_seq(timeout=0)
+        except queue.Empty:
+            return
+        self._handle(self.executor, seq, command, submitted_at)
+
+
+class AsyncDriver:
+    """Run image capture, telemetry polling and command dispatch concurrently.
+
+    All three share one ``airsim.AsyncMultirotorClient`` and one event loop
+    on one background thread, instead of a thread and RPC connection each.
+    Perception results go to ``output`` in the same tuple layout as the
+    threaded perception worker in ``main.py``; decode and tracking run in a
+    single worker thread so the loop keeps serving telemetry and commands
+    while OpenCV is busy.
+
+    :attr:`telemetry` and :attr:`commands` offer the
+    :class:`uav.telemetry.TelemetryPoller` and
+    :class:`uav.dispatcher.CommandDispatcher` interfaces to the control loop.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        executor_factory: Callable[[Any], Any],
+        tracker: Any,
+        output: Any,
+        stop_event: Any,
+        raw: bool = True,
+        telemetry_rate_hz: float = 50.0,
+        clock: Callable[[], float] = time.monotonic,
+        frame_size: Tuple[int, int] = (1280, 720),
+        poll_timeout: float = 0.05,
+    ) -> None:
+        """Configure the driver.
+
+        Args:
+            client_factory: Called on the loop thread to create the
+                ``airsim.AsyncMultirotorClient``.
+            executor_factory: Called with that client to build the object
+                whose ``execute(command)`` sends commands, normally a
+                :class:`uav.navigation.Navigator`.
+            tracker: :class:`uav.perception.OpticalFlowTracker` instance.
+            output: Mailbox (or ring) receiving the perception results.
+            stop_event: Event that stops the driver once set.
+            raw: Request uncompressed frames.
+            telemetry_rate_hz: Target telemetry polls per second.
+            clock: Simulator-timebase clock for command expiry.
+            frame_size: ``(width, height)`` of placeholder frames published
+                before the first image is decoded.
+            poll_timeout: Seconds between checks of ``stop_event``.
+        """
+        self.client_factory = client_factory
+        self.executor_factory = executor_factory
+        self.tracker = tracker
+        self.output = output
+        self.stop_event = stop_event
+        self.raw: bool = raw
+        self.poll_timeout: float = poll_timeout
+        self.telemetry = TelemetryPoller(lambda: None, rate_hz=telemetry_rate_hz)
+        self.commands = LoopCommandDispatcher(clock=clock)
+        self._cpu = ThreadPoolExecutor(max_workers=1, thread_name_prefix="perception")
+        self._thread: Optional[threading.Thread] = None
+        width, height = frame_size
+        self._last_vis_img = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def start(self) -> None:
+        """Start the event loop thread."""
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()), name="async-driver", daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the event loop thread to exit."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while the event loop thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    async def run(self) -> None:
+        """Connect and serve images, telemetry and commands until stopped."""
+        client = self.client_factory()
+        await client.connect()
+        loop = asyncio.get_running_loop()
+        fetcher = ImageFetcher(client, raw=self.raw)
+        self.commands.attach(loop, self.executor_factory(client))
+        loop.call_soon(self.commands.drain)
+        tasks = [
+            asyncio.ensure_future(self._image_loop(fetcher)),
+            asyncio.ensure_future(self._telemetry_loop(client)),
+        ]
+        try:
+            while not self.stop_event.is_set():
+                await asyncio.sleep(self.poll_timeout)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.commands.drain()
+            self.commands.attach(None)
+            self.telemetry.stop()
+            await client.close()
+            self._cpu.shutdown(wait=True)
+
+    async def _image_loop(self, fetcher: ImageFetcher) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            capture_ns = now_ns()
+            try:
+                response = await fetcher.fetch_async()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Image fetch error: {e}")
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            fetched_ns = now_ns()
+            if fetcher.is_empty(response):
+                self.output.put(perception_result(
+                    self._last_vis_img, (capture_ns, fetched_ns, fetched_ns, fetched_ns)
+                ))
+                continue
+            if fetcher.is_duplicate(response):
+                # Same render as last time; nothing new to decode or track
+                continue
+            data = await loop.run_in_executor(
+                self._cpu, self._process, fetcher, response, capture_ns, fetched_ns
+            )
+            if data is not None:
+                self.output.put(data)
+
+    def _process(
+        self, fetcher: ImageFetcher, response: Any, capture_ns: int, fetched_ns: int
+    ):
+        """Decode and track one frame; runs on the perception worker."""
+        capture_time = fetcher.capture_time(response)
+        t0 = now_ns()
+        img = fetcher.decode(response)
+        if img is None:
+            return None
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        vis_img = img.copy()
+        decoded_ns = now_ns()
+        decode_s = (decoded_ns - t0) * 1e-9
+        self._last_vis_img = vis_img
+        tracker = self.tracker
+        flow = None
+        if tracker.prev_gray is None:
+            tracker.initialize(gray, capture_time)
+        else:
+            flow = tracker.process_frame(gray, capture_time)
+        return perception_result(
+            vis_img,
+            (capture_ns, fetched_ns, decoded_ns, now_ns()),
+            capture_time,
+            flow,
+            tracker.preprocessor.step_timings(),
+            decode_s=decode_s,
+        )
+
+    async def _telemetry_loop(self, client: Any) -> None:
+        telemetry = self.telemetry
+        next_poll = time.monotonic()
+        while True:
+            t0 = time.monotonic()
+            state, collision = await asyncio.gather(
+                client.getMultirotorState(),
+                client.simGetCollisionInfo(),
+                return_exceptions=True,
+            )
+            telemetry.publish(snapshot_from(state, collision), time.monotonic() - t0)
+            next_poll += telemetry.period
+            delay = next_poll - time.monotonic()
+            if delay < 0:
+                # Same policy as the threaded poller: no catch-up bursts
+                telemetry.overruns += 1
+                next_poll = time.monotonic()
+            else:
+                await asyncio.sleep(delay)
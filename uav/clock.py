@@ -0,0 +1,186 @@
+# uav/clock.py
+"""Clock sources for navigation timers, tracking and loop scheduling.
+
+Timing logic reads time through a :class:`Clock` instead of calling
+:func:`time.time` directly, so the same code can follow the wall clock, the
+simulator's clock (which may run faster than real time) or a manually
+advanced clock in tests and replays.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Tuple
+
+
+class Clock(ABC):
+    """Interface shared by all clocks.
+
+    ``now`` is used for timestamps and timers, ``monotonic`` for loop
+    deadlines and ``sleep`` waits for a duration measured in this clock.
+    """
+
+    @abstractmethod
+    def now(self) -> float:
+        """Return the current time in seconds."""
+
+    def monotonic(self) -> float:
+        """Return a non-decreasing time in seconds."""
+        return self.now()
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        """Block for ``seconds`` of this clock's time."""
+
+    def observe(self, sim_timestamp_ns: int, wall_time: Optional[float] = None) -> None:
+        """Feed a simulator timestamp; ignored unless the clock follows it."""
+
+
+class WallClock(Clock):
+    """Real time from the :mod:`time` module."""
+
+    def now(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimClock(Clock):
+    """Simulator time, extrapolated between observed timestamps.
+
+    AirSim stamps every state with its own clock in nanoseconds. The clock
+    anchors on the latest stamp it was given (see :meth:`observe`) and
+    advances it by the elapsed wall time multiplied by ``clock_speed`` (the
+    ``ClockSpeed`` value from ``settings.json``), so reading the time never
+    costs an RPC.
+
+    Every observation re-anchors, so a simulator that runs slower than
+    ``clock_speed``, stalls or is paused pulls :meth:`now` back to its real
+    time instead of letting the extrapolation run ahead. :meth:`now` may
+    therefore step backwards; :meth:`monotonic` never does.
+    """
+
+    def __init__(self, client: Any = None, clock_speed: float = 1.0) -> None:
+        """Create a simulator clock.
+
+        Args:
+            client: Optional AirSim client used to fetch an initial
+                timestamp when none has been observed yet.
+            clock_speed: Simulated seconds per wall-clock second.
+        """
+        if clock_speed <= 0:
+            raise ValueError("clock_speed must be positive")
+        self.client = client
+        self.clock_speed: float = clock_speed
+        self._anchor: Optional[Tuple[float, float]] = None
+        self._last_monotonic: float = float("-inf")
+        self._lock = threading.Lock()
+
+    def observe(self, sim_timestamp_ns: int, wall_time: Optional[float] = None) -> None:
+        """Re-anchor the clock on a simulator timestamp in nanoseconds.
+
+        Args:
+            sim_timestamp_ns: Simulator timestamp of a state.
+            wall_time: ``time.time()`` when that state was read, e.g.
+                :attr:`uav.telemetry.TelemetrySnapshot.wall_time`. The
+                anchor is placed at that moment, so observing the same
+                cached snapshot again does not move the clock. Defaults to
+                now.
+        """
+        if not sim_timestamp_ns:
+            return
+        sim_s = sim_timestamp_ns / 1e9
+        anchor_wall = time.monotonic()
+        if wall_time is not None:
+            anchor_wall -= max(time.time() - wall_time, 0.0)
+        with self._lock:
+            self._anchor = (sim_s, anchor_wall)
+
+    def sync(self) -> None:
+        """Fetch the current simulator timestamp from ``client``."""
+        if self.client is None:
+            return
+        try:
+            state = self.client.getMultirotorState()
+        except Exception as e:
+            print(f"Sim clock sync error: {e}")
+            return
+        self.observe(int(getattr(state, "timestamp", 0)))
+
+    def _extrapolate(self, anchor: Tuple[float, float]) -> float:
+        sim_s, wall_s = anchor
+        return sim_s + (time.monotonic() - wall_s) * self.clock_speed
+
+    def now(self) -> float:
+        anchor = self._anchor
+        if anchor is None:
+            self.sync()
+            anchor = self._anchor
+            if anchor is None:
+                # No simulator time available yet; start from zero.
+                with self._lock:
+                    if self._anchor is None:
+                        self._anchor = (0.0, time.monotonic())
+                    anchor = self._anchor
+        return self._extrapolate(anchor)
+
+    def monotonic(self) -> float:
+        """Return :meth:`now`, clamped to never fall below a previous call."""
+        t = self.now()
+        with self._lock:
+            if t < self._last_monotonic:
+                return self._last_monotonic
+            self._last_monotonic = t
+        return t
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds / self.clock_speed)
+
+
+class ManualClock(Clock):
+    """Virtual clock that only moves when told to.
+
+    ``sleep`` advances the clock instantly, so loops driven by it run as
+    fast as the code allows and are fully deterministic.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now: float = start
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward by ``seconds``."""
+        if seconds > 0:
+            self._now += seconds
+
+    def set(self, t: float) -> None:
+        """Jump to ``t``; the clock never moves backwards."""
+        self._now = max(self._now, t)
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+
+def make_clock(mode: str = "wall", client: Any = None, clock_speed: float = 1.0) -> Clock:
+    """Build the clock selected on the command line.
+
+    Args:
+        mode: ``"wall"`` for real time or ``"sim"`` for simulator time.
+        client: AirSim client used by :class:`SimClock` for its first sync.
+        clock_speed: Simulator ``ClockSpeed`` setting.
+    """
+    if mode == "wall":
+        return WallClock()
+    if mode == "sim":
+        return SimClock(client, clock_speed=clock_speed)
+    raise ValueError(f"Unknown clock mode: {mode}")
@@ -0,0 +1,441 @@
+# uav/decision.py
+"""Pure, table-driven obstacle avoidance decisions.
+
+:func:`decide` maps one frame of flow measurements and the current
+:class:`NavState` to the commands to issue and the next state. It performs
+no RPCs and reads no clocks, so the same logic drives the live control loop
+(which executes the commands through :meth:`uav.navigation.Navigator.execute`)
+and offline replays of recorded flight logs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from .utils import FLOW_STD_MAX, should_flat_wall_dodge
+
+
+class DecisionInputs(NamedTuple):
+    """Per-frame measurements consumed by :func:`decide`.
+
+    Attributes:
+        smooth_L: Smoothed flow magnitude in the left third of the image.
+        smooth_C: Smoothed flow magnitude in the center third.
+        smooth_R: Smoothed flow magnitude in the right third.
+        center_mag: Unsmoothed center flow magnitude for this frame.
+        probe_mag: Flow magnitude in the upper center probe band.
+        probe_count: Number of tracked features in the probe band.
+        features: Total number of tracked features.
+        speed: Vehicle speed in m/s.
+        flow_std: Standard deviation of the flow magnitudes.
+        pos_x: Vehicle x position, used to detect repeated dodges.
+        pos_y: Vehicle y position.
+    """
+
+    smooth_L: float
+    smooth_C: float
+    smooth_R: float
+    center_mag: float
+    probe_mag: float
+    probe_count: int
+    features: int
+    speed: float
+    flow_std: float = 0.0
+    pos_x: float = 0.0
+    pos_y: float = 0.0
+
+
+@dataclass(frozen=True)
+class NavState:
+    """Navigation flags and timers carried between frames.
+
+    The fields mirror the flags :class:`uav.navigation.Navigator` keeps,
+    plus the short state and position history used to detect dodges that
+    make no progress. All times are in the same clock as ``now``.
+    """
+
+    braked: bool = False
+    dodging: bool = False
+    settling: bool = False
+    settle_end_time: float = 0.0
+    grace_period_end_time: float = 0.0
+    just_resumed: bool = False
+    resume_grace_end_time: float = 0.0
+    last_movement_time: float = 0.0
+    last_state: str = ""
+    state_history: Tuple[str, ...] = ()
+    pos_history: Tuple[Tuple[float, float], ...] = ()
+
+
+@dataclass(frozen=True)
+class DecisionParams:
+    """Tunable thresholds used by :func:`decide`."""
+
+    brake_base: float = 20.0
+    brake_per_speed: float = 10.0
+    dodge_base: float = 2.0
+    dodge_per_speed: float = 0.5
+    severe_brake_factor: float = 1.5
+    min_features: int = 5
+    min_probe_features: int = 5
+    flow_std_max: float = FLOW_STD_MAX
+    grace_s: float = 1.5
+    settle_s: float = 0.1
+    resume_grace_s: float = 0.75
+    history_len: int = 3
+    repeat_dodge_duration: float = 3.0
+
+
+DEFAULT_PARAMS = DecisionParams()
+
+
+class Command(NamedTuple):
+    """A motion command to execute through the navigator.
+
+    Attributes:
+        action: Name of the :class:`~uav.navigation.Navigator` method.
+        duration: Command duration for ``dodge`` (``None`` for the default).
+        flows: ``(left, center, right)`` flow passed to ``dodge``.
+    """
+
+    action: str
+    duration: Optional[float] = None
+    flows: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+
+class Decision(NamedTuple):
+    """Outcome of one :func:`decide` call.
+
+    Attributes:
+        state: State label shown in the GUI and written to the log.
+        commands: Commands to execute, in order.
+        brake_thres: Speed-adapted brake threshold (``0.0`` if unused).
+        dodge_thres: Speed-adapted dodge threshold (``0.0`` if unused).
+        side_safe: Whether one side had clearly less flow than the other.
+        obstacle: ``1`` when the frame triggered a brake or dodge.
+        messages: Status messages for the console.
+    """
+
+    state: str
+    commands: Tuple[Command, ...] = ()
+    brake_thres: float = 0.0
+    dodge_thres: float = 0.0
+    side_safe: bool = False
+    obstacle: int = 0
+    messages: Tuple[str, ...] = ()
+
+
+# State label logged for each navigator action
+ACTION_LABELS = {
+    "brake": "brake",
+    "resume_forward": "resume",
+    "blind_forward": "blind_forward",
+    "nudge": "nudge",
+    "reinforce": "resume_reinforce",
+    "timeout_recover": "timeout_nudge",
+}
+
+
+def dodge_direction(smooth_L: float, smooth_C: float, smooth_R: float) -> str:
+    """Return ``"left"`` or ``"right"``, preferring the side with less flow."""
+    left_safe = smooth_L < 0.8 * smooth_C
+    right_safe = smooth_R < 0.8 * smooth_C
+    if left_safe and not right_safe:
+        return "left"
+    if right_safe and not left_safe:
+        return "right"
+    return "left" if smooth_L <= smooth_R else "right"
+
+
+class _Frame(NamedTuple):
+    """Inputs and derived quantities the rule predicates look at."""
+
+    inputs: DecisionInputs
+    state: NavState
+    now: float
+    params: DecisionParams
+    brake_thres: float
+    dodge_thres: float
+    center_high: bool
+    side_safe: bool
+
+
+class Rule(NamedTuple):
+    """One row of a decision table.
+
+    The first rule whose ``when`` predicate holds wins. A rule without an
+    ``action`` still stops the scan but issues no command.
+    """
+
+    name: str
+    when: Callable[[_Frame], bool]
+    action: Optional[str]
+    sets_grace: bool = False
+    message: Optional[str] = None
+
+
+def _flat_wall(f: _Frame) -> bool:
+    return f.inputs.probe_mag < 0.5 and f.inputs.center_mag > 0.7
+
+
+# Obstacle reactions, evaluated only outside the post-manoeuvre grace period
+# (except the severe brake, which always applies).
+OBSTACLE_RULES: Tuple[Rule, ...] = (
+    Rule(
+        "severe_brake",
+        lambda f: f.inputs.smooth_C > f.brake_thres * f.params.severe_brake_factor,
+        "brake",
+        sets_grace=True,
+    ),
+    Rule(
+        "grace_period",
+        lambda f: f.now < f.state.grace_period_end_time,
+        None,
+    ),
+    Rule(
+        "brake",
+        lambda f: f.inputs.smooth_C > f.brake_thres,
+        "brake",
+        sets_grace=True,
+    ),
+    Rule(
+        "dodge",
+        lambda f: f.center_high and f.side_safe,
+        "dodge",
+        sets_grace=True,
+    ),
+    Rule(
+        "flat_wall_dodge",
+        lambda f: _flat_wall(f) and should_flat_wall_dodge(
+            f.inputs.center_mag,
+            f.inputs.probe_mag,
+            f.inputs.probe_count,
+            f.params.min_probe_features,
+            f.inputs.flow_std,
+            f.params.flow_std_max,
+        ),
+        "dodge",
+        sets_grace=True,
+        message="🟥 Flat wall detected — attempting fallback dodge",
+    ),
+    Rule(
+        "flat_wall_unreliable",
+        _flat_wall,
+        None,
+        message="🔬 Insufficient probe features — ignoring fallback",
+    ),
+)
+
+# Recovery and maintenance moves, tried when no obstacle rule fired.
+RECOVERY_RULES: Tuple[Rule, ...] = (
+    Rule(
+        "dodge_ended",
+        lambda f: (
+            f.state.dodging
+            and f.inputs.smooth_C < f.dodge_thres * 0.9
+            and f.now >= f.state.grace_period_end_time
+            and not f.state.settling
+        ),
+        "resume_forward",
+        message="🔄 Dodge ended — resuming forward",
+    ),
+    Rule(
+        "brake_released",
+        lambda f: (
+            f.state.braked
+            and f.inputs.smooth_C < f.brake_thres * 0.8
+            and f.inputs.smooth_L < f.brake_thres * 0.8
+            and f.inputs.smooth_R < f.brake_thres * 0.8
+            and f.now >= f.state.grace_period_end_time
+        ),
+        "resume_forward",
+        message="🟢 Brake released — resuming forward",
+    ),
+    Rule(
+        "reinforce",
+        lambda f: (
+            not f.state.braked
+            and not f.state.dodging
+            and f.now - f.state.last_movement_time > 2
+        ),
+        "reinforce",
+    ),
+    Rule(
+        "stalled",
+        lambda f: (
+            (f.state.braked or f.state.dodging)
+            and f.inputs.speed < 0.2
+            and f.inputs.smooth_C < 5
+            and f.inputs.smooth_L < 5
+            and f.inputs.smooth_R < 5
+        ),
+        "nudge",
+    ),
+    Rule(
+        "timeout",
+        lambda f: f.now - f.state.last_movement_time > 4,
+        "timeout_recover",
+    ),
+)
+
+
+def _match(rules: Tuple[Rule, ...], frame: _Frame) -> Optional[Rule]:
+    for rule in rules:
+        if rule.when(frame):
+            return rule
+    return None
+
+
+def _transition(
+    state: NavState, action: str, now: float, params: DecisionParams
+) -> NavState:
+    """Return the flags the navigator ends up with after ``action``."""
+    if action == "brake":
+        return replace(state, braked=True)
+    if action == "dodge":
+        return replace(
+            state,
+            braked=False,
+            dodging=True,
+            settling=True,
+            settle_end_time=now + params.settle_s,
+            last_movement_time=now,
+        )
+    if action == "resume_forward":
+        return replace(
+            state,
+            braked=False,
+            dodging=False,
+            just_resumed=True,
+            resume_grace_end_time=now + params.resume_grace_s,
+            last_movement_time=now,
+        )
+    return replace(state, last_movement_time=now)
+
+
+def decide(
+    inputs: DecisionInputs,
+    nav_state: NavState,
+    now: float,
+    params: DecisionParams = DEFAULT_PARAMS,
+) -> Tuple[Decision, NavState]:
+    """Choose the navigation commands for one frame.
+
+    Args:
+        inputs: Flow measurements and vehicle speed for this frame.
+        nav_state: State returned by the previous call.
+        now: Current time in the clock used for all state timers.
+        params: Thresholds to evaluate with.
+
+    Returns:
+        ``(decision, new_state)``. While the post-resume grace period is
+        active ``decision.state`` is ``"resume_grace"`` and no commands are
+        issued.
+    """
+    state = nav_state
+    messages = []
+
+    if state.settling and now >= state.settle_end_time:
+        messages.append("✅ Settle period over — resuming evaluation")
+        state = replace(state, settling=False)
+
+    if state.just_resumed:
+        if now < state.resume_grace_end_time:
+            state = replace(state, last_state="resume_grace")
+            return Decision("resume_grace", messages=tuple(messages)), state
+        state = replace(state, just_resumed=False)
+
+    L, C, R = inputs.smooth_L, inputs.smooth_C, inputs.smooth_R
+    commands = []
+    brake_thres = dodge_thres = 0.0
+    side_safe = False
+    label = "none"
+
+    if inputs.features < params.min_features:
+        if L > 1.5 and R > 1.5 and C < 0.2:
+            action = "brake"
+        else:
+            action = "blind_forward"
+        commands.append(Command(action))
+        state = _transition(state, action, now, params)
+        label = ACTION_LABELS[action]
+    else:
+        brake_thres = params.brake_base + params.brake_per_speed * inputs.speed
+        dodge_thres = params.dodge_base + params.dodge_per_speed * inputs.speed
+        side_safe = abs(L - R) > 0.3 * C and (L < 100 or R < 100)
+        frame = _Frame(
+            inputs=inputs,
+            state=state,
+            now=now,
+            params=params,
+            brake_thres=brake_thres,
+            dodge_thres=dodge_thres,
+            center_high=C > dodge_thres or C > 2 * min(L, R),
+            side_safe=side_safe,
+        )
+        rule = _match(OBSTACLE_RULES, frame)
+        if rule is None or rule.action is None:
+            if rule is not None and rule.message:
+                messages.append(rule.message)
+            rule = _match(RECOVERY_RULES, frame)
+        if rule is not None and rule.action is not None:
+            if rule.message:
+                messages.append(rule.message)
+            if rule.action == "dodge":
+                commands.append(Command("dodge", flows=(L, C, R)))
+                label = f"dodge_{dodge_direction(L, C, R)}"
+            else:
+                commands.append(Command(rule.action))
+                label = ACTION_LABELS[rule.action]
+            state = _transition(state, rule.action, now, params)
+            if rule.sets_grace:
+                state = replace(state, grace_period_end_time=now + params.grace_s)
+
+    # Keep reporting an ongoing dodge until its grace period runs out
+    if (
+        label == "none"
+        and state.dodging
+        and now < state.grace_period_end_time
+        and state.last_state.startswith("dodge")
+    ):
+        label = state.last_state
+    obstacle = int("dodge" in label or label == "brake")
+
+    # Extend a dodge that keeps repeating without making progress
+    n = params.history_len
+    history = (state.state_history + (label,))[-n:]
+    positions = (state.pos_history + ((inputs.pos_x, inputs.pos_y),))[-n:]
+    if (
+        len(history) == n
+        and label.startswith("dodge")
+        and all(s == label for s in history)
+        and abs(positions[-1][0] - positions[0][0]) < 0.5
+        and abs(positions[-1][1] - positions[0][1]) < 1.0
+    ):
+        messages.append("♻️ Repeated dodges detected — extending dodge")
+        commands.append(
+            Command("dodge", duration=params.repeat_dodge_duration, flows=(L, C, R))
+        )
+        state = _transition(state, "dodge", now, params)
+        label = f"dodge_{dodge_direction(L, C, R)}"
+        history = history[:-1] + (label,)
+
+    state = replace(
+        state,
+        last_state=label,
+        state_history=history,
+        pos_history=positions,
+    )
+    return (
+        Decision(
+            state=label,
+            commands=tuple(commands),
+            brake_thres=brake_thres,
+            dodge_thres=dodge_thres,
+            side_safe=side_safe,
+            obstacle=obstacle,
+            messages=tuple(messages),
+        ),
+        state,
+    )
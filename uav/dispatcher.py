@@ -0,0 +1,175 @@
+# uav/dispatcher.py
+"""Background dispatch of navigation commands off the control loop."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from .decision import Command
+from .mailbox import LatestMailbox
+from .navigation import velocity_signature
+
+
+class CommandDispatcher:
+    """Execute navigator commands on a dedicated thread.
+
+    The control loop calls :meth:`submit`, which never waits on the
+    simulator. Commands go through a single-slot :class:`LatestMailbox`, so a
+    command that has not been sent yet is replaced by a newer one (a brake
+    decided this tick supersedes the reinforce queued last tick). A command
+    whose velocity matches the one most recently sent is skipped only while
+    that one would outlast it; a command that extends the active velocity
+    (a ``reinforce`` renewing ``resume_forward`` before it expires) is always
+    sent. Submit-to-send latency, from :meth:`submit`
+    until ``execute`` has issued the RPCs (not until the simulator completes
+    the command), is tracked per action.
+    """
+
+    def __init__(
+        self,
+        executor_factory: Callable[[], Any],
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 200,
+        poll_timeout: float = 0.1,
+    ) -> None:
+        """Configure the dispatcher.
+
+        Args:
+            executor_factory: Called inside the dispatch thread to create the
+                object whose ``execute(command)`` issues the RPCs, normally a
+                :class:`uav.navigation.Navigator` with its own client.
+            clock: Time source in the simulator's timebase, used to decide
+                whether a previous velocity command is still active.
+            window: Number of recent send latencies kept per action.
+            poll_timeout: Seconds the thread waits for work before
+                re-checking for shutdown.
+        """
+        self.executor_factory = executor_factory
+        self.clock = clock
+        self.poll_timeout: float = poll_timeout
+        self.window: int = window
+        self.submitted: int = 0
+        self.executed: int = 0
+        self.skipped: int = 0
+        self.errors: int = 0
+        self._slot = LatestMailbox()
+        self._send_latencies: Dict[str, Deque[float]] = {}
+        self._active: Optional[Tuple[Tuple, float]] = None
+        self._stop = threading.Event()
+        self._done = threading.Condition()
+        self._submitted_seq: int = 0
+        self._handled_seq: int = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the dispatch thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="command-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Send any pending command, then stop the thread."""
+        self.flush(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while the dispatch thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, command: Command) -> None:
+        """Queue ``command``, replacing any command not yet sent."""
+        self.submitted += 1
+        seq = self._slot.put((command, time.perf_counter()))
+        with self._done:
+            self._submitted_seq = max(self._submitted_seq, seq)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the pending command has been handled.
+
+        Returns:
+            ``False`` if the timeout expired first.
+        """
+        with self._done:
+            return self._done.wait_for(
+                lambda: self._handled_seq >= self._submitted_seq, timeout
+            )
+
+    def forget_active(self) -> None:
+        """Treat the vehicle as idle, e.g. after a simulator reset."""
+        self._active = None
+
+    def _run(self) -> None:
+        executor = self.executor_factory()
+        while not self._stop.is_set():
+            try:
+                seq, (command, submitted_at) = self._slot.get_with_seq(
+                    timeout=self.poll_timeout
+                )
+            except queue.Empty:
+                continue
+            self._handle(executor, seq, command, submitted_at)
+
+    def _handle(self, executor: Any, seq: int, command: Command, submitted_at: float) -> None:
+        try:
+            self._dispatch(executor, command, submitted_at)
+        finally:
+            with self._done:
+                self._handled_seq = seq
+                self._done.notify_all()
+
+    def _dispatch(self, executor: Any, command: Command, submitted_at: float) -> None:
+        signature = velocity_signature(command)
+        now = self.clock()
+        active = self._active
+        # Skip true duplicates only: resending is needed as soon as the new
+        # command would run past the one in effect
+        if active is not None and active[0] == signature and active[1] - now >= signature[-1]:
+            self.skipped += 1
+            return
+        try:
+            executor.execute(command)
+        except Exception as e:
+            self.errors += 1
+            print(f"Command dispatch error ({command.action}): {e}")
+            return
+        send_latency = time.perf_counter() - submitted_at
+        self._active = (signature, now + signature[-1])
+        self.executed += 1
+        self._send_latencies.setdefault(
+            command.action, deque(maxlen=self.window)
+        ).append(send_latency)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return dispatch counters and per-action submit-to-send
+        latency percentiles (ms)."""
+        send_latency: Dict[str, Dict[str, float]] = {}
+        for action, values in list(self._send_latencies.items()):
+            samples = np.asarray(list(values), dtype=float) * 1000.0
+            if not samples.size:
+                continue
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            send_latency[action] = {
+                "count": int(samples.size),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(samples.max()),
+            }
+        return {
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "coalesced": self._slot.overwritten,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "send_latency": send_latency,
+        }
@@ -0,0 +1,291 @@
+# uav/flight_log.py
+"""Per-frame flight logs in CSV or binary columnar form.
+
+Both writers take one row per control tick as a tuple in :data:`COLUMNS`
+order. :class:`CsvFlightLog` formats the ``full_log_*.csv`` layout the
+analysis scripts read. :class:`BinaryFlightLog` appends fixed-dtype NumPy
+records to a memory-mapped file instead, keeping full float precision and
+doing no string formatting in the control loop; :func:`binary_log_to_csv`
+turns such a file back into the CSV layout.
+
+Binary file layout (little endian):
+
+* 24-byte prefix: magic ``b"UAVFLOG\\0"``, ``uint32`` schema version,
+  ``uint32`` header size, ``uint64`` record count.
+* JSON metadata padded to the header size: schema version, record dtype
+  (``fields``) and the ``states`` table the ``state`` codes index.
+* ``count`` records of the record dtype. The count is written on
+  :meth:`BinaryFlightLog.flush`, so a crashed run loses at most the rows
+  appended since the last flush.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .spans import STAMPS
+
+SCHEMA_VERSION = 2
+MAGIC = b"UAVFLOG\0"
+_PREFIX = struct.Struct("<8sIIQ")
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = 16
+_HEADER_ALIGN = 64
+
+# (name, binary dtype, CSV format) for every logged column, in CSV order
+COLUMNS: Tuple[Tuple[str, str, str], ...] = (
+    ("frame", "<u4", "d"),
+    ("time", "<f8", ".2f"),
+    ("features", "<u4", "d"),
+    ("flow_left", "<f8", ".3f"),
+    ("flow_center", "<f8", ".3f"),
+    ("flow_right", "<f8", ".3f"),
+    ("flow_std", "<f8", ".3f"),
+    ("pos_x", "<f8", ".2f"),
+    ("pos_y", "<f8", ".2f"),
+    ("pos_z", "<f8", ".2f"),
+    ("yaw", "<f8", ".2f"),
+    ("speed", "<f8", ".2f"),
+    ("state", "<i1", "s"),
+    ("collided", "u1", "d"),
+    ("obstacle", "u1", "d"),
+    ("side_safe", "u1", "d"),
+    ("brake_thres", "<f8", ".2f"),
+    ("dodge_thres", "<f8", ".2f"),
+    ("probe_req", "<f8", ".2f"),
+    ("fps", "<f8", ".2f"),
+    ("simgetimage_s", "<f8", ".3f"),
+    ("decode_s", "<f8", ".3f"),
+    ("processing_s", "<f8", ".3f"),
+    ("loop_s", "<f8", ".3f"),
+    ("overrun_s", "<f8", ".3f"),
+    ("jitter_s", "<f8", ".4f"),
+    ("capture_time", "<f8", ".3f"),
+) + tuple(
+    # perf_counter_ns stamps, appended in schema version 2
+    (name, "<i8", "d") for name in STAMPS
+)
+COLUMN_NAMES: Tuple[str, ...] = tuple(name for name, _, _ in COLUMNS)
+RECORD_DTYPE = np.dtype([(name, dtype) for name, dtype, _ in COLUMNS])
+CSV_HEADER = ",".join(COLUMN_NAMES) + "\n"
+CSV_LINE = ",".join("{:%s}" % fmt for _, _, fmt in COLUMNS) + "\n"
+STATE_INDEX = COLUMN_NAMES.index("state")
+
+# State labels produced by uav.decision.decide; codes are indices
+STATES: Tuple[str, ...] = (
+    "none",
+    "brake",
+    "resume",
+    "blind_forward",
+    "nudge",
+    "resume_reinforce",
+    "timeout_nudge",
+    "dodge_left",
+    "dodge_right",
+    "resume_grace",
+)
+STATE_CODES: Dict[str, int] = {label: code for code, label in enumerate(STATES)}
+UNKNOWN_STATE = -1
+
+
+class CsvFlightLog:
+    """Buffer formatted CSV lines and write them on :meth:`flush`."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "w")
+        self._file.write(CSV_HEADER)
+        self._lines: List[str] = []
+
+    def append(self, row: Sequence[Any]) -> None:
+        """Queue one row given in :data:`COLUMNS` order."""
+        self._lines.append(CSV_LINE.format(*row))
+
+    def flush(self) -> None:
+        """Write queued lines to the file."""
+        if self._lines:
+            self._file.writelines(self._lines)
+            self._lines.clear()
+
+    def sync(self) -> None:
+        """Flush and force the file to disk."""
+        self.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Flush and close the file; further calls are no-ops."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+class BinaryFlightLog:
+    """Append rows as :data:`RECORD_DTYPE` records to a memory-mapped file.
+
+    The mapping starts with room for ``capacity`` records and doubles when
+    full. :meth:`close` trims the file to the records written.
+    """
+
+    def __init__(self, path: str, capacity: int = 4096) -> None:
+        self.path = path
+        self.count = 0
+        meta = json.dumps(
+            {
+                "version": SCHEMA_VERSION,
+                "fields": RECORD_DTYPE.descr,
+                "states": list(STATES),
+            }
+        ).encode()
+        size = _PREFIX.size + len(meta) + 1
+        self._header_size = -(-size // _HEADER_ALIGN) * _HEADER_ALIGN
+        self._file = open(path, "w+b")
+        self._file.write(
+            _PREFIX.pack(MAGIC, SCHEMA_VERSION, self._header_size, 0)
+            + meta.ljust(self._header_size - _PREFIX.size - 1)
+            + b"\n"
+        )
+        self._records: Optional[np.memmap] = None
+        self._capacity = 0
+        self._map(max(int(capacity), 1))
+
+    def _map(self, capacity: int) -> None:
+        """Resize the file to hold ``capacity`` records and map them."""
+        self._records = None
+        self._file.truncate(self._header_size + capacity * RECORD_DTYPE.itemsize)
+        self._records = np.memmap(
+            self._file, RECORD_DTYPE, "r+", self._header_size, (capacity,)
+        )
+        self._capacity = capacity
+
+    def append(self, row: Sequence[Any]) -> None:
+        """Store one row given in :data:`COLUMNS` order.
+
+        ``state`` is given as its label and stored as its code in
+        :data:`STATES`; unknown labels are stored as ``UNKNOWN_STATE``.
+        """
+        if self.count == self._capacity:
+            self._map(2 * self._capacity)
+        row = list(row)
+        row[STATE_INDEX] = STATE_CODES.get(row[STATE_INDEX], UNKNOWN_STATE)
+        self._records[self.count] = tuple(row)
+        self.count += 1
+
+    def flush(self) -> None:
+        """Record the row count in the header.
+
+        Mapped records are already in the page cache, where readers see them
+        and the OS writes them back; :meth:`sync` forces them to disk.
+        """
+        self._file.seek(_COUNT_OFFSET)
+        self._file.write(_COUNT.pack(self.count))
+        self._file.flush()
+
+    def sync(self) -> None:
+        """Flush and force records and header to disk."""
+        self.flush()
+        self._records.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Flush, unmap and trim the file; further calls are no-ops."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._records = None
+        self._file.truncate(self._header_size + self.count * RECORD_DTYPE.itemsize)
+        self._file.close()
+
+
+def open_flight_log(stem: str, log_format: str = "binary"):
+    """Create the writer for ``log_format`` at ``stem`` plus its extension.
+
+    Args:
+        stem: Path without extension, e.g. ``flow_logs/full_log_<ts>``.
+        log_format: ``"binary"`` (``.bin``) or ``"csv"`` (``.csv``).
+    """
+    if log_format == "binary":
+        return BinaryFlightLog(stem + ".bin")
+    if log_format == "csv":
+        return CsvFlightLog(stem + ".csv")
+    raise ValueError(f"Unknown log format: {log_format}")
+
+
+def close_flight_log(log: Any) -> str:
+    """Close ``log`` and return the path of its CSV form.
+
+    Binary logs are converted with :func:`binary_log_to_csv`; a failed
+    conversion is reported and leaves the ``.bin`` file in place.
+    """
+    log.close()
+    if not isinstance(log, BinaryFlightLog):
+        return log.path
+    try:
+        return binary_log_to_csv(log.path)
+    except Exception as e:
+        print(f"⚠️ Could not convert {log.path} to CSV: {e}")
+        return log.path
+
+
+def read_binary_log(path: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Load a binary flight log.
+
+    Returns:
+        ``(meta, records)`` where ``meta`` is the header metadata and
+        ``records`` a structured array using the dtype stored in the file,
+        so logs written with older schema versions still load.
+
+    Raises:
+        ValueError: If ``path`` is not a binary flight log.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size or prefix[:8] != MAGIC:
+            raise ValueError(f"{path} is not a binary flight log")
+        _, version, header_size, count = _PREFIX.unpack(prefix)
+        meta = json.loads(f.read(header_size - _PREFIX.size))
+        dtype = np.dtype([tuple(field) for field in meta["fields"]])
+        available = (os.fstat(f.fileno()).st_size - header_size) // dtype.itemsize
+        f.seek(header_size)
+        records = np.fromfile(f, dtype, min(count, available))
+    meta["version"] = version
+    return meta, records
+
+
+def binary_log_to_csv(path: str, output: Optional[str] = None) -> str:
+    """Convert a binary flight log to the ``full_log_*.csv`` layout.
+
+    Floats are written at full precision and ``state`` codes as their
+    labels.
+
+    Args:
+        path: Binary log to read.
+        output: CSV path to write; defaults to ``path`` with a ``.csv``
+            extension.
+
+    Returns:
+        The path of the written CSV file.
+    """
+    meta, records = read_binary_log(path)
+    if output is None:
+        output = os.path.splitext(path)[0] + ".csv"
+    names = records.dtype.names
+    states = meta["states"]
+    state_index = names.index("state") if "state" in names else None
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(names)
+        for row in records.tolist():
+            if state_index is not None:
+                row = list(row)
+                code = row[state_index]
+                row[state_index] = states[code] if 0 <= code < len(states) else "unknown"
+            writer.writerow(row)
+    return output
@@ -19,16 +19,31 @@ def launch_control_gui(param_refs):
         c_val.set(f"{param_refs['C'][0]:.2f}")
         r_val.set(f"{param_refs['R'][0]:.2f}")
         state_val.set(param_refs['state'][0])
+        poller = param_refs.get('telemetry', [None])[0]
+        snapshot = poller.latest() if poller is not None else None
+        if snapshot is not None:
+            telemetry_val.set(
+                f"{snapshot.speed:.2f} m/s ({1000 * poller.age():.0f} ms old)"
+            )
+        stats = param_refs.get('stats', [None])[0]
+        if stats is not None and "fps" in stats and "loop_s" in stats:
+            fps = stats["fps"].quantile(0.5)
+            loop_p95, loop_p99 = stats["loop_s"].quantiles((0.95, 0.99))
+            loop_val.set(
+                f"{fps:.1f} fps, p95 {1000 * loop_p95:.0f} / p99 {1000 * loop_p99:.0f} ms"
+            )
         root.after(200, update_labels)
 
     root = tk.Tk()
     root.title("UAV Controller")
-    root.geometry("300x250")
+    root.geometry("300x350")
 
     l_val = tk.StringVar()
     c_val = tk.StringVar()
     r_val = tk.StringVar()
     state_val = tk.StringVar()
+    telemetry_val = tk.StringVar(value="n/a")
+    loop_val = tk.StringVar(value="n/a")
 
     tk.Button(
         root,
@@ -60,6 +75,12 @@ def launch_control_gui(param_refs):
     tk.Label(root, text="Current State:").pack(pady=(10, 0))
     tk.Label(root, textvariable=state_val).pack()
 
+    tk.Label(root, text="Speed:").pack(pady=(10, 0))
+    tk.Label(root, textvariable=telemetry_val).pack()
+
+    tk.Label(root, text="Loop:").pack(pady=(10, 0))
+    tk.Label(root, textvariable=loop_val).pack()
+
     update_labels()
     root.mainloop()
 
@@ -0,0 +1,253 @@
+# uav/log_sink.py
+"""Background writer for per-frame flight log records."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from .flight_log import close_flight_log, open_flight_log
+from .spans import ThreadSpans, now_ns
+
+FSYNC_POLICIES = ("never", "interval", "always")
+
+
+class _Control:
+    """Request queued behind the records it must follow."""
+
+    __slots__ = ("action", "stem", "done")
+
+    def __init__(self, action: str, stem: Optional[str] = None) -> None:
+        self.action = action
+        self.stem = stem
+        self.done = threading.Event()
+
+
+class LogSink:
+    """Write flight log records from a dedicated thread.
+
+    The control loop calls :meth:`put` with a raw record tuple, which costs
+    one ``deque.append``; there is no lock and no wake-up. The sink thread
+    drains the queue every ``poll_interval`` seconds and does the
+    formatting, writing, fsync and log rotation. When ``capacity`` records
+    are already waiting, new ones are dropped and counted instead of
+    blocking the loop.
+
+    Rotation (:meth:`rotate`) and :meth:`flush` are queued behind the
+    records put before them, so a reset never splits a frame across logs.
+    """
+
+    def __init__(
+        self,
+        stem: str,
+        log_format: str = "binary",
+        capacity: int = 4096,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        poll_interval: float = 0.02,
+        retain: Optional[Callable[[str], None]] = None,
+        open_log: Callable[[str, str], Any] = open_flight_log,
+        close_log: Callable[[Any], Any] = close_flight_log,
+        spans: Optional[ThreadSpans] = None,
+    ) -> None:
+        """Open the first log at ``stem``.
+
+        Args:
+            stem: Log path without extension.
+            log_format: Format passed to ``open_log``.
+            capacity: Maximum records waiting to be written.
+            fsync: ``"never"`` leaves write-back to the OS, ``"interval"``
+                forces the log to disk every ``fsync_interval`` seconds and
+                ``"always"`` after every drained batch.
+            fsync_interval: Seconds between syncs with ``"interval"``.
+            poll_interval: Seconds the thread sleeps between drains.
+            retain: Called with each newly opened log path, e.g. to prune
+                old logs with :func:`uav.utils.retain_recent_logs`.
+            open_log: Creates a writer from ``(stem, log_format)``.
+            close_log: Closes a writer, e.g. converting it to CSV.
+            spans: Receives ``"log"`` track spans for each written batch,
+                sync and close, e.g. for ``analysis/chrome_trace.py``.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.log_format = log_format
+        self.capacity: int = capacity
+        self.fsync: str = fsync
+        self.fsync_interval: float = fsync_interval
+        self.poll_interval: float = poll_interval
+        self.retain = retain
+        self.open_log = open_log
+        self.close_log = close_log
+        self.spans = spans
+        self.queued: int = 0
+        self.dropped: int = 0
+        self.written: int = 0
+        self.syncs: int = 0
+        self.errors: int = 0
+        self.rotations: int = 0
+        self.closed_paths: List[str] = []
+        self._queue: Deque[Any] = deque()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._last_sync = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._log = self._open(stem)
+
+    @property
+    def path(self) -> str:
+        """Path of the log currently written."""
+        return self._log.path
+
+    def _open(self, stem: str) -> Any:
+        log = self.open_log(stem, self.log_format)
+        if self.retain is not None:
+            try:
+                self.retain(log.path)
+            except Exception as e:
+                print(f"⚠️ Log retention failed: {e}")
+        return log
+
+    def start(self) -> None:
+        """Start the sink thread."""
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while the sink thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def put(self, record: Sequence[Any]) -> bool:
+        """Queue ``record`` for writing; return ``False`` if it was dropped."""
+        if len(self._queue) >= self.capacity:
+            self.dropped += 1
+            return False
+        self._queue.append(record)
+        self.queued += 1
+        return True
+
+    def _request(self, action: str, stem: Optional[str], timeout: Optional[float]) -> bool:
+        control = _Control(action, stem)
+        self._queue.append(control)
+        self._wake.set()
+        if not self.is_alive():
+            self._drain()
+        return control.done.wait(timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write and sync everything queued so far.
+
+        Returns:
+            ``True`` if the sink caught up within ``timeout`` seconds.
+        """
+        return self._request("flush", None, timeout)
+
+    def rotate(self, stem: str, timeout: Optional[float] = None) -> bool:
+        """Finish the current log after the queued records and open ``stem``.
+
+        Returns:
+            ``True`` if the rotation completed within ``timeout`` seconds.
+        """
+        return self._request("rotate", stem, timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write the remaining records, close the log and stop the thread."""
+        self._request("stop", None, timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        wrote = False
+        start = now_ns()
+        while True:
+            try:
+                item = self._queue.popleft()
+            except IndexError:
+                break
+            if isinstance(item, _Control):
+                # flush, rotate and stop sync the log themselves
+                if wrote and self.spans is not None:
+                    self.spans.record("log", "write", start)
+                wrote = False
+                self._control(item)
+                start = now_ns()
+                continue
+            if self._stopped:
+                self.dropped += 1
+                continue
+            try:
+                self._log.append(item)
+                self.written += 1
+                wrote = True
+            except Exception as e:
+                self._error("write", e)
+        if wrote and self.spans is not None:
+            self.spans.record("log", "write", start)
+        if wrote:
+            self._sync(force=self.fsync == "always")
+
+    def _control(self, control: _Control) -> None:
+        if not self._stopped:
+            if control.action == "flush":
+                self._sync(force=self.fsync != "never")
+            else:
+                self._finish()
+                if control.action == "rotate":
+                    try:
+                        self._log = self._open(control.stem)
+                        self.rotations += 1
+                    except Exception as e:
+                        self._error("rotate", e)
+                        self._stopped = True
+                else:
+                    self._stopped = True
+        control.done.set()
+
+    def _finish(self) -> None:
+        try:
+            self._sync(force=self.fsync != "never")
+            start = now_ns()
+            self.closed_paths.append(self.close_log(self._log))
+            if self.spans is not None:
+                self.spans.record("log", "close", start)
+        except Exception as e:
+            self._error("close", e)
+
+    def _sync(self, force: bool) -> None:
+        try:
+            self._log.flush()
+            now = time.monotonic()
+            due = self.fsync == "interval" and now - self._last_sync >= self.fsync_interval
+            if force or due:
+                start = now_ns()
+                self._log.sync()
+                if self.spans is not None:
+                    self.spans.record("log", "sync", start)
+                self._last_sync = now
+                self.syncs += 1
+        except Exception as e:
+            self._error("sync", e)
+
+    def _error(self, what: str, exc: Exception) -> None:
+        self.errors += 1
+        if self.errors == 1:
+            print(f"⚠️ Log sink {what} error: {exc}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return record counters and the current queue depth."""
+        return {
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": len(self._queue),
+            "syncs": self.syncs,
+            "errors": self.errors,
+            "rotations": self.rotations,
+        }
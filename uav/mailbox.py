@@ -0,0 +1,97 @@
+# uav/mailbox.py
+"""Single-slot, latest-wins mailboxes for handing frames between workers."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+class LatestMailbox:
+    """Thread mailbox holding only the most recent item.
+
+    ``put`` never blocks: a newer item overwrites one that has not been read
+    yet. Readers block on a condition variable until an item with a sequence
+    number they have not seen arrives. Every item is tagged with a
+    monotonically increasing sequence number so consumers can tell how many
+    frames they skipped.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._item: Any = None
+        self._seq: int = 0
+        self._read_seq: int = 0
+        self._closed: bool = False
+        self.puts: int = 0
+        self.gets: int = 0
+        self.overwritten: int = 0
+        self.dropped: int = 0
+
+    def put(self, item: Any) -> int:
+        """Publish ``item`` and return its sequence number.
+
+        Items put after :meth:`close` are counted as dropped and ``0`` is
+        returned.
+        """
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return 0
+            if self._seq > self._read_seq:
+                self.overwritten += 1
+            self._seq += 1
+            self._item = item
+            self.puts += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def get_with_seq(self, timeout: Optional[float] = None) -> Tuple[int, Any]:
+        """Wait for an unread item and return ``(seq, item)``.
+
+        Raises:
+            queue.Empty: If nothing new arrives within ``timeout`` seconds or
+                the mailbox is closed while empty.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._seq > self._read_seq or self._closed,
+                timeout,
+            ) or self._seq <= self._read_seq:
+                raise queue.Empty
+            self._read_seq = self._seq
+            item, self._item = self._item, None
+            self.gets += 1
+            return self._seq, item
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Wait for an unread item and return it (see :meth:`get_with_seq`)."""
+        return self.get_with_seq(timeout)[1]
+
+    def depth(self) -> int:
+        """Return ``1`` if an unread item is waiting, else ``0``."""
+        with self._cond:
+            return int(self._seq > self._read_seq)
+
+    def close(self) -> None:
+        """Reject further puts and wake all waiting readers."""
+        with self._cond:
+            if self._seq > self._read_seq:
+                self.dropped += 1
+                self._item = None
+                self._read_seq = self._seq
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the mailbox counters."""
+        with self._cond:
+            return {
+                "seq": self._seq,
+                "puts": self.puts,
+                "gets": self.gets,
+                "overwritten": self.overwritten,
+                "dropped": self.dropped,
+            }
+
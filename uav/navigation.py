@@ -1,18 +1,58 @@
 # uav/navigation.py
 """Navigation utilities for issuing motion commands to an AirSim drone."""
-import time
 import math
+from typing import Optional, Tuple
+
 import airsim
 
+from .clock import Clock, WallClock
+from .decision import Command, dodge_direction
+
+
+# Final velocity command each action leaves active, as
+# ``(frame, vx, vy, vz, duration)``. Must match the RPCs issued below.
+VELOCITY_COMMANDS = {
+    "brake": ("world", 0.0, 0.0, 0.0, 1.0),
+    "resume_forward": ("forward", 2.0, 0.0, 0.0, 3.0),
+    "blind_forward": ("forward", 2.0, 0.0, 0.0, 2.0),
+    "nudge": ("world", 0.5, 0.0, 0.0, 1.0),
+    "reinforce": ("forward", 2.0, 0.0, 0.0, 3.0),
+    "timeout_recover": ("world", 0.5, 0.0, 0.0, 1.0),
+}
+
+
+def velocity_signature(command: Command) -> Tuple[str, float, float, float, float]:
+    """Return the velocity command ``command`` leaves active on the vehicle.
+
+    Two commands with the same signature move the drone identically, which
+    lets :class:`uav.dispatcher.CommandDispatcher` skip resending one while
+    the other is still in effect.
+    """
+    if command.action == "dodge":
+        smooth_L, smooth_C, smooth_R = command.flows
+        direction = dodge_direction(smooth_L, smooth_C, smooth_R)
+        lateral = 1.0 if direction == "right" else -1.0
+        strength = 0.5 if max(smooth_L, smooth_R) > 100 else 1.0
+        duration = 2.0 if command.duration is None else command.duration
+        return ("body", 0.0, lateral * strength, 0.0, float(duration))
+    return VELOCITY_COMMANDS[command.action]
+
 
 class Navigator:
     """Issue high level movement commands and track state."""
-    def __init__(self, client):
+    def __init__(self, client, clock: Optional[Clock] = None):
+        """Create a navigator issuing commands through ``client``.
+
+        Args:
+            client: AirSim ``MultirotorClient``.
+            clock: Time source for movement timers (default: wall clock).
+        """
         self.client = client
+        self.clock = clock if clock is not None else WallClock()
         self.braked = False
         self.dodging = False
         self.settling = False
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.clock.now()
         self.grace_period_end_time = 0
         self.settle_end_time = 0
         self.just_resumed = False
@@ -41,18 +81,12 @@ class Navigator:
             f"C: {smooth_C:.1f}, R: {smooth_R:.1f}"
         )
 
+        direction = dodge_direction(smooth_L, smooth_C, smooth_R)
         left_safe = smooth_L < 0.8 * smooth_C
         right_safe = smooth_R < 0.8 * smooth_C
-
-        if left_safe and not right_safe:
-            direction = "left"
-        elif right_safe and not left_safe:
-            direction = "right"
-        elif left_safe and right_safe:
-            direction = "left" if smooth_L <= smooth_R else "right"
+        if left_safe and right_safe:
             print(f"⚠️ Both sides okay — picking {direction}")
-        else:
-            direction = "left" if smooth_L <= smooth_R else "right"
+        elif not left_safe and not right_safe:
             print(f"⚠️ No safe sides — forcing {direction}")
 
         lateral = 1.0 if direction == "right" else -1.0
@@ -78,8 +112,8 @@ class Navigator:
         self.dodging = True
         self.braked = False
         self.settling = True
-        self.settle_end_time = time.time() + 0.1
-        self.last_movement_time = time.time()
+        self.settle_end_time = self.clock.now() + 0.1
+        self.last_movement_time = self.clock.now()
         return f"dodge_{direction}"
 
     def resume_forward(self):
@@ -91,8 +125,8 @@ class Navigator:
         self.braked = False
         self.dodging = False
         self.just_resumed = True
-        self.resume_grace_end_time = time.time() + 0.75  # 0.75 second grace
-        self.last_movement_time = time.time()
+        self.resume_grace_end_time = self.clock.now() + 0.75  # 0.75 second grace
+        self.last_movement_time = self.clock.now()
         return "resume"
 
     def blind_forward(self):
@@ -106,14 +140,14 @@ class Navigator:
             drivetrain=airsim.DrivetrainType.ForwardOnly,
             yaw_mode=airsim.YawMode(False, 0),
         )
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.clock.now()
         return "blind_forward"
 
     def nudge(self):
         """Gently push the drone forward when stalled."""
         print("⚠️ Low flow + zero velocity — nudging forward")
         self.client.moveByVelocityAsync(0.5, 0, 0, 1)
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.clock.now()
         return "nudge"
 
     def reinforce(self):
@@ -127,12 +161,20 @@ class Navigator:
             drivetrain=airsim.DrivetrainType.ForwardOnly,
             yaw_mode=airsim.YawMode(False, 0),
         )
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.clock.now()
         return "resume_reinforce"
 
     def timeout_recover(self):
         """Move slowly forward after a command timeout."""
         print("⏳ Timeout — forcing recovery motion")
         self.client.moveByVelocityAsync(0.5, 0, 0, 1)
-        self.last_movement_time = time.time()
+        self.last_movement_time = self.clock.now()
         return "timeout_nudge"
+
+    def execute(self, command: Command) -> str:
+        """Issue a :class:`uav.decision.Command` and return its state label."""
+        if command.action == "dodge":
+            if command.duration is None:
+                return self.dodge(*command.flows)
+            return self.dodge(*command.flows, duration=command.duration)
+        return getattr(self, command.action)()
@@ -3,14 +3,95 @@
 
 from __future__ import annotations
 
-import time
 from collections import deque
-from typing import Deque, Dict, Optional, Tuple
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
 
 import cv2
 import numpy as np
 
-from .utils import apply_clahe
+from .clock import Clock, WallClock
+from .preprocessing import NO_TIMINGS, FramePreprocessor
+from .spans import NO_STAMPS
+
+
+class PerceptionResult(NamedTuple):
+    """One frame handed from perception to the control loop.
+
+    Attributes:
+        vis_img: BGR frame to draw on and record.
+        points: Tracked feature locations in frame coordinates.
+        vectors: Motion vectors of ``points`` between frames.
+        flow_std: Standard deviation of the flow magnitudes.
+        simgetimage_s: Seconds spent in ``simGetImages``.
+        decode_s: Seconds spent decoding the image.
+        processing_s: Seconds spent tracking features.
+        capture_time: Simulator capture time in seconds (0.0 if unknown).
+        stamps: ``perf_counter_ns`` values of
+            :data:`uav.spans.PERCEPTION_STAMPS`.
+        preprocess_s: Seconds per :data:`uav.preprocessing.STEPS` step.
+    """
+
+    vis_img: np.ndarray
+    points: np.ndarray
+    vectors: np.ndarray
+    flow_std: float
+    simgetimage_s: float
+    decode_s: float
+    processing_s: float
+    capture_time: float
+    stamps: Tuple[int, ...] = NO_STAMPS
+    preprocess_s: Tuple[float, ...] = NO_TIMINGS
+
+
+def perception_result(
+    vis_img: np.ndarray,
+    stamps: Tuple[int, int, int, int],
+    capture_time: float = 0.0,
+    flow: Optional[Tuple[np.ndarray, np.ndarray, float]] = None,
+    preprocess_s: Tuple[float, ...] = NO_TIMINGS,
+    decode_s: Optional[float] = None,
+    processing_s: Optional[float] = None,
+) -> PerceptionResult:
+    """Build the :class:`PerceptionResult` of one frame.
+
+    Stage durations default to the differences between consecutive stamps.
+
+    Args:
+        vis_img: BGR frame to hand over.
+        stamps: ``(capture_ns, fetched_ns, decoded_ns, processed_ns)``.
+        capture_time: Simulator capture time in seconds.
+        flow: ``(points, vectors, flow_std)`` from
+            :meth:`OpticalFlowTracker.process_frame`, or ``None`` when no
+            flow was computed (empty response or first frame).
+        preprocess_s: The tracker preprocessor's ``step_timings()``.
+        decode_s: Decode time, when it was not measured between
+            ``fetched_ns`` and ``decoded_ns`` (e.g. a staged pipeline that
+            queues frames between the two).
+        processing_s: Tracking time, likewise for ``decoded_ns`` and
+            ``processed_ns``.
+    """
+    capture_ns, fetched_ns, decoded_ns, processed_ns = stamps
+    if decode_s is None:
+        decode_s = (decoded_ns - fetched_ns) * 1e-9
+    if flow is None:
+        points, vectors, flow_std = np.array([]), np.array([]), 0.0
+        processing_s = 0.0
+    else:
+        points, vectors, flow_std = flow
+        if processing_s is None:
+            processing_s = (processed_ns - decoded_ns) * 1e-9
+    return PerceptionResult(
+        vis_img,
+        points,
+        vectors,
+        flow_std,
+        (fetched_ns - capture_ns) * 1e-9,
+        decode_s,
+        processing_s,
+        capture_time,
+        tuple(stamps),
+        tuple(preprocess_s),
+    )
 
 
 class FlowHistory:
@@ -52,54 +133,183 @@ class FlowHistory:
 class OpticalFlowTracker:
     """Track sparse optical flow features between frames."""
 
-    def __init__(self, lk_params: Dict, feature_params: Dict) -> None:
+    def __init__(
+        self,
+        lk_params: Dict,
+        feature_params: Dict,
+        keep_tracks: bool = False,
+        min_tracks: Optional[int] = None,
+        track_mask_radius: Optional[int] = None,
+        preprocessor: Optional[FramePreprocessor] = None,
+        clock: Optional[Clock] = None,
+    ) -> None:
         """Initialize tracker with Lucas-Kanade and feature parameters.
 
         Args:
             lk_params: Parameters for ``cv2.calcOpticalFlowPyrLK``.
             feature_params: Parameters for ``cv2.goodFeaturesToTrack``.
+            keep_tracks: Carry surviving points forward between frames
+                instead of re-detecting corners on every call.
+            min_tracks: Live track count below which new corners are
+                detected. Defaults to half of ``maxCorners``.
+            track_mask_radius: Radius in pixels masked around existing
+                tracks when replenishing. Defaults to ``minDistance``.
+            preprocessor: Pipeline applied to every incoming frame. Defaults
+                to CLAHE-only enhancement at full resolution. Returned points
+                and vectors are always mapped back to frame coordinates.
+            clock: Time source used to convert displacements into flow
+                magnitudes per second. Defaults to the wall clock.
         """
         self.lk_params: Dict = lk_params
         self.feature_params: Dict = feature_params
+        self.preprocessor: FramePreprocessor = (
+            preprocessor if preprocessor is not None else FramePreprocessor()
+        )
+        self.keep_tracks: bool = keep_tracks
+        max_corners = int(feature_params.get("maxCorners", 100))
+        self.min_tracks: int = (
+            min_tracks if min_tracks is not None else max(max_corners // 2, 1)
+        )
+        self.track_mask_radius: int = (
+            track_mask_radius
+            if track_mask_radius is not None
+            else int(feature_params.get("minDistance", 5))
+        )
         self.prev_gray: Optional[np.ndarray] = None
         self.prev_pts: Optional[np.ndarray] = None
-        self.prev_time: float = time.time()
+        self.clock: Clock = clock if clock is not None else WallClock()
+        self.prev_time: float = self.clock.now()
+        # Simulator capture time of ``prev_gray`` in seconds (0.0 if unknown)
+        self.prev_capture_time: float = 0.0
+        # Per-point track bookkeeping, aligned with ``prev_pts``
+        self.track_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.track_ages: np.ndarray = np.empty(0, dtype=np.int32)
+        # IDs and ages of the points returned by the last ``process_frame``
+        self.last_track_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.last_track_ages: np.ndarray = np.empty(0, dtype=np.int32)
+        self._next_track_id: int = 0
 
-    def initialize(self, gray_frame: np.ndarray) -> None:
+    def initialize(
+        self, gray_frame: np.ndarray, capture_time: Optional[float] = None
+    ) -> None:
         """Start tracking using the provided grayscale frame.
 
         Args:
             gray_frame: Grayscale image used to seed the tracker.
+            capture_time: Simulator capture time of the frame in seconds.
+        """
+        self._seed(self.preprocessor.process(gray_frame), capture_time)
+
+    def _stamp(self, capture_time: Optional[float]) -> float:
+        """Record the time of the current frame and return the elapsed dt.
+
+        The capture timestamps are used when both this frame and the
+        previous one carry one; otherwise the tracker's clock is used.
+        """
+        now = self.clock.now()
+        if capture_time and self.prev_capture_time:
+            dt = capture_time - self.prev_capture_time
+        else:
+            dt = now - self.prev_time
+        self.prev_time = now
+        self.prev_capture_time = capture_time or 0.0
+        return max(dt, 1e-6)  # avoid div by zero
+
+    def _seed(
+        self, gray_eq: np.ndarray, capture_time: Optional[float] = None
+    ) -> None:
+        """Detect initial corners on an already preprocessed frame.
+
+        Args:
+            gray_eq: Output of :attr:`preprocessor` for the current frame.
+            capture_time: Simulator capture time of the frame in seconds.
         """
-        gray_eq = apply_clahe(gray_frame)
         self.prev_gray = gray_eq
         self.prev_pts = cv2.goodFeaturesToTrack(
             gray_eq,
             mask=None,
             **self.feature_params,
         )
-        self.prev_time = time.time()
+        self._reset_tracks()
+        self._stamp(capture_time)
+
+    def _reset_tracks(self) -> None:
+        """Assign fresh track IDs to every point in ``prev_pts``."""
+        count = 0 if self.prev_pts is None else len(self.prev_pts)
+        self.track_ids = np.arange(
+            self._next_track_id, self._next_track_id + count, dtype=np.int64
+        )
+        self.track_ages = np.zeros(count, dtype=np.int32)
+        self._next_track_id += count
+
+    def _replenish(self, gray_eq: np.ndarray) -> None:
+        """Detect new corners away from live tracks until the floor is met.
+
+        Args:
+            gray_eq: Contrast-enhanced frame the live tracks refer to.
+        """
+        live = 0 if self.prev_pts is None else len(self.prev_pts)
+        max_corners = int(self.feature_params.get("maxCorners", 100))
+        if live >= self.min_tracks or live >= max_corners:
+            return
+
+        mask = np.full(gray_eq.shape[:2], 255, dtype=np.uint8)
+        if live:
+            for x, y in self.prev_pts.reshape(-1, 2):
+                cv2.circle(
+                    mask, (int(x), int(y)), self.track_mask_radius, 0, -1
+                )
+
+        params = dict(self.feature_params)
+        params["maxCorners"] = max_corners - live
+        new_pts = cv2.goodFeaturesToTrack(gray_eq, mask=mask, **params)
+        if new_pts is None or len(new_pts) == 0:
+            return
+
+        new_pts = new_pts.reshape(-1, 1, 2).astype(np.float32)
+        count = len(new_pts)
+        if live:
+            self.prev_pts = np.concatenate([self.prev_pts, new_pts])
+        else:
+            self.prev_pts = new_pts
+        self.track_ids = np.concatenate([
+            self.track_ids,
+            np.arange(
+                self._next_track_id,
+                self._next_track_id + count,
+                dtype=np.int64,
+            ),
+        ])
+        self.track_ages = np.concatenate(
+            [self.track_ages, np.zeros(count, dtype=np.int32)]
+        )
+        self._next_track_id += count
 
     def process_frame(
         self,
         gray: np.ndarray,
-        _unused_start_time: float,
-    ) -> Tuple[np.ndarray, np.ndarray, float]:  # ignore external time
+        capture_time: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, float]:
         """Track features in ``gray`` and return motion information.
 
+        Flow magnitudes are in pixels per second of capture time, so
+        scheduling jitter in the calling thread does not distort them.
+
         Args:
             gray: The next grayscale frame in which to track the features.
-            _unused_start_time: Timestamp supplied by callers and ignored.
+            capture_time: Simulator capture time of ``gray`` in seconds
+                (``ImageResponse.time_stamp``). ``None`` or ``0`` falls back
+                to the tracker's clock.
 
         Returns:
             A tuple ``(points, vectors, std)`` where ``points`` are the source
             feature locations, ``vectors`` are the motion vectors between
             frames and ``std`` is the standard deviation of their magnitudes.
         """
-        gray_eq = apply_clahe(gray)
+        gray_eq = self.preprocessor.process(gray)
 
         if self.prev_gray is None or self.prev_pts is None:
-            self.initialize(gray)
+            self._seed(gray_eq, capture_time)
             return np.array([]), np.array([]), 0.0
 
         next_pts, status, err = cv2.calcOpticalFlowPyrLK(
@@ -111,27 +321,46 @@ class OpticalFlowTracker:
         )
 
         if next_pts is None or status is None:
-            self.initialize(gray)
+            self._seed(gray_eq, capture_time)
             return np.array([]), np.array([]), 0.0
 
-        good_old = self.prev_pts[status.flatten() == 1]
-        good_new = next_pts[status.flatten() == 1]
+        good = status.flatten() == 1
+        good_old = self.prev_pts[good]
+        good_new = next_pts[good]
+        self.last_track_ids = self.track_ids[good]
+        self.last_track_ages = self.track_ages[good] + 1
 
-        current_time = time.time()
-        dt = max(current_time - self.prev_time, 1e-6)  # avoid div by zero
-        self.prev_time = current_time
+        dt = self._stamp(capture_time)
 
         self.prev_gray = gray_eq
-        self.prev_pts = cv2.goodFeaturesToTrack(
-            gray_eq,
-            mask=None,
-            **self.feature_params,
-        )
+        if self.keep_tracks:
+            # Carry surviving points that are still inside the frame forward
+            h, w = gray_eq.shape[:2]
+            pts = good_new.reshape(-1, 2)
+            inside = (
+                (pts[:, 0] >= 0) & (pts[:, 0] < w)
+                & (pts[:, 1] >= 0) & (pts[:, 1] < h)
+            )
+            self.prev_pts = good_new[inside].reshape(-1, 1, 2)
+            self.track_ids = self.last_track_ids[inside]
+            self.track_ages = self.last_track_ages[inside]
+            self._replenish(gray_eq)
+            if len(self.prev_pts) == 0:
+                # Nothing left to follow; reseed on the next frame
+                self.prev_pts = None
+        else:
+            self.prev_pts = cv2.goodFeaturesToTrack(
+                gray_eq,
+                mask=None,
+                **self.feature_params,
+            )
+            self._reset_tracks()
 
         if len(good_old) == 0:
             return np.array([]), np.array([]), 0.0
 
-        flow_vectors = good_new - good_old
+        flow_vectors = self.preprocessor.to_frame_vectors(good_new - good_old)
+        good_old = self.preprocessor.to_frame_points(good_old)
         magnitudes = np.linalg.norm(flow_vectors, axis=1) / dt  # pixels/sec
         flow_std = np.std(magnitudes)
 
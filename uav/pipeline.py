@@ -0,0 +1,246 @@
+# uav/pipeline.py
+"""Staged perception pipeline overlapping image fetch, decode and tracking."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .mailbox import LatestMailbox
+from .perception import perception_result
+from .spans import now_ns
+
+
+class StageMetrics:
+    """Throughput and utilisation counters for one pipeline stage."""
+
+    def __init__(self, name: str, window: int = 50) -> None:
+        """Create empty counters.
+
+        Args:
+            name: Stage name used in reports.
+            window: Number of recent completions used for the FPS estimate.
+        """
+        self.name: str = name
+        self.frames: int = 0
+        self.busy_s: float = 0.0
+        self.depth_samples: int = 0
+        self.depth_total: int = 0
+        self.started: float = time.perf_counter()
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, busy_s: float) -> None:
+        """Register one completed item that took ``busy_s`` seconds."""
+        with self._lock:
+            self.frames += 1
+            self.busy_s += busy_s
+            self._recent.append(time.perf_counter())
+
+    def sample_depth(self, depth: int) -> None:
+        """Record how many items were waiting in the stage's input buffer."""
+        with self._lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+
+    def fps(self) -> float:
+        """Return the recent completion rate in items per second."""
+        with self._lock:
+            if len(self._recent) < 2:
+                return 0.0
+            span = self._recent[-1] - self._recent[0]
+            return (len(self._recent) - 1) / span if span > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the counters as a plain dictionary."""
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        fps = self.fps()
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "fps": fps,
+                "busy_s": self.busy_s,
+                "utilisation": self.busy_s / elapsed,
+                "avg_input_depth": (
+                    self.depth_total / self.depth_samples
+                    if self.depth_samples
+                    else 0.0
+                ),
+            }
+
+
+class StagedPerceptionPipeline:
+    """Run image fetch, decode and tracking as three connected threads.
+
+    Stages hand work to each other through :class:`LatestMailbox` buffers, so
+    a slow stage makes upstream results overwrite each other rather than
+    queue up, and the tracker always works on the newest decoded frame.
+    Because ``simGetImages`` waits on the socket and OpenCV releases the GIL,
+    the next fetch overlaps the current decode and track.
+
+    Results are published to ``output`` in the same tuple layout as the
+    single-threaded perception worker in ``main.py``.
+    """
+
+    def __init__(
+        self,
+        fetcher_factory: Callable[[], Any],
+        tracker: Any,
+        output: Any,
+        stop_event: Any,
+        frame_size=(1280, 720),
+        poll_timeout: float = 0.1,
+    ) -> None:
+        """Configure the pipeline.
+
+        Args:
+            fetcher_factory: Called inside the fetch thread to create an
+                :class:`uav.acquisition.ImageFetcher` with its own RPC client.
+            tracker: :class:`uav.perception.OpticalFlowTracker` instance.
+            output: Mailbox (or ring) receiving the perception results.
+            stop_event: Event that terminates all stages once set.
+            frame_size: ``(width, height)`` of placeholder frames published
+                before the first image is decoded.
+            poll_timeout: Seconds a stage waits for input before re-checking
+                ``stop_event``.
+        """
+        self.fetcher_factory = fetcher_factory
+        self.tracker = tracker
+        self.output = output
+        self.stop_event = stop_event
+        self.poll_timeout: float = poll_timeout
+        self.fetched = LatestMailbox()
+        self.decoded = LatestMailbox()
+        self.metrics: Dict[str, StageMetrics] = {
+            name: StageMetrics(name) for name in ("fetch", "decode", "track")
+        }
+        self._fetcher: Optional[Any] = None
+        self._fetcher_ready = threading.Event()
+        self._threads: List[threading.Thread] = []
+        width, height = frame_size
+        self._last_vis_img = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def start(self) -> None:
+        """Start the three stage threads."""
+        for name, target in (
+            ("fetch", self._fetch_stage),
+            ("decode", self._decode_stage),
+            ("track", self._track_stage),
+        ):
+            thread = threading.Thread(
+                target=target, name=f"perception-{name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for all stage threads to exit."""
+        for thread in self._threads:
+            thread.join(timeout)
+        self.fetched.close()
+        self.decoded.close()
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while any stage thread is running."""
+        return any(t.is_alive() for t in self._threads)
+
+    def _fetch_stage(self) -> None:
+        self._fetcher = self.fetcher_factory()
+        self._fetcher_ready.set()
+        metrics = self.metrics["fetch"]
+        while not self.stop_event.is_set():
+            capture_ns = now_ns()
+            response = self._fetcher.fetch()
+            fetched_ns = now_ns()
+            fetch_s = (fetched_ns - capture_ns) * 1e-9
+            metrics.record(fetch_s)
+            if not self._fetcher.is_empty(response) and self._fetcher.is_duplicate(response):
+                # Same render as last time; nothing new to decode or track
+                continue
+            self.fetched.put((response, fetch_s, capture_ns, fetched_ns))
+
+    def _decode_stage(self) -> None:
+        metrics = self.metrics["decode"]
+        while not self._fetcher_ready.wait(self.poll_timeout):
+            if self.stop_event.is_set():
+                return
+        fetcher = self._fetcher
+        while not self.stop_event.is_set():
+            metrics.sample_depth(self.fetched.depth())
+            try:
+                response, fetch_s, capture_ns, fetched_ns = self.fetched.get(
+                    timeout=self.poll_timeout
+                )
+            except queue.Empty:
+                continue
+            if fetcher.is_empty(response):
+                self.output.put(perception_result(
+                    self._last_vis_img, (capture_ns, fetched_ns, fetched_ns, fetched_ns)
+                ))
+                continue
+            capture_time = fetcher.capture_time(response)
+            t0 = now_ns()
+            img = fetcher.decode(response)
+            if img is None:
+                continue
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            vis_img = img.copy()
+            decoded_ns = now_ns()
+            decode_s = (decoded_ns - t0) * 1e-9
+            metrics.record(decode_s)
+            self._last_vis_img = vis_img
+            self.decoded.put((
+                vis_img, gray, fetch_s, decode_s, capture_time,
+                (capture_ns, fetched_ns, decoded_ns),
+            ))
+
+    def _track_stage(self) -> None:
+        metrics = self.metrics["track"]
+        tracker = self.tracker
+        while not self.stop_event.is_set():
+            metrics.sample_depth(self.decoded.depth())
+            try:
+                vis_img, gray, fetch_s, decode_s, capture_time, stamps = self.decoded.get(
+                    timeout=self.poll_timeout
+                )
+            except queue.Empty:
+                continue
+            if tracker.prev_gray is None:
+                tracker.initialize(gray, capture_time)
+                self.output.put(perception_result(
+                    vis_img, stamps + (now_ns(),), capture_time,
+                    preprocess_s=tracker.preprocessor.step_timings(),
+                    decode_s=decode_s,
+                ))
+                continue
+            t0 = now_ns()
+            flow = tracker.process_frame(gray, capture_time)
+            processed_ns = now_ns()
+            processing_s = (processed_ns - t0) * 1e-9
+            metrics.record(processing_s)
+            self.output.put(perception_result(
+                vis_img, stamps + (processed_ns,), capture_time, flow,
+                tracker.preprocessor.step_timings(),
+                decode_s=decode_s,
+                processing_s=processing_s,
+            ))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-stage throughput, utilisation and buffer statistics.
+
+        ``queue_depth`` and ``overwritten`` describe the buffer a stage writes
+        into; ``avg_input_depth`` is the fraction of reads that found an item
+        already waiting (close to 1 means the stage is the bottleneck).
+        """
+        report = {name: m.snapshot() for name, m in self.metrics.items()}
+        for name, box in (("fetch", self.fetched), ("decode", self.decoded)):
+            box_stats = box.stats()
+            report[name]["queue_depth"] = box.depth()
+            report[name]["overwritten"] = box_stats["overwritten"]
+        return report
@@ -0,0 +1,190 @@
+# uav/preprocessing.py
+"""Frame preprocessing pipeline applied before optical flow tracking."""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Named step selections. ``roi`` is ``(x, y, width, height)`` in frame
+# pixels, ``size`` is the ``(width, height)`` the (cropped) frame is resized
+# to and ``clahe`` toggles contrast enhancement on the resulting image.
+PROFILES: Dict[str, Dict] = {
+    "full": dict(clahe=True),
+    "raw": dict(clahe=False),
+    "half": dict(size=(640, 360), clahe=True),
+    "quarter": dict(size=(320, 180), clahe=True),
+}
+
+# Timed steps in :meth:`FramePreprocessor.step_timings` order
+STEPS: Tuple[str, ...] = ("roi", "resize", "clahe", "total")
+NO_TIMINGS: Tuple[float, ...] = (0.0,) * len(STEPS)
+
+
+class FramePreprocessor:
+    """Crop, downscale and contrast-enhance grayscale frames.
+
+    A single ``cv2.CLAHE`` instance is created up front and every step writes
+    into preallocated buffers keyed by resolution. ``buffer_count`` output
+    buffers are rotated per resolution so callers may hold on to the previous
+    result (the tracker keeps it as ``prev_gray``) while the next frame is
+    processed.
+    """
+
+    def __init__(
+        self,
+        clahe: bool = True,
+        clip_limit: float = 2.0,
+        tile_grid_size: Tuple[int, int] = (8, 8),
+        size: Optional[Tuple[int, int]] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        buffer_count: int = 2,
+    ) -> None:
+        """Configure which steps run and their parameters.
+
+        Args:
+            clahe: Apply CLAHE contrast enhancement as the final step.
+            clip_limit: CLAHE contrast limit.
+            tile_grid_size: CLAHE tile grid ``(cols, rows)``.
+            size: Optional ``(width, height)`` to downscale frames to.
+            roi: Optional ``(x, y, width, height)`` crop applied first.
+            buffer_count: Output buffers rotated per resolution.
+        """
+        self.clahe_enabled: bool = clahe
+        self.size: Optional[Tuple[int, int]] = size
+        self.roi: Optional[Tuple[int, int, int, int]] = roi
+        self.buffer_count: int = max(int(buffer_count), 1)
+        self._clahe = (
+            cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+            if clahe
+            else None
+        )
+        self._buffers: Dict[Tuple, List[np.ndarray]] = {}
+        self._next_buffer: Dict[Tuple, int] = {}
+        self.timings: Dict[str, float] = {}
+        # Mapping from processed to frame coordinates, pixel centres aligned:
+        # frame = (p + 0.5) / scale - 0.5 + offset
+        self.scale: Tuple[float, float] = (1.0, 1.0)
+        self.offset: Tuple[float, float] = (0.0, 0.0)
+
+    @classmethod
+    def from_profile(cls, name: str, **overrides) -> "FramePreprocessor":
+        """Create a preprocessor from one of the named :data:`PROFILES`.
+
+        Args:
+            name: Key in :data:`PROFILES`.
+            **overrides: Constructor arguments replacing profile values.
+        """
+        if name not in PROFILES:
+            raise ValueError(
+                f"Unknown preprocessing profile '{name}'. "
+                f"Choose from: {', '.join(sorted(PROFILES))}"
+            )
+        params = dict(PROFILES[name])
+        params.update(overrides)
+        return cls(**params)
+
+    def _buffer(self, step: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Return the next reusable ``uint8`` buffer for ``step`` and ``shape``."""
+        key = (step, shape)
+        buffers = self._buffers.get(key)
+        if buffers is None:
+            buffers = [
+                np.empty(shape, dtype=np.uint8)
+                for _ in range(self.buffer_count)
+            ]
+            self._buffers[key] = buffers
+            self._next_buffer[key] = 0
+        idx = self._next_buffer[key]
+        self._next_buffer[key] = (idx + 1) % len(buffers)
+        return buffers[idx]
+
+    def process(self, gray: np.ndarray) -> np.ndarray:
+        """Run the configured steps on ``gray`` and return the result.
+
+        The returned array is one of the internal buffers and is overwritten
+        ``buffer_count`` calls later for the same resolution.
+
+        Args:
+            gray: Single channel ``uint8`` frame.
+        """
+        timings: Dict[str, float] = {}
+        t_start = time.perf_counter()
+        img = gray
+        frame_h, frame_w = gray.shape[:2]
+        off_x = off_y = 0.0
+
+        if self.roi is not None:
+            t0 = time.perf_counter()
+            x, y, w, h = self.roi
+            x0, y0 = max(int(x), 0), max(int(y), 0)
+            x1, y1 = min(x0 + int(w), frame_w), min(y0 + int(h), frame_h)
+            img = img[y0:y1, x0:x1]
+            off_x, off_y = float(x0), float(y0)
+            timings["roi"] = time.perf_counter() - t0
+
+        src_h, src_w = img.shape[:2]
+        if self.size is not None and (src_w, src_h) != tuple(self.size):
+            t0 = time.perf_counter()
+            out_w, out_h = int(self.size[0]), int(self.size[1])
+            dst = self._buffer("resize", (out_h, out_w))
+            img = cv2.resize(img, (out_w, out_h), dst=dst,
+                             interpolation=cv2.INTER_AREA)
+            timings["resize"] = time.perf_counter() - t0
+
+        if self._clahe is not None:
+            t0 = time.perf_counter()
+            if not img.flags["C_CONTIGUOUS"]:
+                # CLAHE needs a contiguous ROI; reuse a buffer, no allocation
+                roi_buf = self._buffer("roi", img.shape[:2])
+                np.copyto(roi_buf, img)
+                img = roi_buf
+            dst = self._buffer("clahe", img.shape[:2])
+            img = self._clahe.apply(img, dst=dst)
+            timings["clahe"] = time.perf_counter() - t0
+
+        out_h, out_w = img.shape[:2]
+        self.scale = (out_w / float(src_w), out_h / float(src_h))
+        self.offset = (off_x, off_y)
+        timings["total"] = time.perf_counter() - t_start
+        self.timings = timings
+        return img
+
+    def step_timings(self) -> Tuple[float, ...]:
+        """Return the last frame's :data:`STEPS` durations in seconds.
+
+        Steps that did not run report ``0.0``.
+        """
+        timings = self.timings
+        return tuple(timings.get(step, 0.0) for step in STEPS)
+
+    def to_frame_points(self, points: np.ndarray) -> np.ndarray:
+        """Map points from processed to original frame coordinates.
+
+        Pixel centres are aligned the way ``cv2.resize`` samples, so a
+        processed pixel maps to the centre of the frame area it covers.
+
+        Args:
+            points: Array whose last axis holds ``(x, y)`` pairs.
+        """
+        sx, sy = self.scale
+        ox, oy = self.offset
+        if (sx, sy, ox, oy) == (1.0, 1.0, 0.0, 0.0):
+            return points
+        factor = np.array([1.0 / sx, 1.0 / sy], dtype=np.float32)
+        shift = np.array([0.5 / sx - 0.5 + ox, 0.5 / sy - 0.5 + oy], dtype=np.float32)
+        return points * factor + shift
+
+    def to_frame_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """Scale displacement vectors from processed to frame pixels.
+
+        Args:
+            vectors: Array whose last axis holds ``(dx, dy)`` pairs.
+        """
+        sx, sy = self.scale
+        if (sx, sy) == (1.0, 1.0):
+            return vectors
+        return vectors * np.array([1.0 / sx, 1.0 / sy], dtype=np.float32)
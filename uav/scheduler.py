@@ -0,0 +1,207 @@
+# uav/scheduler.py
+"""Fixed-rate loop scheduling with deadline and overrun accounting."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+POLICIES = ("skip", "catch_up", "degrade")
+
+
+class Tick(NamedTuple):
+    """Timing of one scheduled loop iteration.
+
+    Attributes:
+        index: Number of ticks released so far, starting at 1.
+        deadline: Monotonic time the tick was scheduled for.
+        start: Monotonic time the tick was actually released.
+        period: Seconds since the previous tick was released.
+        work_s: Seconds the previous iteration spent before calling
+            :meth:`RateScheduler.wait`.
+        overrun_s: How far the previous iteration ran past this tick's
+            deadline, or ``0.0`` if it finished in time.
+        jitter_s: How late the tick woke up from its sleep relative to
+            the deadline (``0.0`` for overrun ticks).
+        skipped: Deadlines dropped because of an overrun (``skip`` policy).
+    """
+
+    index: int
+    deadline: float
+    start: float
+    period: float
+    work_s: float
+    overrun_s: float
+    jitter_s: float
+    skipped: int
+
+
+class RateScheduler:
+    """Release loop iterations on a fixed grid of absolute deadlines.
+
+    Deadlines are computed as ``previous deadline + period`` rather than
+    ``now + period``, so sleep inaccuracies do not accumulate into drift.
+    When an iteration runs past its budget the ``policy`` decides what
+    happens next:
+
+    ``skip``
+        Drop the missed deadlines and wait for the next one on the grid.
+    ``catch_up``
+        Release ticks immediately, without sleeping, until the loop is back
+        on the original grid.
+    ``degrade``
+        Release the tick immediately, re-anchor the grid and stretch the
+        period by ``degrade_factor`` (down to ``min_rate_hz``). The nominal
+        rate is restored step by step after ``recover_after`` on-time ticks.
+    """
+
+    def __init__(
+        self,
+        rate_hz: float,
+        policy: str = "skip",
+        degrade_factor: float = 1.5,
+        min_rate_hz: Optional[float] = None,
+        recover_after: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a scheduler.
+
+        Args:
+            rate_hz: Nominal loop rate.
+            policy: Overrun policy, one of :data:`POLICIES`.
+            degrade_factor: Period multiplier applied per overrun in
+                ``degrade`` mode.
+            min_rate_hz: Lowest rate ``degrade`` may fall to (default: a
+                quarter of ``rate_hz``).
+            recover_after: Consecutive on-time ticks before ``degrade``
+                shortens the period again.
+            clock: Monotonic time source in seconds.
+            sleep: Function used to sleep until a deadline.
+        """
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overrun policy: {policy}")
+        self.nominal_period: float = 1.0 / rate_hz
+        self.period: float = self.nominal_period
+        self.max_period: float = 1.0 / (min_rate_hz or rate_hz / 4.0)
+        self.policy: str = policy
+        self.degrade_factor: float = degrade_factor
+        self.recover_after: int = recover_after
+        self.clock = clock
+        self.sleep = sleep
+        self.reset()
+
+    def rearm(self) -> None:
+        """Forget the current grid so the next :meth:`wait` re-anchors it.
+
+        Call after a deliberate pause (e.g. a simulator reset) so it is not
+        reported as an overrun. Counters are kept.
+        """
+        self._deadline: Optional[float] = None
+        self._last_start: Optional[float] = None
+        self._on_time: int = 0
+        self.period = self.nominal_period
+
+    def reset(self) -> None:
+        """Forget the current grid and clear all counters."""
+        self.rearm()
+        self.ticks: int = 0
+        self.overruns: int = 0
+        self.skipped: int = 0
+        self.total_overrun_s: float = 0.0
+        self.max_overrun_s: float = 0.0
+        self.total_jitter_s: float = 0.0
+        self.max_jitter_s: float = 0.0
+
+    @property
+    def rate_hz(self) -> float:
+        """Current target rate, lower than nominal while degraded."""
+        return 1.0 / self.period
+
+    def wait(self) -> Tick:
+        """Block until the next deadline and return its timing.
+
+        The first call returns immediately and anchors the grid.
+        """
+        now = self.clock()
+        if self._deadline is None:
+            self._deadline = now
+            self._last_start = now
+        deadline = self._deadline
+        work_s = now - self._last_start
+        overrun_s = jitter_s = 0.0
+        skipped = 0
+
+        if now <= deadline:
+            self.sleep(deadline - now)
+            start = self.clock()
+            jitter_s = max(start - deadline, 0.0)
+            self._on_time += 1
+            if (
+                self.policy == "degrade"
+                and self.period > self.nominal_period
+                and self._on_time >= self.recover_after
+            ):
+                self.period = max(
+                    self.period / self.degrade_factor, self.nominal_period
+                )
+                self._on_time = 0
+        else:
+            overrun_s = now - deadline
+            self._on_time = 0
+            if self.policy == "skip":
+                skipped = int(math.floor(overrun_s / self.period)) + 1
+                deadline += skipped * self.period
+                self.sleep(deadline - now)
+                start = self.clock()
+                jitter_s = max(start - deadline, 0.0)
+            elif self.policy == "catch_up":
+                start = now
+            else:
+                start = now
+                deadline = now
+                self.period = min(
+                    self.period * self.degrade_factor, self.max_period
+                )
+
+        period = start - self._last_start
+        self._last_start = start
+        self._deadline = deadline + self.period
+        self.ticks += 1
+        if overrun_s > 0.0:
+            self.overruns += 1
+            self.total_overrun_s += overrun_s
+            self.max_overrun_s = max(self.max_overrun_s, overrun_s)
+        self.skipped += skipped
+        self.total_jitter_s += jitter_s
+        self.max_jitter_s = max(self.max_jitter_s, jitter_s)
+        return Tick(
+            index=self.ticks,
+            deadline=deadline,
+            start=start,
+            period=period,
+            work_s=work_s,
+            overrun_s=overrun_s,
+            jitter_s=jitter_s,
+            skipped=skipped,
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """Return overrun and jitter counters for the ticks released so far."""
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "overrun_ratio": self.overruns / ticks,
+            "mean_overrun_s": (
+                self.total_overrun_s / self.overruns if self.overruns else 0.0
+            ),
+            "max_overrun_s": self.max_overrun_s,
+            "skipped": self.skipped,
+            "mean_jitter_s": self.total_jitter_s / ticks,
+            "max_jitter_s": self.max_jitter_s,
+            "rate_hz": self.rate_hz,
+        }
@@ -0,0 +1,312 @@
+# uav/shm_ring.py
+"""Shared-memory ring buffer carrying perception results between processes."""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .perception import PerceptionResult
+from .preprocessing import STEPS
+from .spans import PERCEPTION_STAMPS
+
+# Control header (int64): latest published sequence number followed by the
+# geometry needed to attach to an existing ring.
+_HEADER_FIELDS = ("write_seq", "slots", "height", "width", "max_points")
+_HEADER_BYTES = 64
+
+# Per-slot metadata (float64), written before the payload arrays.
+META_FIELDS = (
+    "seq",
+    "n_points",
+    "flow_std",
+    "simgetimage_s",
+    "decode_s",
+    "processing_s",
+    "capture_time",
+)
+_META_BYTES = 64
+# Per-slot perf_counter_ns stamps (int64), kept exact instead of as float64,
+# followed by the preprocessing step timings (float64) in the same block.
+_STAMP_BYTES = 64
+_TIMINGS_OFFSET = 8 * len(PERCEPTION_STAMPS)
+
+
+def _align(n: int, to: int = 64) -> int:
+    return (n + to - 1) // to * to
+
+
+class SharedFrameRing:
+    """Fixed-slot ring of ``(image, points, vectors, timings)`` records.
+
+    The producer writes each perception result into the next slot and then
+    publishes its sequence number in the control header. Consumers get NumPy
+    views straight into shared memory, so nothing is pickled or copied on the
+    way. A slot's own ``seq`` field is cleared while it is being rewritten,
+    which lets readers detect a slot that was recycled underneath them (see
+    :meth:`still_valid`).
+
+    :meth:`put` and :meth:`get` mirror :class:`uav.mailbox.LatestMailbox`, so
+    the ring can replace a mailbox in the perception worker and control loop.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        cond: Any,
+        owner: bool,
+    ) -> None:
+        self._shm = shm
+        self._cond = cond
+        self._owner = owner
+        self._header = np.ndarray(
+            (len(_HEADER_FIELDS),), dtype=np.int64, buffer=shm.buf
+        )
+        self.slots = int(self._header[1])
+        self.height = int(self._header[2])
+        self.width = int(self._header[3])
+        self.max_points = int(self._header[4])
+        self._slot_bytes = self.slot_nbytes(
+            self.height, self.width, self.max_points
+        )
+        self._read_seq = 0
+        self.gets = 0
+        self.overwritten = 0
+        self._meta = []
+        self._stamps = []
+        self._timings = []
+        self._images = []
+        self._points = []
+        self._vectors = []
+        img_bytes = _align(self.height * self.width * 3)
+        pts_bytes = _align(self.max_points * 2 * 4)
+        for i in range(self.slots):
+            base = _HEADER_BYTES + i * self._slot_bytes
+            self._meta.append(np.ndarray(
+                (len(META_FIELDS),), dtype=np.float64,
+                buffer=shm.buf, offset=base,
+            ))
+            base += _META_BYTES
+            self._stamps.append(np.ndarray(
+                (len(PERCEPTION_STAMPS),), dtype=np.int64,
+                buffer=shm.buf, offset=base,
+            ))
+            self._timings.append(np.ndarray(
+                (len(STEPS),), dtype=np.float64,
+                buffer=shm.buf, offset=base + _TIMINGS_OFFSET,
+            ))
+            base += _STAMP_BYTES
+            self._images.append(np.ndarray(
+                (self.height, self.width, 3), dtype=np.uint8,
+                buffer=shm.buf, offset=base,
+            ))
+            base += img_bytes
+            self._points.append(np.ndarray(
+                (self.max_points, 1, 2), dtype=np.float32,
+                buffer=shm.buf, offset=base,
+            ))
+            base += pts_bytes
+            self._vectors.append(np.ndarray(
+                (self.max_points, 1, 2), dtype=np.float32,
+                buffer=shm.buf, offset=base,
+            ))
+
+    @staticmethod
+    def slot_nbytes(height: int, width: int, max_points: int) -> int:
+        """Return the size in bytes of one ring slot."""
+        return (
+            _META_BYTES
+            + _STAMP_BYTES
+            + _align(height * width * 3)
+            + 2 * _align(max_points * 2 * 4)
+        )
+
+    @classmethod
+    def create(
+        cls,
+        slots: int = 4,
+        height: int = 720,
+        width: int = 1280,
+        max_points: int = 512,
+        ctx: Any = None,
+    ) -> "SharedFrameRing":
+        """Allocate a new ring in shared memory.
+
+        Args:
+            slots: Number of frames kept before a slot is reused.
+            height: Frame height in pixels.
+            width: Frame width in pixels.
+            max_points: Maximum tracked points stored per frame.
+            ctx: Optional ``multiprocessing`` context for the wakeup condition.
+        """
+        ctx = ctx if ctx is not None else multiprocessing
+        size = _HEADER_BYTES + slots * cls.slot_nbytes(height, width, max_points)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        header = np.ndarray((len(_HEADER_FIELDS),), dtype=np.int64, buffer=shm.buf)
+        header[:] = (0, slots, height, width, max_points)
+        del header
+        return cls(shm, ctx.Condition(), owner=True)
+
+    @property
+    def name(self) -> str:
+        """Name of the underlying shared memory block."""
+        return self._shm.name
+
+    def __getstate__(self):
+        return {"name": self._shm.name, "cond": self._cond}
+
+    def __setstate__(self, state) -> None:
+        shm = shared_memory.SharedMemory(name=state["name"])
+        self.__init__(shm, state["cond"], owner=False)
+
+    @property
+    def write_seq(self) -> int:
+        """Sequence number of the most recently published frame."""
+        return int(self._header[0])
+
+    def put(self, data: Tuple) -> int:
+        """Write a perception result and publish it.
+
+        Args:
+            data: :class:`uav.perception.PerceptionResult` fields, in order;
+                ``stamps`` and ``preprocess_s`` may be omitted and are
+                stored as zeros. Points beyond ``max_points`` are truncated.
+
+        Returns:
+            The sequence number assigned to the frame.
+        """
+        result = PerceptionResult(*data)
+        image, points, vectors = result.vis_img, result.points, result.vectors
+        seq = self.write_seq + 1
+        idx = (seq - 1) % self.slots
+        meta = self._meta[idx]
+        meta[0] = 0.0  # mark slot as being rewritten
+
+        h, w = image.shape[:2]
+        if (h, w) == (self.height, self.width):
+            self._images[idx][...] = image[..., :3]
+        else:
+            import cv2
+            self._images[idx][...] = cv2.resize(image, (self.width, self.height))
+
+        n = min(len(points), self.max_points)
+        if n:
+            self._points[idx][:n] = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)[:n]
+            self._vectors[idx][:n] = np.asarray(vectors, dtype=np.float32).reshape(-1, 1, 2)[:n]
+        meta[1:] = (
+            n,
+            result.flow_std,
+            result.simgetimage_s,
+            result.decode_s,
+            result.processing_s,
+            result.capture_time,
+        )
+        self._stamps[idx][:] = result.stamps
+        self._timings[idx][:] = result.preprocess_s
+        meta[0] = float(seq)
+
+        with self._cond:
+            self._header[0] = seq
+            self._cond.notify_all()
+        return seq
+
+    def _wait_for_new(self, timeout: Optional[float]) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self.write_seq <= self._read_seq:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+        return self.write_seq
+
+    def get_with_seq(self, timeout: Optional[float] = None) -> Tuple[int, PerceptionResult]:
+        """Wait for an unread frame and return ``(seq, data)``.
+
+        ``data`` is a :class:`uav.perception.PerceptionResult` whose
+        image, points and vectors are read-only views into shared memory that
+        stay valid until the slot is recycled ``slots`` frames later.
+
+        Raises:
+            queue.Empty: If no new frame is published within ``timeout``.
+        """
+        while True:
+            seq = self._wait_for_new(timeout)
+            idx = (seq - 1) % self.slots
+            meta = self._meta[idx]
+            if int(meta[0]) != seq:
+                # Recycled while we were waking up; try the newer frame.
+                continue
+            n = int(meta[1])
+            image = self._images[idx].view()
+            image.flags.writeable = False
+            if n:
+                points = self._points[idx][:n].view()
+                vectors = self._vectors[idx][:n].view()
+                points.flags.writeable = False
+                vectors.flags.writeable = False
+            else:
+                points = np.array([])
+                vectors = np.array([])
+            data = PerceptionResult(
+                image,
+                points,
+                vectors,
+                float(meta[2]),
+                float(meta[3]),
+                float(meta[4]),
+                float(meta[5]),
+                float(meta[6]),
+                tuple(self._stamps[idx].tolist()),
+                tuple(self._timings[idx].tolist()),
+            )
+            if int(meta[0]) != seq:
+                continue
+            self.overwritten += max(seq - self._read_seq - 1, 0)
+            self._read_seq = seq
+            self.gets += 1
+            return seq, data
+
+    def get(self, timeout: Optional[float] = None) -> PerceptionResult:
+        """Wait for an unread frame and return its data tuple."""
+        return self.get_with_seq(timeout)[1]
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters compatible with :meth:`LatestMailbox.stats`.
+
+        ``overwritten`` counts frames this reader never saw because newer
+        frames were published first.
+        """
+        seq = self.write_seq
+        return {
+            "seq": seq,
+            "puts": seq,
+            "gets": self.gets,
+            "overwritten": self.overwritten,
+            "dropped": 0,
+        }
+
+    def still_valid(self, seq: int) -> bool:
+        """Return ``True`` if the slot holding frame ``seq`` is untouched."""
+        return int(self._meta[(seq - 1) % self.slots][0]) == seq
+
+    def close(self) -> None:
+        """Detach from shared memory, unlinking it if this ring created it."""
+        if self._header is None:
+            return
+        self._meta = self._stamps = self._timings = []
+        self._images = self._points = self._vectors = []
+        self._header = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views handed out by ``get`` are still alive; leave the mapping.
+            pass
+        if self._owner:
+            self._shm.unlink()
+            self._owner = False
@@ -0,0 +1,118 @@
+# uav/spans.py
+"""``perf_counter_ns`` stamps that follow a frame from capture to log.
+
+Perception stamps a frame when its image request is sent (``capture_ns``),
+when the reply arrives (``fetched_ns``), after decoding (``decoded_ns``) and
+after tracking (``processed_ns``), and passes them to the control loop in
+:attr:`uav.perception.PerceptionResult.stamps`. The control loop adds its own
+stamps with a :class:`SpanRecorder` and logs all of them with the frame.
+
+Consecutive stamps delimit the :data:`SPANS`, so a frame's latency breaks
+down into fetch, decode, track, hand-off, decision, dispatch and logging.
+Stages a frame skipped (e.g. tracking on the first frame) carry the previous
+stamp and take zero time; a stamp of ``0`` means it was not measured.
+
+Helper threads that do not handle a frame record, such as the video and log
+writers, record their work in a :class:`ThreadSpans` instead.
+
+``perf_counter_ns`` uses the system-wide monotonic clock, so stamps taken in
+the perception process of ``--perception-mode process`` are comparable.
+"""
+
+from __future__ import annotations
+
+import csv
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+now_ns = time.perf_counter_ns
+
+PERCEPTION_STAMPS: Tuple[str, ...] = ("capture_ns", "fetched_ns", "decoded_ns", "processed_ns")
+CONTROL_STAMPS: Tuple[str, ...] = ("dequeue_ns", "decision_ns", "dispatch_ns", "log_ns")
+STAMPS: Tuple[str, ...] = PERCEPTION_STAMPS + CONTROL_STAMPS
+
+# (span, start stamp, end stamp) in pipeline order
+SPANS: Tuple[Tuple[str, str, str], ...] = (
+    ("fetch", "capture_ns", "fetched_ns"),
+    ("decode", "fetched_ns", "decoded_ns"),
+    ("track", "decoded_ns", "processed_ns"),
+    ("handoff", "processed_ns", "dequeue_ns"),
+    ("decide", "dequeue_ns", "decision_ns"),
+    ("dispatch", "decision_ns", "dispatch_ns"),
+    ("log", "dispatch_ns", "log_ns"),
+)
+TOTAL_SPAN: Tuple[str, str, str] = ("capture_to_log", "capture_ns", "log_ns")
+
+NO_STAMPS: Tuple[int, ...] = (0,) * len(PERCEPTION_STAMPS)
+_INDEX: Dict[str, int] = {name: i for i, name in enumerate(STAMPS)}
+
+
+def span_ns(start: int, end: int) -> Optional[int]:
+    """Return ``end - start`` or ``None`` if either stamp is missing."""
+    if not start or not end:
+        return None
+    return end - start
+
+
+class SpanRecorder:
+    """Stamps of one frame, seeded with the perception stamps it arrived with."""
+
+    __slots__ = ("_stamps",)
+
+    def __init__(self, perception: Sequence[int] = NO_STAMPS) -> None:
+        self._stamps = list(perception) + [0] * len(CONTROL_STAMPS)
+
+    def mark(self, name: str) -> int:
+        """Record ``name`` as now and return the stamp."""
+        ns = now_ns()
+        self._stamps[_INDEX[name]] = ns
+        return ns
+
+    def __getitem__(self, name: str) -> int:
+        return self._stamps[_INDEX[name]]
+
+    def stamps(self) -> Tuple[int, ...]:
+        """Return every stamp in :data:`STAMPS` order."""
+        return tuple(self._stamps)
+
+    def spans(self) -> Dict[str, Optional[int]]:
+        """Return the duration in nanoseconds of each span in :data:`SPANS`."""
+        return {
+            name: span_ns(self[start], self[end])
+            for name, start, end in SPANS + (TOTAL_SPAN,)
+        }
+
+
+class ThreadSpans:
+    """Bounded record of ``(track, name, start_ns, end_ns)`` work spans.
+
+    Appends are a single ``deque.append`` and safe from any thread. Only the
+    newest ``capacity`` spans are kept, so memory stays constant on long runs.
+    """
+
+    __slots__ = ("_spans",)
+
+    COLUMNS: Tuple[str, ...] = ("track", "name", "start_ns", "end_ns")
+
+    def __init__(self, capacity: int = 65536) -> None:
+        self._spans: Deque[Tuple[str, str, int, int]] = deque(maxlen=capacity)
+
+    def record(self, track: str, name: str, start_ns: int, end_ns: Optional[int] = None) -> None:
+        """Record a span of ``track`` that ends now unless ``end_ns`` is given."""
+        self._spans.append((track, name, start_ns, now_ns() if end_ns is None else end_ns))
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def spans(self) -> List[Tuple[str, str, int, int]]:
+        """Return the recorded spans, oldest first."""
+        return list(self._spans)
+
+    def write_csv(self, path: str) -> str:
+        """Write the spans as CSV with :attr:`COLUMNS` and return ``path``."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(self.COLUMNS)
+            writer.writerows(self.spans())
+        return path
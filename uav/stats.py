@@ -0,0 +1,210 @@
+# uav/stats.py
+"""Constant-memory streaming quantiles for run metrics.
+
+:class:`LogHistogram` counts samples in geometrically growing buckets, so
+any quantile is available at any time with a bounded relative error, in
+memory that does not grow with the run. :class:`RunStats` keeps one
+histogram per named metric (FPS, loop time, pipeline spans) for the control
+loop to feed, the GUI to poll and the shutdown code to summarise.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DEFAULT_QUANTILES: Sequence[float] = (0.5, 0.95, 0.99)
+
+
+class LogHistogram:
+    """Streaming quantile estimate over non-negative samples.
+
+    Values in ``[lo, hi)`` fall into buckets whose bounds grow by a factor
+    of ``(1 + precision) / (1 - precision)``; a quantile is reported as the
+    bucket's midpoint, within ``precision`` of the true sample value. Values
+    below ``lo`` (including zero) share the first bucket and values at or
+    above ``hi`` the last one. The exact minimum, maximum, count and sum are
+    tracked as well, and quantiles are clamped to ``[min, max]``. NaN and
+    infinite samples (e.g. a latency computed from a missing stamp) are not
+    recorded; they are counted in ``non_finite`` instead.
+
+    :meth:`add` is a single ``log`` and list increment, cheap enough for
+    the control loop. Readers in other threads (the GUI) may see a sample
+    counted in ``count`` but not yet in a bucket; estimates stay in range.
+    """
+
+    __slots__ = (
+        "lo",
+        "hi",
+        "precision",
+        "count",
+        "non_finite",
+        "total",
+        "min",
+        "max",
+        "_scale",
+        "_counts",
+    )
+
+    def __init__(self, lo: float = 1e-3, hi: float = 1e6, precision: float = 0.01) -> None:
+        """Configure the bucket range.
+
+        Args:
+            lo: Smallest value resolved; smaller samples share one bucket.
+            hi: Largest value resolved; larger samples share one bucket.
+            precision: Relative error of reported quantiles, in ``(0, 1)``.
+        """
+        if not 0 < lo < hi:
+            raise ValueError("LogHistogram requires 0 < lo < hi")
+        if not 0 < precision < 1:
+            raise ValueError("precision must be in (0, 1)")
+        self.lo = lo
+        self.hi = hi
+        self.precision = precision
+        growth = (1 + precision) / (1 - precision)
+        self._scale = 1.0 / math.log(growth)
+        # bucket 0 holds values < lo, the last bucket values >= hi
+        self._counts: List[int] = [0] * (int(math.ceil(math.log(hi / lo) * self._scale)) + 2)
+        self.count = 0
+        self.non_finite = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        if value < self.lo:
+            return 0
+        if value >= self.hi:
+            return len(self._counts) - 1
+        return min(int(math.log(value / self.lo) * self._scale) + 1, len(self._counts) - 2)
+
+    def _value(self, index: int) -> float:
+        """Return the representative value of bucket ``index``."""
+        if index == 0:
+            return self.min
+        if index == len(self._counts) - 1:
+            return self.max
+        # Midpoint of [lo * g**(i-1), lo * g**i) is lo * g**(i-1) / (1 - precision)
+        return self.lo * math.exp((index - 1) / self._scale) / (1 - self.precision)
+
+    def add(self, value: float) -> None:
+        """Record one sample; non-finite values are only counted."""
+        if not math.isfinite(value):
+            self.non_finite += 1
+            return
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Record every sample in ``values``."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add the samples of ``other``, which must use the same buckets."""
+        if (other.lo, other.hi, other.precision) != (self.lo, self.hi, self.precision):
+            raise ValueError("Cannot merge histograms with different buckets")
+        for i, n in enumerate(other._counts):
+            self._counts[i] += n
+        self.count += other.count
+        self.non_finite += other.non_finite
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def reset(self) -> None:
+        """Forget every sample."""
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.non_finite = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def mean(self) -> float:
+        """Mean of the samples, or ``nan`` if there are none."""
+        return self.total / self.count if self.count else math.nan
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Return the estimated quantiles ``qs`` (each in ``[0, 1]``).
+
+        ``0`` and ``1`` return the exact minimum and maximum. Returns
+        ``nan`` for every quantile while the histogram is empty.
+        """
+        counts = list(self._counts)
+        seen = sum(counts)
+        if not seen:
+            return [math.nan] * len(qs)
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        results = [math.nan] * len(qs)
+        cumulative = 0
+        index = 0
+        for i in order:
+            if qs[i] <= 0:
+                results[i] = self.min
+                continue
+            if qs[i] >= 1:
+                results[i] = self.max
+                continue
+            # Nearest-rank: the smallest sample with at least q of the data at or below it
+            rank = max(math.ceil(qs[i] * seen), 1)
+            while cumulative + counts[index] < rank:
+                cumulative += counts[index]
+                index += 1
+            results[i] = min(max(self._value(index), self.min), self.max)
+        return results
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated ``q`` quantile, or ``nan`` if empty."""
+        return self.quantiles((q,))[0]
+
+    def summary(self, scale: float = 1.0, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        """Return ``count``, ``mean``, ``p<q>`` for ``qs`` and ``max``.
+
+        Args:
+            scale: Factor applied to every value, e.g. ``1000`` for seconds
+                reported in milliseconds.
+            qs: Quantiles to report, keyed e.g. ``p50`` or ``p99.9``.
+        """
+        result: Dict[str, float] = {"count": self.count, "mean": self.mean * scale}
+        for q, value in zip(qs, self.quantiles(qs)):
+            result[f"p{100 * q:g}"] = value * scale
+        result["max"] = self.max * scale if self.count else math.nan
+        return result
+
+
+class RunStats:
+    """Named :class:`LogHistogram` metrics, created on first use."""
+
+    def __init__(self, **histogram_kwargs: float) -> None:
+        """Store ``histogram_kwargs`` for each new :class:`LogHistogram`."""
+        self._kwargs = histogram_kwargs
+        self._metrics: Dict[str, LogHistogram] = {}
+
+    def __getitem__(self, name: str) -> LogHistogram:
+        histogram = self._metrics.get(name)
+        if histogram is None:
+            histogram = self._metrics[name] = LogHistogram(**self._kwargs)
+        return histogram
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def names(self) -> List[str]:
+        """Return the metric names in the order they were first added."""
+        return list(self._metrics)
+
+    def add(self, name: str, value: Optional[float]) -> None:
+        """Record ``value`` for ``name``; ``None`` (not measured) is ignored."""
+        if value is not None:
+            self[name].add(value)
+
+    def summary(self, scale: float = 1.0) -> Dict[str, Dict[str, float]]:
+        """Return :meth:`LogHistogram.summary` of every metric."""
+        return {name: self[name].summary(scale) for name in self.names()}
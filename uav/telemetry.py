@@ -0,0 +1,232 @@
+# uav/telemetry.py
+"""Vehicle telemetry snapshots and a background poller publishing them."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, NamedTuple, Optional
+
+import airsim
+import numpy as np
+
+from .utils import get_speed, get_yaw
+
+
+class TelemetrySnapshot(NamedTuple):
+    """Immutable view of the vehicle state at one point in time.
+
+    Attributes:
+        position: ``airsim.Vector3r`` position in the start frame (NED).
+        yaw: Heading in degrees.
+        speed: Magnitude of the linear velocity in m/s.
+        collided: Whether the simulator reports a collision.
+        sim_timestamp: Simulator timestamp of the state in nanoseconds.
+        wall_time: ``time.time()`` when the snapshot was taken.
+    """
+
+    position: Any
+    yaw: float
+    speed: float
+    collided: bool
+    sim_timestamp: int
+    wall_time: float
+
+
+def fetch_telemetry(client: Any) -> TelemetrySnapshot:
+    """Fetch state and collision info once and bundle them in a snapshot.
+
+    RPC failures are reported and replaced by neutral values, matching
+    :func:`uav.utils.get_drone_state`.
+
+    When the client supports pipelining (``batch``), both requests are sent
+    back to back so the snapshot costs a single round trip.
+
+    Args:
+        client: AirSim ``MultirotorClient``.
+    """
+    state_call, collision_call = client.getMultirotorState, client.simGetCollisionInfo
+    if hasattr(client, "batch"):
+        try:
+            batch = client.batch()
+            state_call = batch.getMultirotorState().result
+            collision_call = batch.simGetCollisionInfo().result
+        except Exception:
+            # Sending failed; the plain calls below report the error.
+            state_call = client.getMultirotorState
+            collision_call = client.simGetCollisionInfo
+
+    return snapshot_from(_result(state_call), _result(collision_call))
+
+
+def _result(call: Callable[[], Any]) -> Any:
+    """Return ``call()``, or the exception it raised."""
+    try:
+        return call()
+    except Exception as e:
+        return e
+
+
+def snapshot_from(state: Any, collision: Any) -> TelemetrySnapshot:
+    """Build a snapshot from ``getMultirotorState``/``simGetCollisionInfo`` results.
+
+    Either argument may be the exception its RPC raised; failures are
+    reported and replaced by neutral values, matching
+    :func:`uav.utils.get_drone_state`.
+    """
+    try:
+        if isinstance(state, Exception):
+            raise state
+        kin = state.kinematics_estimated
+        position = kin.position
+        yaw = get_yaw(kin.orientation)
+        speed = float(get_speed(kin.linear_velocity))
+        sim_timestamp = int(getattr(state, "timestamp", 0))
+    except Exception as e:
+        print(f"State fetch error: {e}")
+        position, yaw, speed, sim_timestamp = airsim.Vector3r(0, 0, 0), 0.0, 0.0, 0
+
+    if isinstance(collision, Exception):
+        print(f"Collision fetch error: {collision}")
+        collided = False
+    else:
+        collided = bool(getattr(collision, "has_collided", False))
+
+    return TelemetrySnapshot(
+        position=position,
+        yaw=yaw,
+        speed=speed,
+        collided=collided,
+        sim_timestamp=sim_timestamp,
+        wall_time=time.time(),
+    )
+
+
+class TelemetryPoller:
+    """Poll vehicle telemetry at a fixed rate on a background thread.
+
+    The poller owns a dedicated RPC client and publishes each
+    :class:`TelemetrySnapshot` by replacing a single reference. Snapshots are
+    immutable, so readers (control loop, GUI) just read the attribute and
+    never take a lock or wait on an RPC. Polling statistics are kept so the
+    rate can be tuned against simulator load.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        rate_hz: float = 50.0,
+        window: int = 200,
+    ) -> None:
+        """Configure the poller.
+
+        Args:
+            client_factory: Called inside the poll thread to create the
+                ``MultirotorClient`` used for telemetry RPCs.
+            rate_hz: Target number of polls per second.
+            window: Number of recent RPC latencies kept for percentiles.
+        """
+        self.client_factory = client_factory
+        self.period: float = 1.0 / rate_hz
+        self.polls: int = 0
+        self.overruns: int = 0
+        self._latest: Optional[TelemetrySnapshot] = None
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._poll_times: Deque[float] = deque(maxlen=window)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the polling thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="telemetry-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling and wait up to ``timeout`` seconds for the thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        """Return ``True`` while the polling thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        client = self.client_factory()
+        next_poll = time.monotonic()
+        while not self._stop.is_set():
+            self.poll_once(client)
+            next_poll += self.period
+            delay = next_poll - time.monotonic()
+            if delay < 0:
+                # RPCs took longer than a period; restart the schedule
+                # instead of firing a burst of catch-up polls.
+                self.overruns += 1
+                next_poll = time.monotonic()
+            elif self._stop.wait(delay):
+                break
+
+    def poll_once(self, client: Any) -> TelemetrySnapshot:
+        """Fetch one snapshot with ``client`` and publish it."""
+        t0 = time.monotonic()
+        snapshot = fetch_telemetry(client)
+        self.publish(snapshot, time.monotonic() - t0)
+        return snapshot
+
+    def publish(self, snapshot: TelemetrySnapshot, latency_s: float) -> None:
+        """Publish a snapshot fetched elsewhere and record its RPC latency."""
+        self._latencies.append(latency_s)
+        self._poll_times.append(time.monotonic())
+        self.polls += 1
+        self._latest = snapshot
+
+    def latest(self) -> Optional[TelemetrySnapshot]:
+        """Return the newest snapshot, or ``None`` before the first poll."""
+        return self._latest
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Return seconds since the newest snapshot was taken.
+
+        Returns ``inf`` if nothing has been published yet.
+        """
+        snapshot = self._latest
+        if snapshot is None:
+            return math.inf
+        now = time.time() if now is None else now
+        return max(now - snapshot.wall_time, 0.0)
+
+    def is_stale(self, max_age: float) -> bool:
+        """Return ``True`` if the newest snapshot is older than ``max_age``."""
+        return self.age() > max_age
+
+    def poll_rate(self) -> float:
+        """Return the achieved poll rate over the recent window in Hz."""
+        times = list(self._poll_times)
+        if len(times) < 2:
+            return 0.0
+        span = times[-1] - times[0]
+        return (len(times) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Return poll rate, RPC latency percentiles (ms) and staleness."""
+        latencies = np.asarray(list(self._latencies), dtype=float) * 1000.0
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            worst = float(latencies.max())
+        else:
+            p50 = p95 = p99 = worst = 0.0
+        return {
+            "polls": self.polls,
+            "overruns": self.overruns,
+            "poll_rate_hz": self.poll_rate(),
+            "latency_p50_ms": float(p50),
+            "latency_p95_ms": float(p95),
+            "latency_p99_ms": float(p99),
+            "latency_max_ms": worst,
+            "age_s": self.age(),
+        }
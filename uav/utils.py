@@ -3,6 +3,7 @@
 import math
 import os
 import fnmatch
+import threading
 import cv2
 import numpy as np
 import airsim
@@ -14,9 +15,20 @@ from datetime import datetime
 FLOW_STD_MAX = 10.0
 
 
+_clahe_local = threading.local()
+
+
 def apply_clahe(gray_image):
-    """Improve contrast of a grayscale image using CLAHE."""
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    """Improve contrast of a grayscale image using CLAHE.
+
+    The CLAHE object is created once per thread and reused. For repeated
+    per-frame use prefer :class:`uav.preprocessing.FramePreprocessor`, which
+    also reuses its output buffers.
+    """
+    clahe = getattr(_clahe_local, "clahe", None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        _clahe_local.clahe = clahe
     return clahe.apply(gray_image)
 
 
@@ -50,8 +62,8 @@ def _timestamp_from_name(path: str) -> float:
 
     Falls back to the file's modification time if parsing fails.
     """
-    name = os.path.basename(path)
-    ts = name[len("full_log_"):-len(".csv")]
+    name = os.path.splitext(os.path.basename(path))[0]
+    ts = name[len("full_log_"):]
     try:
         dt = datetime.strptime(ts, "%Y%m%d_%H%M%S")
         return dt.timestamp()
@@ -59,13 +71,15 @@ def _timestamp_from_name(path: str) -> float:
         return os.path.getmtime(path)
 
 
-def retain_recent_logs(log_dir: str, keep: int = 5) -> None:
-    """Keep only the ``keep`` most recent ``full_log_*.csv`` files."""
+def retain_recent_logs(
+    log_dir: str, keep: int = 5, pattern: str = "full_log_*.csv"
+) -> None:
+    """Keep only the ``keep`` most recent log files matching ``pattern``."""
     try:
         files = [
             os.path.join(log_dir, f)
             for f in os.listdir(log_dir)
-            if fnmatch.fnmatch(f, "full_log_*.csv")
+            if fnmatch.fnmatch(f, pattern)
         ]
     except FileNotFoundError:
         print(f"⚠️ Log directory '{log_dir}' not found.")